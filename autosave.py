@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import Highlight, display_string
+from columns import Row, iter_rows
+from highlight import HighlightListener
+import logging
+
+# (매치 id, 매치 이름, 하이라이트 행) 목록. 백그라운드 스레드에서 읽는 동안 GUI 스레드의 편집/구간 이동이
+# Highlight 객체를 바꾸므로, GUI 스레드에서 (start_ms, end_ms, memo) 튜플로 복사해 만든다.
+Snapshot = List[Tuple[int, str, Tuple[Row, ...]]]
+
+def write_atomic(path: str, text: str):
+    """임시 파일에 쓰고 fsync 후 교체. 중간에 종료되어도 이전 파일이나 새 파일 중 하나만 남는다."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def format_snapshot(snapshot: Snapshot) -> str:
+    """매치가 하나면 기존 자동 저장 형식 그대로, 여러 개면 매치 이름 줄로 구분"""
+    lines = []
+    for _, name, highlights in snapshot:
+        if len(snapshot) > 1:
+            lines.append(f"# {name}")
+        lines.extend(display_string(*row) for row in iter_rows(highlights))
+    return ''.join(line + '\n' for line in lines)
+
+class AutosaveListener(HighlightListener):
+    """하이라이트 변경마다 AutosaveService에 알림"""
+    def __init__(self, service: 'AutosaveService'):
+        self.service = service
+
+    def highlights_inserted(self, index: int, highlight: Highlight):
+        self.service.notify()
+
+    def highlights_removed(self, index: int, highlight: Highlight):
+        self.service.notify()
+
+    def highlight_changed(self, index: int, highlight: Highlight):
+        self.service.notify()
+
+    def highlights_reset(self):
+        self.service.notify()
+
+class AutosaveService:
+    """
+    백그라운드 자동 저장.
+    변경 알림(notify)이 debounce초 동안 없거나 첫 변경 후 max_delay초가 지나면 request_snapshot(origin)을 호출한다.
+    호출받은 쪽은 GUI 스레드에서 스냅샷(값 복사)을 만들어 submit()으로 넘기고,
+    문자열 변환과 파일 쓰기(임시 파일 + 교체)는 이 서비스의 스레드에서 처리한다.
+    writer를 지정하면 path에 쓰는 대신 writer(snapshot)를 호출한다 (실시간 내보내기 등).
+    """
+    def __init__(self, path: str, request_snapshot: Callable[[float], None],
+                 debounce: float = 0.5, max_delay: float = 3.0,
+                 serializer: Callable[[Snapshot], str] = format_snapshot,
+                 writer: Optional[Callable[[Snapshot], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.request_snapshot = request_snapshot
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.serializer = serializer
+        self.writer = writer
+        self._cond = threading.Condition()
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._pending: Optional[Tuple[Snapshot, float]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # 통계 (밀리초): 첫 변경부터 파일 교체까지 지연, 직렬화+쓰기 시간
+        self.save_count = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_write = 0.0
+        self.max_write = 0.0
+
+    def start(self):
+        with self._cond:
+            self._stopped = False
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="AutosaveService", daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """모델이 바뀔 때마다 호출 (어느 스레드에서든 가능, 매우 가벼움)"""
+        now = time.monotonic()
+        with self._cond:
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify()
+
+    def submit(self, snapshot: Snapshot, origin: float):
+        """request_snapshot(origin)에 대한 응답. 아직 쓰지 않은 이전 스냅샷은 버린다."""
+        with self._cond:
+            if self._pending is not None:
+                origin = min(origin, self._pending[1])
+            self._pending = (snapshot, origin)
+            self._cond.notify()
+
+    def _due_time(self) -> Optional[float]:
+        if self._first_change is None:
+            return None
+        return min(self._last_change + self.debounce, self._first_change + self.max_delay)
+
+    def _run(self):
+        while True:
+            request_origin = None
+            with self._cond:
+                while True:
+                    if self._pending is not None:
+                        break
+                    if self._stopped:
+                        return
+                    due = self._due_time()
+                    now = time.monotonic()
+                    if due is not None and due <= now:
+                        request_origin = self._first_change
+                        self._first_change = self._last_change = None
+                        break
+                    self._cond.wait(None if due is None else due - now)
+                pending, self._pending = self._pending, None
+            if request_origin is not None:
+                try:
+                    self.request_snapshot(request_origin)
+                except Exception as e:
+                    self.logger.error(f"Error requesting autosave snapshot: {str(e)}")
+            if pending is not None:
+                self._write(*pending)
+
+    def _write(self, snapshot: Snapshot, origin: float):
+        try:
+            began = time.monotonic()
+            if self.writer is not None:
+                self.writer(snapshot)
+            else:
+                write_atomic(self.path, self.serializer(snapshot))
+            done = time.monotonic()
+            self._record(done - origin, done - began)
+            self.logger.debug("Autosaved %s (latency %.1f ms)", self.path, self.last_latency)
+        except Exception as e:
+            self.logger.error(f"Error in autosave: {str(e)}")
+
+    def _record(self, latency: float, write: float):
+        with self._cond:
+            self.save_count += 1
+            self.last_latency = latency * 1000
+            self.total_latency += latency * 1000
+            self.max_latency = max(self.max_latency, latency * 1000)
+            self.last_write = write * 1000
+            self.max_write = max(self.max_write, write * 1000)
+
+    def save_now(self, snapshot: Snapshot):
+        """종료 시 등 동기 저장 (호출한 스레드에서 바로 씀)"""
+        with self._cond:
+            origin = self._first_change or time.monotonic()
+            self._first_change = self._last_change = None
+            self._pending = None
+        self._write(snapshot, origin)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'saves': self.save_count,
+                'last_ms': self.last_latency,
+                'mean_ms': self.total_latency / self.save_count if self.save_count else 0.0,
+                'max_ms': self.max_latency,
+                'write_ms': self.last_write,
+                'max_write_ms': self.max_write,
+            }
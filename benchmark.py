@@ -0,0 +1,180 @@
+"""
+성능 측정 스크립트.
+    python benchmark.py memory [--count N]
+    python benchmark.py shift [--count N]
+    python benchmark.py session [--count N]
+    python benchmark.py xml [--count N]
+"""
+import gc
+import os
+import time
+import tempfile
+import sys
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+from models import Highlight
+from columns import HighlightColumns
+from interval_index import IntervalIndex
+from session_format import CompactSessionReader, read_header, read_session, write_session
+from snapshot_store import DeltaSnapshotStore
+from highlight_saver import HighlightSaver
+
+def sample_rows(count: int) -> List[Tuple[int, int, str]]:
+    """대회 하루치 메모를 흉내낸 데이터 (팀/상황 조합이라 메모가 자주 반복됨)"""
+    teams = [f"{i}팀" for i in range(1, 17)]
+    events = ["교전 시작", "탈락", "1대4 클러치", "자기장 교전", "차량 교전", "치킨"]
+    rows = []
+    for i in range(count):
+        start = i * 7300 + (i % 13) * 17
+        memo = f"{teams[i % 16]} {events[i % 6]} {teams[(i * 7) % 16]} 탈락" if i % 5 else f"하이라이트 {i}"
+        rows.append((start, start + 4000 + (i % 50) * 100, memo))
+    return rows
+
+@dataclass
+class _DictHighlight:
+    """__slots__ 도입 전 Highlight와 같은 구조 (비교용)"""
+    start_ms: int
+    end_ms: int
+    memo: str
+
+def _measure(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return after - before
+
+def bench_memory(count: int):
+    rows = sample_rows(count)
+    # 메모 문자열은 원본 데이터가 공유하므로 컨테이너 자체의 비용만 측정된다
+    cases = [
+        ("dataclass (__dict__)", lambda: [_DictHighlight(s, e, m) for s, e, m in rows]),
+        ("Highlight (__slots__)", lambda: [Highlight(s, e, m) for s, e, m in rows]),
+        ("HighlightColumns", lambda: HighlightColumns.from_highlights(Highlight(s, e, m) for s, e, m in rows)),
+    ]
+    print(f"highlights: {count}")
+    for name, build in cases:
+        used = _measure(build)
+        print(f"{name:<24} {used / 1024 / 1024:8.2f} MiB {used / count:8.1f} bytes/highlight")
+
+def bench_shift(count: int, repeat: int = 20):
+    rows = sample_rows(count)
+    index = IntervalIndex(Highlight(s, e, m) for s, e, m in rows)
+    last_start = rows[-1][0]
+    cases = [
+        ("shift all", 0, last_start, 1500),
+        ("shift second half", last_start // 2, last_start, -2500),
+    ]
+    print(f"highlights: {count}")
+    for name, start_ms, end_ms, delta_ms in cases:
+        shift_times, undo_times = [], []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            token = index.shift_range(start_ms, end_ms, delta_ms)
+            shift_times.append(time.perf_counter() - began)
+            began = time.perf_counter()
+            index.undo_shift(token)
+            undo_times.append(time.perf_counter() - began)
+        print(f"{name:<24} shift {max(shift_times) * 1000:8.3f} ms  undo {max(undo_times) * 1000:8.3f} ms ({token[0]})")
+
+def _best(run: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - began)
+    return min(times) * 1000
+
+def bench_session(count: int, repeat: int = 5):
+    rows = sample_rows(count)
+    columns = HighlightColumns()
+    for row in rows:
+        columns.append(*row)
+    session_data = {
+        'timestamp': '2024-01-01T00:00:00', 'highlight_count': count, 'total_time': rows[-1][1] // 1000,
+        'matches': [{'name': '매치 1', 'timer': {'elapsed_time': rows[-1][1] // 1000}, 'highlights': columns,
+                     'recording_start_ms': None}],
+        'current_match': 0, 'memo': '', 'saved': True,
+    }
+    print(f"highlights: {count}")
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ('session.json', 'session.hls'):
+            path = os.path.join(folder, name)
+            save_ms = _best(lambda: write_session(path, session_data), repeat)
+            if name.endswith('.json'):
+                # 기존 load_session과 같은 경로: json.load 후 HighlightColumns.from_dicts
+                load = lambda: HighlightColumns.from_dicts(read_session(path)['matches'][0]['highlights'])
+            else:
+                load = lambda: read_session(path)['matches'][0]['highlights']
+            assert list(load().rows()) == rows
+            load_ms = _best(load, repeat)
+            header_ms = _best(lambda: read_header(path), repeat)
+            size = os.path.getsize(path)
+            print(f"{name:<14} {size / 1024:10.1f} KiB  save {save_ms:8.1f} ms  load {load_ms:8.1f} ms  "
+                  f"metadata {header_ms:8.2f} ms")
+            if name.endswith('.hls'):
+                with CompactSessionReader(path) as reader:
+                    first_ms = _best(lambda: next(reader.iter_blocks(0)), repeat)
+                print(f"{'':<14} first block {first_ms:8.2f} ms")
+        # 델타 스냅샷: 메모 하나만 바꾼 뒤 다시 저장할 때 쓰는 바이트
+        store = DeltaSnapshotStore(folder)
+        path = os.path.join(folder, 'session.hld')
+        store.write(path, session_data)
+        base_bytes = store.bytes_written
+        changed = HighlightColumns()
+        for i, row in enumerate(rows):
+            changed.append(row[0], row[1], row[2] + " (수정)" if i == count // 2 else row[2])
+        session_data['matches'][0]['highlights'] = changed
+        delta_ms = _best(lambda: store.write(path, session_data), 1)
+        delta_bytes = store.bytes_written
+        load_ms = _best(lambda: store.read(path), repeat)
+        print(f"{'session.hld':<14} base {base_bytes / 1024:10.1f} KiB  one memo changed {delta_bytes / 1024:8.2f} KiB "
+              f"(save {delta_ms:6.1f} ms)  load {load_ms:8.1f} ms")
+
+def bench_xml(count: int):
+    highlights = HighlightColumns()
+    for row in sample_rows(count):
+        highlights.append(*row)
+    saver = HighlightSaver()
+    print(f"markers: {count}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'markers.xml')
+        began = time.perf_counter()
+        saver.save_xml_markers(highlights, path, 'benchmark')
+        elapsed = time.perf_counter() - began
+        # tracemalloc은 실행을 크게 느리게 하므로 최대 메모리는 따로 측정
+        gc.collect()
+        tracemalloc.start()
+        saver.save_xml_markers(highlights, path, 'benchmark')
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"XmemlWriter     {elapsed * 1000:8.1f} ms  peak {peak / 1024 / 1024:8.2f} MiB  "
+              f"file {os.path.getsize(path) / 1024 / 1024:8.2f} MiB")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="하이라이트 저장/내보내기 성능 측정")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    memory_parser = subparsers.add_parser('memory', help="하이라이트당 메모리 사용량")
+    memory_parser.add_argument('--count', type=int, default=200000)
+    shift_parser = subparsers.add_parser('shift', help="구간 시간 이동 소요 시간")
+    shift_parser.add_argument('--count', type=int, default=100000)
+    session_parser = subparsers.add_parser('session', help="세션 파일 크기/저장/불러오기 시간 (JSON, 압축, 델타 형식)")
+    session_parser.add_argument('--count', type=int, default=50000)
+    xml_parser = subparsers.add_parser('xml', help="XML 마커 파일 작성 시간/최대 메모리")
+    xml_parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+    if args.command == 'memory':
+        bench_memory(args.count)
+    elif args.command == 'shift':
+        bench_shift(args.count)
+    elif args.command == 'session':
+        bench_session(args.count)
+    elif args.command == 'xml':
+        bench_xml(args.count)
+    else:
+        sys.exit(1)
@@ -0,0 +1,115 @@
+import time
+import threading
+import logging
+from typing import Dict, List, Optional
+
+class ClockEngine:
+    """
+    모든 타이머가 공유하는 단일 클럭 스레드.
+    time.monotonic() 기준으로 동작하므로 NTP 등 시스템 시계 변경의 영향을 받지 않으며,
+    구독자가 알려주는 다음 초 경계(deadline)까지 대기한 뒤 틱을 전달한다.
+
+    구독자는 다음 두 메서드를 구현해야 한다.
+    - next_deadline() -> Optional[float]: 다음 틱의 monotonic 시각 (대기할 틱이 없으면 None)
+    - on_tick(now: float): 틱 처리. 호출 후 next_deadline()은 미래 시각을 반환해야 함
+    """
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._subscribers: List = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # 지터 통계 (초 단위, 예정 시각 대비 실제 틱 지연)
+        self.tick_count = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+
+    def subscribe(self, subscriber):
+        with self._cond:
+            if subscriber not in self._subscribers:
+                self._subscribers.append(subscriber)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def unsubscribe(self, subscriber):
+        with self._cond:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            self._cond.notify()
+
+    def wake(self):
+        """구독자의 상태(시작/일시정지/시간 수정)가 바뀌었을 때 대기 시각을 다시 계산하도록 깨운다."""
+        with self._cond:
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def get_jitter_stats(self) -> Dict[str, float]:
+        with self._cond:
+            mean = self.total_jitter / self.tick_count if self.tick_count else 0.0
+            return {
+                'ticks': self.tick_count,
+                'last_ms': self.last_jitter * 1000,
+                'max_ms': self.max_jitter * 1000,
+                'mean_ms': mean * 1000,
+            }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="ClockEngine", daemon=True)
+            self._thread.start()
+            self.logger.debug("Clock engine thread started")
+
+    def _record_jitter(self, jitter: float):
+        self.tick_count += 1
+        self.last_jitter = jitter
+        self.total_jitter += jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    self.logger.debug("Clock engine thread stopped")
+                    return
+                now = time.monotonic()
+                due = []
+                next_deadline = None
+                for subscriber in self._subscribers:
+                    deadline = subscriber.next_deadline()
+                    if deadline is None:
+                        continue
+                    if deadline <= now:
+                        due.append((subscriber, deadline))
+                    elif next_deadline is None or deadline < next_deadline:
+                        next_deadline = deadline
+                if not due:
+                    self._cond.wait(None if next_deadline is None else next_deadline - now)
+                    continue
+                for _, deadline in due:
+                    self._record_jitter(now - deadline)
+            # 콜백은 락 밖에서 호출 (콜백 안에서 wake/subscribe 가능하도록)
+            for subscriber, _ in due:
+                try:
+                    subscriber.on_tick(now)
+                except Exception as e:
+                    self.logger.error(f"Error in clock tick: {str(e)}")
+
+_default_engine: Optional[ClockEngine] = None
+_default_lock = threading.Lock()
+
+def get_default_clock() -> ClockEngine:
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = ClockEngine()
+        return _default_engine
@@ -0,0 +1,82 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from models import Highlight, row_from_dict
+
+Row = Tuple[int, int, str]
+
+class HighlightColumns:
+    """
+    대량 하이라이트용 컬럼 저장소.
+    시작/종료 시각(ms)은 array에, 메모는 중복을 제거한 테이블의 번호로 저장하므로
+    Highlight 객체를 만들지 않고도 순회/저장/내보내기를 할 수 있다.
+    """
+    __slots__ = ('starts', 'ends', 'memo_ids', 'memos', '_memo_lookup')
+
+    def __init__(self):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.memo_ids = array('l')
+        self.memos: List[str] = []
+        self._memo_lookup: Dict[str, int] = {}
+
+    @classmethod
+    def from_highlights(cls, highlights: Iterable[Highlight]) -> 'HighlightColumns':
+        columns = cls()
+        for h in highlights:
+            columns.append(h.start_ms, h.end_ms, h.memo)
+        return columns
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Dict[str, Any]]) -> 'HighlightColumns':
+        """세션 JSON의 하이라이트 항목 (이전 초 단위 형식 포함)"""
+        columns = cls()
+        for item in items:
+            columns.append(*row_from_dict(item))
+        return columns
+
+    def _intern(self, memo: str) -> int:
+        memo_id = self._memo_lookup.get(memo)
+        if memo_id is None:
+            memo_id = len(self.memos)
+            self.memos.append(memo)
+            self._memo_lookup[memo] = memo_id
+        return memo_id
+
+    def append(self, start_ms: int, end_ms: int, memo: str):
+        self.starts.append(start_ms)
+        self.ends.append(end_ms)
+        self.memo_ids.append(self._intern(memo))
+
+    def extend_block(self, starts: array, ends: array, local_ids: Iterable[int], memos: List[str]):
+        """블록 단위로 추가. local_ids는 memos(블록 자체 메모 테이블)의 번호"""
+        mapping = [self._intern(memo) for memo in memos]
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.memo_ids.extend(array('l', map(mapping.__getitem__, local_ids)))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Highlight:
+        return Highlight(self.starts[index], self.ends[index], self.memos[self.memo_ids[index]])
+
+    def __iter__(self) -> Iterator[Highlight]:
+        for start, end, memo in self.rows():
+            yield Highlight(start, end, memo)
+
+    def rows(self) -> Iterator[Row]:
+        memos = self.memos
+        return zip(self.starts, self.ends, (memos[i] for i in self.memo_ids))
+
+    def to_dicts(self) -> Iterator[Dict[str, Any]]:
+        for start, end, memo in self.rows():
+            yield {'start_ms': start, 'end_ms': end, 'memo': memo}
+
+    def max_end(self, default: int = 0) -> int:
+        return max(self.ends) if self.ends else default
+
+def iter_rows(highlights: Union[HighlightColumns, Iterable[Highlight], Iterable[Row]]) -> Iterator[Row]:
+    """Highlight 목록, HighlightColumns, (start_ms, end_ms, memo) 튜플 목록을 모두 튜플로 순회"""
+    if isinstance(highlights, HighlightColumns):
+        return highlights.rows()
+    return (h if isinstance(h, tuple) else (h.start_ms, h.end_ms, h.memo) for h in highlights)
@@ -1,7 +1,15 @@
-from typing import Optional, List
+import sys
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, List
 from models import Highlight
 import logging
 
+def _highlight_size(highlight: Highlight) -> int:
+    return sys.getsizeof(highlight) + sys.getsizeof(highlight.memo)
+
+def _row(highlight: Highlight) -> list:
+    return [highlight.start_ms, highlight.end_ms, highlight.memo]
+
 class Command:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -12,20 +20,126 @@ class Command:
     def undo(self):
         pass
 
+    def size_bytes(self) -> int:
+        """실행 취소 기록 용량 제한에 쓰이는 대략적인 메모리 사용량"""
+        return sys.getsizeof(self)
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        """저널에 남길 JSON 레코드 (실행 직후의 값 기준). 다시 만들 수 없는 명령은 None"""
+        return None
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        """
+        실행 취소 직후 저널에 남길, 같은 변경을 만드는 명령 레코드.
+        재생 시 실행 취소 기록은 체크포인트 이전 명령을 갖고 있지 않으므로 '취소'가 아니라 구체적인 명령으로 남긴다.
+        """
+        return None
+
+class CompoundCommand(Command):
+    """여러 명령을 하나의 트랜잭션으로 실행. 실행 취소 기록에는 한 항목으로 남는다."""
+    def __init__(self, commands: List[Command], name: str = ""):
+        super().__init__()
+        self.commands = list(commands)
+        self.name = name
+
+    def execute(self):
+        done: List[Command] = []
+        try:
+            for command in self.commands:
+                command.execute()
+                done.append(command)
+            self.logger.debug("CompoundCommand executed: %s (%d commands)", self.name, len(self.commands))
+        except Exception as e:
+            # 일부만 실행된 상태로 남지 않도록 되돌림
+            self.logger.error(f"Error in CompoundCommand execute, rolling back: %s", str(e))
+            for command in reversed(done):
+                command.undo()
+            raise
+
+    def undo(self):
+        done: List[Command] = []
+        try:
+            for command in reversed(self.commands):
+                command.undo()
+                done.append(command)
+            self.logger.debug("CompoundCommand undone: %s (%d commands)", self.name, len(self.commands))
+        except Exception as e:
+            self.logger.error(f"Error in CompoundCommand undo, rolling back: %s", str(e))
+            for command in reversed(done):
+                command.execute()
+            raise
+
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self) + sum(command.size_bytes() for command in self.commands)
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        records = [command.to_record() for command in self.commands]
+        if any(record is None for record in records):
+            return None
+        return {'type': 'compound', 'name': self.name, 'commands': records}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        records = [command.inverse_record() for command in reversed(self.commands)]
+        if any(record is None for record in records):
+            return None
+        return {'type': 'compound', 'name': self.name, 'commands': records}
+
 class CommandManager:
-    def __init__(self):
+    def __init__(self, max_commands: int = 500, max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param max_commands: 실행 취소 기록 최대 개수
+        :param max_bytes: 실행 취소/다시 실행 기록의 최대 메모리 (넘으면 오래된 기록부터 삭제)
+        """
         self.logger = logging.getLogger(__name__)
-        self.undo_stack: List[Command] = []
+        self.undo_stack: Deque[Command] = deque()
         self.redo_stack: List[Command] = []
+        self.max_commands = max_commands
+        self.max_bytes = max_bytes
+        self.history_bytes = 0
+        self._sizes = {}  # id(command) -> size_bytes
+        # 저널 기록용. 명령 실행 전 ('begin', command), 성공 후 ('execute' | 'undo' | 'redo', command),
+        # 실패 시 ('abort', command)로 호출
+        self.listener: Optional[Callable[[str, Command], None]] = None
+
+    def _notify(self, action: str, command: Command):
+        if self.listener is not None:
+            try:
+                self.listener(action, command)
+            except Exception as e:
+                self.logger.error(f"Error in command listener: %s", str(e))
+
+    def _track(self, command: Command):
+        if id(command) not in self._sizes:
+            size = command.size_bytes()
+            self._sizes[id(command)] = size
+            self.history_bytes += size
+
+    def _untrack(self, command: Command):
+        self.history_bytes -= self._sizes.pop(id(command), 0)
+
+    def _evict(self):
+        """개수/용량 제한을 넘으면 가장 오래된 실행 취소 기록부터 삭제 (가장 최근 항목은 유지)"""
+        while len(self.undo_stack) > 1 and (
+                len(self.undo_stack) > self.max_commands or self.history_bytes > self.max_bytes):
+            command = self.undo_stack.popleft()
+            self._untrack(command)
+            self.logger.debug("Evicted oldest undo entry: %s", command.__class__.__name__)
 
     def execute(self, command: Command) -> bool:
         try:
+            self._notify('begin', command)
             command.execute()
             self.undo_stack.append(command)
+            for dropped in self.redo_stack:
+                self._untrack(dropped)
             self.redo_stack.clear()
+            self._track(command)
+            self._evict()
+            self._notify('execute', command)
             self.logger.debug("Command executed: %s", command.__class__.__name__)
             return True
         except Exception as e:
+            self._notify('abort', command)
             self.logger.error(f"Error executing command %s: %s", command.__class__.__name__, str(e))
             return False
 
@@ -34,8 +148,15 @@ class CommandManager:
             if not self.undo_stack:
                 return False
             command = self.undo_stack.pop()
-            command.undo()
+            self._notify('begin', command)
+            try:
+                command.undo()
+            except Exception:
+                self.undo_stack.append(command)
+                self._notify('abort', command)
+                raise
             self.redo_stack.append(command)
+            self._notify('undo', command)
             self.logger.debug("Undo command: %s", command.__class__.__name__)
             return True
         except Exception as e:
@@ -47,8 +168,15 @@ class CommandManager:
             if not self.redo_stack:
                 return False
             command = self.redo_stack.pop()
-            command.execute()
+            self._notify('begin', command)
+            try:
+                command.execute()
+            except Exception:
+                self.redo_stack.append(command)
+                self._notify('abort', command)
+                raise
             self.undo_stack.append(command)
+            self._notify('redo', command)
             self.logger.debug("Redo command: %s", command.__class__.__name__)
             return True
         except Exception as e:
@@ -69,85 +197,218 @@ class AddHighlightCommand(Command):
             self.logger.error(f"Error in AddHighlightCommand execute: %s", str(e))
             raise
 
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self) + _highlight_size(self.highlight)
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'add', 'highlight': _row(self.highlight)}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'delete', 'highlight': _row(self.highlight)}
+
     def undo(self):
         try:
-            index = len(self.manager.get_highlights()) - 1
-            if index >= 0:
-                self.manager.remove_highlight(index)
-                self.logger.debug("AddHighlightCommand undone")
+            # 목록은 시작 시각 순이므로 마지막 항목이 아니라 추가했던 객체를 삭제
+            self.manager.remove(self.highlight)
+            self.logger.debug("AddHighlightCommand undone")
         except Exception as e:
             self.logger.error(f"Error in AddHighlightCommand undo: %s", str(e))
             raise
 
 class DeleteHighlightCommand(Command):
-    def __init__(self, manager, index: int):
+    def __init__(self, manager, highlight: Highlight):
         super().__init__()
         self.manager = manager
-        self.index = index
-        self.highlight: Optional[Highlight] = None
+        self.highlight = highlight
 
     def execute(self):
         try:
-            self.highlight = self.manager.get_highlights()[self.index]
-            self.manager.remove_highlight(self.index)
-            self.logger.debug("DeleteHighlightCommand executed at index %d", self.index)
+            index = self.manager.remove(self.highlight)
+            self.logger.debug("DeleteHighlightCommand executed at index %d", index)
         except Exception as e:
             self.logger.error(f"Error in DeleteHighlightCommand execute: %s", str(e))
             raise
 
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self) + _highlight_size(self.highlight)
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'delete', 'highlight': _row(self.highlight)}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'add', 'highlight': _row(self.highlight)}
+
     def undo(self):
         try:
-            if self.highlight is not None:
-                self.manager.get_highlights().insert(self.index, self.highlight)
-                self.logger.debug("DeleteHighlightCommand undone at index %d", self.index)
+            index = self.manager.add_highlight(self.highlight)
+            self.logger.debug("DeleteHighlightCommand undone at index %d", index)
         except Exception as e:
             self.logger.error(f"Error in DeleteHighlightCommand undo: %s", str(e))
             raise
 
 class EditHighlightCommand(Command):
-    def __init__(self, manager, index: int, new_highlight: Highlight):
+    def __init__(self, manager, old_highlight: Highlight, new_highlight: Highlight):
         super().__init__()
         self.manager = manager
-        self.index = index
+        self.old_highlight = old_highlight
         self.new_highlight = new_highlight
-        self.old_highlight: Optional[Highlight] = None
 
     def execute(self):
         try:
-            self.old_highlight = self.manager.get_highlights()[self.index]
-            self.manager.update_highlight(self.index, self.new_highlight)
-            self.logger.debug("EditHighlightCommand executed at index %d", self.index)
+            index = self.manager.replace_highlight(self.old_highlight, self.new_highlight)
+            self.logger.debug("EditHighlightCommand executed at index %d", index)
         except Exception as e:
             self.logger.error(f"Error in EditHighlightCommand execute: %s", str(e))
             raise
 
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self) + _highlight_size(self.old_highlight) + _highlight_size(self.new_highlight)
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'edit', 'old': _row(self.old_highlight), 'new': _row(self.new_highlight)}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'edit', 'old': _row(self.new_highlight), 'new': _row(self.old_highlight)}
+
     def undo(self):
         try:
-            if self.old_highlight is not None:
-                self.manager.update_highlight(self.index, self.old_highlight)
-                self.logger.debug("EditHighlightCommand undone at index %d", self.index)
+            index = self.manager.replace_highlight(self.new_highlight, self.old_highlight)
+            self.logger.debug("EditHighlightCommand undone at index %d", index)
         except Exception as e:
             self.logger.error(f"Error in EditHighlightCommand undo: %s", str(e))
             raise
 
+class ShiftHighlightsCommand(Command):
+    """시작 시각이 [start_ms, end_ms]인 하이라이트를 모두 delta_ms만큼 이동 (개수와 무관하게 기록 한 항목)"""
+    def __init__(self, manager, start_ms: int, end_ms: int, delta_ms: int):
+        super().__init__()
+        self.manager = manager
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.delta_ms = delta_ms
+        self._token = None
+        self._inverse: Optional[Dict[str, Any]] = None
+
+    def execute(self):
+        try:
+            self._token = self.manager.shift_range(self.start_ms, self.end_ms, self.delta_ms)
+            self.logger.debug("ShiftHighlightsCommand executed: [%d, %d] %+d ms", self.start_ms, self.end_ms, self.delta_ms)
+        except Exception as e:
+            self.logger.error(f"Error in ShiftHighlightsCommand execute: %s", str(e))
+            raise
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'shift', 'start_ms': self.start_ms, 'end_ms': self.end_ms, 'delta_ms': self.delta_ms}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        # 되돌린 뒤 같은 범위를 반대로 옮기면 원래 범위 밖에 있던 하이라이트까지 잡힐 수 있으므로 옮겨진 항목별 수정으로 남김
+        return self._inverse
+
+    def undo(self):
+        try:
+            self._inverse = {'type': 'compound', 'name': 'shift undo', 'commands': [
+                {'type': 'edit', 'old': _row(h), 'new': [h.start_ms - self.delta_ms, h.end_ms - self.delta_ms, h.memo]}
+                for h in self.manager.shifted_highlights(self._token)]}
+            self.manager.undo_shift(self._token)
+            self._token = None
+            self.logger.debug("ShiftHighlightsCommand undone")
+        except Exception as e:
+            self.logger.error(f"Error in ShiftHighlightsCommand undo: %s", str(e))
+            raise
+
+class ReplaceHighlightsCommand(Command):
+    """하이라이트 목록 전체를 교체 (정리 결과 적용 등). 실행 취소하면 이전 목록으로 돌아감"""
+    def __init__(self, manager, new_highlights: List[Highlight], name: str = ""):
+        super().__init__()
+        self.manager = manager
+        self.old_highlights = list(manager.get_highlights())
+        self.new_highlights = list(new_highlights)
+        self.name = name
+
+    def execute(self):
+        try:
+            self.manager.replace_all(self.new_highlights)
+            self.logger.debug("ReplaceHighlightsCommand executed: %s (%d -> %d)", self.name, len(self.old_highlights), len(self.new_highlights))
+        except Exception as e:
+            self.logger.error(f"Error in ReplaceHighlightsCommand execute: %s", str(e))
+            raise
+
+    def size_bytes(self) -> int:
+        return (sys.getsizeof(self) + sum(_highlight_size(h) for h in self.old_highlights)
+                + sum(_highlight_size(h) for h in self.new_highlights))
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'replace', 'name': self.name, 'highlights': [_row(h) for h in self.new_highlights]}
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        return {'type': 'replace', 'name': self.name, 'highlights': [_row(h) for h in self.old_highlights]}
+
+    def undo(self):
+        try:
+            self.manager.replace_all(self.old_highlights)
+            self.logger.debug("ReplaceHighlightsCommand undone: %s", self.name)
+        except Exception as e:
+            self.logger.error(f"Error in ReplaceHighlightsCommand undo: %s", str(e))
+            raise
+
 class EditTimeCommand(Command):
     def __init__(self, timer_manager, old_time: int, new_time: int):
         super().__init__()
         self.timer_manager = timer_manager
         self.old_time = old_time
         self.new_time = new_time
+        self.old_anchor = timer_manager.last_correction_ms
+        self.new_anchor: Optional[int] = None  # 실행 후 마지막 보정 시점 (기본: new_time)
+        self.shift_command: Optional[ShiftHighlightsCommand] = None
+
+    def shift_highlights_with(self, highlight_manager):
+        """
+        시간 수정과 함께 마지막 보정 이후(잘못된 시계로) 기록된 하이라이트도 같은 만큼 이동.
+        실행 취소하면 타이머와 하이라이트가 함께 되돌아간다.
+        """
+        self.shift_command = ShiftHighlightsCommand(
+            highlight_manager, self.old_anchor, self.old_time, self.new_time - self.old_time)
 
     def execute(self):
         try:
-            self.timer_manager.set_time(self.new_time)
+            if self.shift_command is not None:
+                self.shift_command.execute()
+            self.timer_manager.set_time(self.new_time, self.new_anchor)
             self.logger.debug("EditTimeCommand executed: %d -> %d", self.old_time, self.new_time)
         except Exception as e:
             self.logger.error(f"Error in EditTimeCommand execute: %s", str(e))
             raise
 
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        return {
+            'type': 'time',
+            'old_time': self.old_time,
+            'new_time': self.new_time,
+            'old_anchor': self.old_anchor,
+            'shift': self.shift_command is not None,
+        }
+
+    def inverse_record(self) -> Optional[Dict[str, Any]]:
+        record = {
+            'type': 'time',
+            'old_time': self.new_time,
+            'new_time': self.old_time,
+            'old_anchor': self.new_time if self.new_anchor is None else self.new_anchor,
+            'new_anchor': self.old_anchor,
+            'shift': False,
+        }
+        if self.shift_command is None:
+            return record
+        shift = self.shift_command.inverse_record()
+        if shift is None:
+            return None
+        return {'type': 'compound', 'name': 'time undo', 'commands': [record, shift]}
+
     def undo(self):
         try:
-            self.timer_manager.set_time(self.old_time)
+            self.timer_manager.set_time(self.old_time, self.old_anchor)
+            if self.shift_command is not None:
+                self.shift_command.undo()
             self.logger.debug("EditTimeCommand undone: %d -> %d", self.new_time, self.old_time)
         except Exception as e:
             self.logger.error(f"Error in EditTimeCommand undo: %s", str(e))
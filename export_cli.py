@@ -0,0 +1,202 @@
+"""
+세션 일괄 내보내기 (대회 하루치 세션을 GUI 없이 한 번에).
+    python export_cli.py autosaves/sessions
+    python export_cli.py session_20240601_*.hls --output exports --formats text xmeml csv
+    python export_cli.py autosaves/sessions.db --workers 8
+세션 파일(.json/.hls/.hld), 세션 폴더, SQLite 세션 DB(.db)를 받아 세션 단위로 CPU 코어 수만큼의 프로세스에서 내보낸다.
+출력 이름은 '<세션 이름>_<매치 번호 2자리>_<매치 이름>' (예: session_20240601_093000_01_1경기.txt)이며
+형식/템플릿/정리 옵션은 GUI와 같은 settings.json을 따른다 (명령행 인자가 우선).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from columns import Row
+from normalize import NormalizeOptions, normalize_highlights
+from session_format import highlight_rows, is_session_file, read_session
+from storage_sqlite import SqliteSessionStore, session_id_of
+from timecode import FrameRate
+from exporters import ExportSnapshot, available_formats, export_all, resolve_formats, safe_name
+
+DEFAULT_SETTINGS = 'autosaves/settings.json'
+DEFAULT_OUTPUT = 'exports'
+
+@dataclass(frozen=True)
+class ExportJob:
+    """
+    프로세스 하나가 처리할 세션 하나 (프로세스 간에 전달되므로 값만 가짐).
+    :param source: 세션 파일 경로 또는 DB 경로
+    :param session: DB 세션 참조 ('sqlite:<id>', 파일이면 None)
+    :param stem: 출력 이름 앞부분 (세션 이름)
+    """
+    source: str
+    session: Optional[str]
+    stem: str
+    output_dir: str
+    formats: Tuple[str, ...]
+    template_name: Optional[str] = None
+    frame_rate: FrameRate = FrameRate.parse(60)
+    normalize: NormalizeOptions = NormalizeOptions()
+    skip_empty: bool = True
+
+@dataclass
+class JobReport:
+    stem: str
+    matches: int = 0
+    highlights: int = 0
+    files: int = 0
+    bytes: int = 0
+    elapsed_ms: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+def output_base(job: ExportJob, index: int, match_name: str) -> str:
+    return os.path.join(job.output_dir, f"{job.stem}_{index + 1:02}_{safe_name(match_name)}")
+
+def _load(job: ExportJob) -> Dict[str, Any]:
+    if job.session is None:
+        return read_session(job.source)
+    store = SqliteSessionStore(job.source)
+    try:
+        return store.load_session(job.session)
+    finally:
+        store.close()
+
+def export_job(job: ExportJob) -> JobReport:
+    """세션 하나의 매치별 하이라이트를 GUI 저장과 같은 방식(정리 옵션 → 스냅샷 → export_all)으로 내보냄"""
+    report = JobReport(job.stem)
+    began = time.perf_counter()
+    try:
+        data = _load(job)
+        if not data:
+            raise ValueError("세션을 찾을 수 없습니다.")
+        for index, match in enumerate(data.get('matches', [])):
+            rows: List[Row] = list(highlight_rows(match.get('highlights', [])))
+            if not rows and job.skip_empty:
+                continue
+            if job.normalize.enabled:
+                rows = list(normalize_highlights(rows, job.normalize).rows())
+            base_path = output_base(job, index, match.get('name') or f"매치 {index + 1}")
+            snapshot = ExportSnapshot.capture(os.path.basename(base_path), rows, job.frame_rate, job.template_name)
+            # 프로세스 단위로 이미 병렬이므로 형식은 순서대로 씀
+            results = export_all(snapshot, base_path, job.formats, max_workers=1)
+            report.matches += 1
+            report.highlights += len(rows)
+            for result in results:
+                if result.ok:
+                    report.files += 1
+                    report.bytes += os.path.getsize(result.path)
+                else:
+                    report.errors.append(f"{os.path.basename(result.path)}: {result.error}")
+    except Exception as e:
+        report.errors.append(str(e))
+    report.elapsed_ms = (time.perf_counter() - began) * 1000
+    return report
+
+def collect_sources(paths: Sequence[str]) -> List[Tuple[str, Optional[str], str]]:
+    """
+    인자를 (source, session, stem) 목록으로. 폴더는 세션 파일을, .db는 모든 세션을 펼친다.
+    이름순으로 정렬해 같은 입력이면 항상 같은 순서/이름이 되며, 세션 이름이 겹치면 '-2', '-3'을 붙인다.
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            sources.extend((os.path.join(path, name), None, os.path.splitext(name)[0])
+                           for name in sorted(os.listdir(path)) if is_session_file(name))
+        elif path.endswith('.db') and os.path.isfile(path):
+            store = SqliteSessionStore(path)
+            try:
+                refs = sorted((entry['file'] for entry in store.list_sessions()), key=session_id_of)
+            finally:
+                store.close()
+            sources.extend((path, ref, ref.replace(':', '_')) for ref in refs)
+        elif os.path.isfile(path):
+            sources.append((path, None, os.path.splitext(os.path.basename(path))[0]))
+        else:
+            raise FileNotFoundError(f"세션 파일을 찾을 수 없습니다: {path}")
+    seen: Dict[str, int] = {}
+    unique = []
+    for source, session, stem in sources:
+        seen[stem] = seen.get(stem, 0) + 1
+        unique.append((source, session, stem if seen[stem] == 1 else f"{stem}-{seen[stem]}"))
+    return unique
+
+def load_settings(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def run(jobs: Sequence[ExportJob], workers: Optional[int] = None) -> List[JobReport]:
+    """세션별로 프로세스 풀에서 내보냄. 결과는 jobs 순서대로"""
+    if not jobs:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        return [export_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(export_job, jobs))
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    format_keys = [key for key, _ in available_formats()]
+    parser = argparse.ArgumentParser(description="세션 파일 일괄 내보내기")
+    parser.add_argument('paths', nargs='*', default=['autosaves/sessions'],
+                        help="세션 파일, 세션 폴더 또는 세션 DB(.db) (기본: autosaves/sessions)")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help=f"출력 폴더 (기본: {DEFAULT_OUTPUT})")
+    parser.add_argument('--formats', nargs='+', choices=format_keys, help="내보낼 형식 (기본: settings.json의 export_formats)")
+    parser.add_argument('--template', help="xmeml 템플릿 프리셋 이름 또는 파일 경로")
+    parser.add_argument('--frame-rate', help="프레임 속도 (예: 60, 25, 29.97, 59.94df, 기본: settings.json의 frame_rate, "
+                                             "템플릿의 timebase 지시문이 우선)")
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--settings', default=DEFAULT_SETTINGS, help=f"설정 파일 (기본: {DEFAULT_SETTINGS})")
+    parser.add_argument('--include-empty', action='store_true', help="하이라이트가 없는 매치도 내보냄")
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.settings)
+    formats = tuple(resolve_formats(args.formats or settings.get('export_formats')))
+    template_name = args.template or settings.get('xmeml_template')
+    options = NormalizeOptions.from_settings(settings)
+    try:
+        frame_rate = FrameRate.parse(args.frame_rate or settings.get('frame_rate'))
+    except ValueError as e:
+        print(f"오류: {str(e)}")
+        return 1
+    try:
+        sources = collect_sources(args.paths)
+    except Exception as e:
+        print(f"오류: {str(e)}")
+        return 1
+    jobs = [ExportJob(source, session, stem, args.output, formats, template_name, frame_rate, options,
+                      not args.include_empty)
+            for source, session, stem in sources]
+    if not jobs:
+        print("내보낼 세션이 없습니다.")
+        return 1
+
+    began = time.perf_counter()
+    reports = run(jobs, args.workers)
+    elapsed = time.perf_counter() - began
+    for report in reports:
+        status = "실패" if report.errors else "완료"
+        print(f"{report.stem}: 매치 {report.matches}, 하이라이트 {report.highlights}, 파일 {report.files} "
+              f"({report.elapsed_ms:.0f} ms) {status}")
+        for error in report.errors:
+            print(f"  오류: {error}")
+    highlights = sum(report.highlights for report in reports)
+    size = sum(report.bytes for report in reports)
+    print(f"세션 {len(reports)}개, 매치 {sum(report.matches for report in reports)}개, "
+          f"하이라이트 {highlights}개, 파일 {sum(report.files for report in reports)}개 "
+          f"({size / 1024 / 1024:.2f} MiB) → {args.output}")
+    print(f"{elapsed:.2f}s, 세션 {len(reports) / elapsed:.1f}개/s, 하이라이트 {highlights / elapsed:,.0f}개/s, "
+          f"{size / 1024 / 1024 / elapsed:.1f} MiB/s")
+    return 1 if any(report.errors for report in reports) else 0
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
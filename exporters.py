@@ -0,0 +1,267 @@
+import os
+import re
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from models import Highlight, display_string, format_time
+from columns import HighlightColumns, Row, iter_rows
+from xmeml_writer import XmemlWriter
+from xmeml_template import load_template
+from timecode import FrameRate
+import logging
+
+DEFAULT_FORMATS = ('text', 'xmeml')
+DEFAULT_DURATION_MS = 107700 * 1000  # 하이라이트가 없을 때 시퀀스 길이 (기존 XML과 같음)
+_UNSAFE = re.compile(r'[\\/:*?"<>|\s]+')
+
+@dataclass(frozen=True)
+class ExportSnapshot:
+    """
+    내보내기용 불변 스냅샷. 한 번 만든 뒤 여러 내보내기 스레드가 함께 읽는다.
+    :param name: 시퀀스/문서 이름 (저장 파일 이름에서 확장자를 뺀 것)
+    :param rows: (start_ms, end_ms, memo) 튜플
+    :param frame_rate: 프레임 속도 (xmeml은 템플릿의 timebase 지시문이 우선)
+    :param template_name: xmeml 템플릿 (프리셋 이름 또는 파일 경로)
+    """
+    name: str
+    rows: Tuple[Row, ...]
+    frame_rate: FrameRate = FrameRate.parse(60)
+    template_name: Optional[str] = None
+
+    @classmethod
+    def capture(cls, name: str, highlights: Union[List[Highlight], HighlightColumns],
+                frame_rate: Union[FrameRate, int, str] = 60, template_name: Optional[str] = None) -> 'ExportSnapshot':
+        return cls(name, tuple(iter_rows(highlights)), FrameRate.parse(frame_rate), template_name)
+
+    @property
+    def duration_ms(self) -> int:
+        return max((end for _, end, _ in self.rows), default=DEFAULT_DURATION_MS)
+
+@dataclass
+class ExportResult:
+    key: str
+    path: str
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class Exporter:
+    """
+    내보내기 형식 하나. 하위 클래스는 key/label/suffix를 정하고 write()를 구현한다.
+    저장 경로는 '<기본 경로><suffix>' (예: 경기1.txt, 경기1_markers.xml)
+    """
+    key = ''
+    label = ''
+    suffix = ''
+
+    def path_for(self, base_path: str) -> str:
+        return base_path + self.suffix
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        raise NotImplementedError
+
+def safe_name(name: str) -> str:
+    """파일 이름에 쓸 수 없는 문자와 공백을 '_'로 (매치 이름으로 출력 파일 이름을 만들 때)"""
+    return _UNSAFE.sub('_', name).strip('._') or 'match'
+
+def _frames(snapshot: ExportSnapshot) -> Tuple[List[int], List[int]]:
+    """모든 하이라이트의 시작/끝 프레임 (한 번에 변환)"""
+    rate = snapshot.frame_rate
+    return (rate.ms_to_frames_many([start for start, _, _ in snapshot.rows]),
+            rate.ms_to_frames_many([end for _, end, _ in snapshot.rows]))
+
+def _clock(ms: int, separator: str) -> str:
+    """HH:MM:SS,mmm (SRT) / HH:MM:SS.mmm (WebVTT)"""
+    seconds, millis = divmod(int(ms), 1000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{hour:02}:{minute:02}:{second:02}{separator}{millis:03}"
+
+def _one_line(memo: str) -> str:
+    return ' '.join(memo.split())
+
+class TextExporter(Exporter):
+    key, label, suffix = 'text', '텍스트 (.txt)', '.txt'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(display_string(*row) + '\n' for row in snapshot.rows)
+
+def write_xmeml(path: str, name: str, highlights: Union[List[Highlight], HighlightColumns, Sequence[Row]],
+                frame_rate: Union[FrameRate, int, str] = 60, template_name: Optional[str] = None):
+    """
+    Premiere Pro 호환 xmeml 마커 파일. 정적인 시퀀스 골격은 캐시된 템플릿에서,
+    이름/길이/마커만 끼워 넣어 순서대로 기록한다 (템플릿의 timebase 지시문이 frame_rate보다 우선).
+    NTSC 속도(29.97 등)는 timebase 30, ntsc TRUE로 쓰고 프레임 번호는 실제 속도로 계산한다.
+    """
+    template = load_template(template_name)
+    frame_rate = template.frame_rate or FrameRate.parse(frame_rate)
+    duration_ms = max((end for _, end, _ in iter_rows(highlights)), default=DEFAULT_DURATION_MS)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        template.render(f, name, frame_rate.ms_to_frames(duration_ms), frame_rate, highlights)
+
+class XmemlExporter(Exporter):
+    key, label, suffix = 'xmeml', 'Premiere 마커 (.xml)', '_markers.xml'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        write_xmeml(path, snapshot.name, snapshot.rows, snapshot.frame_rate, snapshot.template_name)
+
+class CsvExporter(Exporter):
+    key, label, suffix = 'csv', 'CSV (.csv)', '.csv'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        rate = snapshot.frame_rate
+        starts, ends = _frames(snapshot)
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['start', 'end', 'start_ms', 'end_ms', 'start_tc', 'end_tc', 'memo'])
+            writer.writerows((format_time(start, True), format_time(end, True), start, end,
+                              rate.timecode(start_frame), rate.timecode(end_frame), memo)
+                             for (start, end, memo), start_frame, end_frame in zip(snapshot.rows, starts, ends))
+
+class EdlExporter(Exporter):
+    """CMX3600 EDL. 하이라이트마다 이벤트 하나 (소스/레코드 시간 동일), 메모는 주석으로"""
+    key, label, suffix = 'edl', 'CMX3600 EDL (.edl)', '.edl'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        rate = snapshot.frame_rate
+        starts, ends = _frames(snapshot)
+        with open(path, 'w', encoding='utf-8', newline='\r\n') as f:
+            f.write(f"TITLE: {_one_line(snapshot.name)}\nFCM: {'DROP FRAME' if rate.drop_frame else 'NON-DROP FRAME'}\n\n")
+            for number, ((start, end, memo), start_frame, end_frame) in enumerate(zip(snapshot.rows, starts, ends), 1):
+                start_tc, end_tc = rate.timecode(start_frame), rate.timecode(end_frame)
+                f.write(f"{number:03}  AX       V     C        {start_tc} {end_tc} {start_tc} {end_tc}\n")
+                if memo:
+                    f.write(f"* COMMENT: {_one_line(memo)}\n")
+                f.write("\n")
+
+class FcpxmlExporter(Exporter):
+    """Final Cut Pro / DaVinci Resolve용 FCPXML 1.9. 빈 gap 하나에 마커를 붙인다"""
+    key, label, suffix = 'fcpxml', 'FCPXML (.fcpxml)', '.fcpxml'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        rate = snapshot.frame_rate
+        # 시간은 프레임 길이의 배수인 유리수 (29.97: 1001/30000s 단위)
+        step, scale = rate.rate.denominator, rate.rate.numerator
+
+        def rational(frames: int) -> str:
+            return f"{frames * step}/{scale}s"
+
+        starts, ends = _frames(snapshot)
+        format_name = f"FFVideoFormat1080p{round(rate.rate * 100) if rate.ntsc else rate.timebase}"
+
+        with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            w = XmemlWriter(f)
+            w.declaration("UTF-8")
+            w.raw("<!DOCTYPE fcpxml>\n")
+            w.start("fcpxml", [("version", "1.9")])
+            w.start("resources")
+            w.element("format", "", [("id", "r1"), ("name", format_name),
+                                     ("frameDuration", rational(1)), ("width", "1920"), ("height", "1080")])
+            w.end()
+            w.start("library")
+            w.start("event", [("name", snapshot.name)])
+            w.start("project", [("name", snapshot.name)])
+            duration = rational(rate.ms_to_frames(snapshot.duration_ms))
+            w.start("sequence", [("format", "r1"), ("duration", duration), ("tcStart", "0s"),
+                                 ("tcFormat", "DF" if rate.drop_frame else "NDF")])
+            w.start("spine")
+            w.start("gap", [("name", "Gap"), ("offset", "0s"), ("start", "0s"), ("duration", duration)])
+            for (_, _, memo), start, end in zip(snapshot.rows, starts, ends):
+                w.element("marker", "", [("start", rational(start)), ("duration", rational(max(end - start, 1))),
+                                         ("value", _one_line(memo))])
+            for _ in range(7):  # gap, spine, sequence, project, event, library, fcpxml
+                w.end()
+            w.close()
+
+class SrtExporter(Exporter):
+    key, label, suffix = 'srt', 'SRT 챕터 (.srt)', '.srt'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for number, (start, end, memo) in enumerate(snapshot.rows, 1):
+                f.write(f"{number}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{_one_line(memo) or '-'}\n\n")
+
+class VttExporter(Exporter):
+    key, label, suffix = 'vtt', 'WebVTT 챕터 (.vtt)', '.vtt'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("WEBVTT\n\n")
+            for number, (start, end, memo) in enumerate(snapshot.rows, 1):
+                # '-->'는 큐 본문에 쓸 수 없음
+                text = _one_line(memo).replace('-->', '->') or '-'
+                f.write(f"{number}\n{_clock(start, '.')} --> {_clock(end, '.')}\n{text}\n\n")
+
+class JsonExporter(Exporter):
+    key, label, suffix = 'json', 'JSON (.json)', '.json'
+
+    def write(self, snapshot: ExportSnapshot, path: str):
+        data = {
+            'name': snapshot.name,
+            'frame_rate': str(snapshot.frame_rate),
+            'timebase': snapshot.frame_rate.timebase,
+            'ntsc': snapshot.frame_rate.ntsc,
+            'highlights': [{'start_ms': start, 'end_ms': end, 'memo': memo} for start, end, memo in snapshot.rows],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+EXPORTERS: Dict[str, Exporter] = {}
+
+def register(exporter: Exporter):
+    """내보내기 형식 등록 (같은 key면 교체)"""
+    EXPORTERS[exporter.key] = exporter
+
+for _exporter in (TextExporter(), XmemlExporter(), CsvExporter(), EdlExporter(), FcpxmlExporter(),
+                  SrtExporter(), VttExporter(), JsonExporter()):
+    register(_exporter)
+
+def available_formats() -> List[Tuple[str, str]]:
+    """(key, 표시 이름) — 등록 순서"""
+    return [(key, exporter.label) for key, exporter in EXPORTERS.items()]
+
+def resolve_formats(keys: Optional[Iterable[str]]) -> List[str]:
+    """알 수 없는 형식은 빼고, 하나도 없으면 기본 형식 (text, xmeml)"""
+    keys = [key for key in (keys or []) if key in EXPORTERS]
+    return keys or list(DEFAULT_FORMATS)
+
+def export_all(snapshot: ExportSnapshot, base_path: str, keys: Optional[Sequence[str]] = None,
+               max_workers: Optional[int] = None) -> List[ExportResult]:
+    """
+    선택한 형식들을 스레드 풀에서 동시에 내보냄 (모두 같은 스냅샷을 읽기만 함).
+    한 형식이 실패해도 나머지는 계속 쓰며, 결과는 keys 순서대로 반환한다.
+    """
+    logger = logging.getLogger(__name__)
+    exporters = [EXPORTERS[key] for key in resolve_formats(keys)]
+
+    def run(exporter: Exporter) -> ExportResult:
+        result = ExportResult(exporter.key, exporter.path_for(base_path))
+        began = time.perf_counter()
+        try:
+            exporter.write(snapshot, result.path)
+        except Exception as e:
+            logger.error(f"Error exporting {exporter.key}: {str(e)}")
+            result.error = str(e)
+        result.elapsed_ms = (time.perf_counter() - began) * 1000
+        logger.debug("Exported %s in %.1f ms: %s", exporter.key, result.elapsed_ms, result.path)
+        return result
+
+    directory = os.path.dirname(base_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if len(exporters) == 1:
+        return [run(exporters[0])]
+    with ThreadPoolExecutor(max_workers=max_workers or len(exporters), thread_name_prefix="Export") as pool:
+        return list(pool.map(run, exporters))
+
+def summarize(results: List[ExportResult]) -> str:
+    """상태 표시줄용 요약 (예: 'text 2ms, xmeml 41ms')"""
+    return ', '.join(f"{r.key} {r.elapsed_ms:.0f}ms" if r.ok else f"{r.key} 실패" for r in results)
@@ -0,0 +1,232 @@
+import json
+import time
+import socket
+import argparse
+import statistics
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+import logging
+
+DEFAULT_PORT = 39990
+
+def parse_sample(data: bytes) -> Dict:
+    """
+    게임 시계 패킷 해석.
+    - JSON: {"match": "매치 1", "game_ms": 123456, "sent": <송신 시각 time.time()>}
+    - 텍스트: 초 단위 숫자 또는 MM:SS (예: "754.2", "12:34")
+    """
+    text = data.decode('utf-8').strip()
+    if text.startswith('{'):
+        payload = json.loads(text)
+        if 'game_ms' in payload:
+            game_ms = float(payload['game_ms'])
+        else:
+            game_ms = float(payload['game_time']) * 1000
+        return {'match': payload.get('match'), 'game_ms': game_ms, 'sent': payload.get('sent')}
+    if ':' in text:
+        minutes, seconds = text.split(':', 1)
+        return {'match': None, 'game_ms': (int(minutes) * 60 + float(seconds)) * 1000, 'sent': None}
+    return {'match': None, 'game_ms': float(text) * 1000, 'sent': None}
+
+class _LatencyStat:
+    def __init__(self):
+        self.count = 0
+        self.last = 0.0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms: float):
+        self.count += 1
+        self.last = value_ms
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'last_ms': self.last,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'max_ms': self.max,
+        }
+
+class GameClockReceiver:
+    """
+    로컬 UDP로 들어오는 게임 시간 샘플을 받아 타이머를 점진 보정.
+    샘플마다 '게임 시계 0초에 해당하는 monotonic 시각'을 계산하고, 최근 window개의 중앙값으로
+    패킷 지터를 걸러낸 뒤 TimerManager.correct_to()로 제한된 속도(slew)로 맞춘다.
+    :param dispatch: 샘플 적용(매치 해석 + 보정)을 실행할 곳. GUI에서는 MainThreadInvoker.post를 넘겨
+                     매치 목록을 GUI 스레드에서만 읽게 한다 (기본: 수신 스레드에서 바로 실행)
+    """
+    def __init__(self, resolve_timer: Callable[[Optional[str]], object], host: str = '127.0.0.1',
+                 port: int = DEFAULT_PORT, window: int = 9, jump_threshold_ms: float = 10000,
+                 dispatch: Optional[Callable[[Callable[[], None]], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.resolve_timer = resolve_timer
+        self.dispatch = dispatch or (lambda func: func())
+        self.host = host
+        self.port = port
+        self.window = window
+        self.jump_threshold_ms = jump_threshold_ms
+        self._offsets: Dict[object, Deque[float]] = {}
+        self._pending_display: Dict[object, float] = {}
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.sample_count = 0
+        self.last_error_ms = 0.0
+        self.transit = _LatencyStat()   # 송신 → 수신
+        self.display = _LatencyStat()   # 수신 → 화면 반영
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((self.host, self.port))
+        self._sock.settimeout(0.5)
+        self.port = self._sock.getsockname()[1]
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="GameClockReceiver", daemon=True)
+        self._thread.start()
+        self.logger.debug("Game clock receiver listening on %s:%d", self.host, self.port)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                data, _ = self._sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            recv_wall, recv_mono = time.time(), time.monotonic()
+            try:
+                sample = parse_sample(data)
+            except Exception as e:
+                self.logger.warning(f"Invalid game clock packet: {str(e)}")
+                continue
+            self.dispatch(lambda: self._apply_logged(sample, recv_wall, recv_mono))
+
+    def _apply_logged(self, sample: Dict, recv_wall: float, recv_mono: float):
+        try:
+            self.apply_sample(sample, recv_wall, recv_mono)
+        except Exception as e:
+            self.logger.error(f"Error applying game clock sample: {str(e)}")
+
+    def handle_packet(self, data: bytes, recv_wall: float, recv_mono: float) -> Optional[float]:
+        """패킷 하나를 호출한 스레드에서 바로 처리. 보정 전 타이머 오차(ms)를 반환"""
+        return self.apply_sample(parse_sample(data), recv_wall, recv_mono)
+
+    def apply_sample(self, sample: Dict, recv_wall: float, recv_mono: float) -> Optional[float]:
+        """
+        샘플 하나로 타이머 보정. 보정 전 타이머 오차(ms)를 반환 (대상 타이머가 없거나 멈춰 있으면 None).
+        보정하면 타이머가 현재 값을 바로 알리므로, 화면에 반영될 때 note_displayed()가 수신부터의 지연을 잰다.
+        """
+        timer = self.resolve_timer(sample['match'])
+        if timer is None:
+            return None
+        game_ms = sample['game_ms']
+        with self._lock:
+            if sample['sent'] is not None:
+                # 같은 머신(또는 시계 동기화된 머신)의 송신 시각이 있으면 전송 지연만큼 보상
+                transit_ms = max(0.0, (recv_wall - float(sample['sent'])) * 1000)
+                self.transit.add(transit_ms)
+                game_ms += transit_ms
+            offset = game_ms - recv_mono * 1000
+            offsets = self._offsets.setdefault(timer, deque(maxlen=self.window))
+            # 게임 재시작 등으로 기준이 크게 바뀌면 이전 샘플은 버린다
+            if offsets and abs(offset - statistics.median(offsets)) >= self.jump_threshold_ms:
+                offsets.clear()
+            offsets.append(offset)
+            smoothed = statistics.median(offsets)
+            self.sample_count += 1
+        target_ms = time.monotonic() * 1000 + smoothed
+        with self._lock:
+            # 보정이 알리는 틱보다 먼저 기록해 두어야 같은 틱에서 지연을 잴 수 있음
+            self._pending_display[timer] = recv_mono
+        error = timer.correct_to(target_ms, self.jump_threshold_ms)
+        with self._lock:
+            if error is None:
+                self._pending_display.pop(timer, None)
+                return None
+            self.last_error_ms = error
+        return error
+
+    def note_displayed(self, timer):
+        """GUI가 해당 타이머의 시간을 화면에 그린 직후 호출 (보정 직후의 틱이면 수신 → 화면 반영 지연을 기록)"""
+        with self._lock:
+            recv_mono = self._pending_display.pop(timer, None)
+            if recv_mono is not None:
+                self.display.add((time.monotonic() - recv_mono) * 1000)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'samples': self.sample_count,
+                'error_ms': self.last_error_ms,
+                'transit': self.transit.to_dict(),
+                'display': self.display.to_dict(),
+            }
+
+class GameClockProducer:
+    """테스트용 로컬 게임 시계 송신기. rate로 게임 시계 속도 오차를, jitter_ms로 패킷 지터를 흉내낸다."""
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, match: Optional[str] = None,
+                 interval: float = 0.5, rate: float = 1.0, start_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.host = host
+        self.port = port
+        self.match = match
+        self.interval = interval
+        self.rate = rate
+        self.start_ms = start_ms
+        self.jitter_ms = jitter_ms
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="GameClockProducer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def run(self):
+        import random
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        began = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                game_ms = self.start_ms + (time.monotonic() - began) * 1000 * self.rate
+                if self.jitter_ms:
+                    time.sleep(random.uniform(0, self.jitter_ms) / 1000)
+                payload = {'match': self.match, 'game_ms': round(game_ms), 'sent': time.time()}
+                sock.sendto(json.dumps(payload).encode('utf-8'), (self.host, self.port))
+                self._stopped.wait(self.interval)
+        finally:
+            sock.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="테스트용 게임 시계 송신기")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--match', default=None, help="매치 이름 또는 번호 (생략 시 현재 매치)")
+    parser.add_argument('--interval', type=float, default=0.5, help="송신 간격 (초)")
+    parser.add_argument('--rate', type=float, default=1.0, help="게임 시계 속도 배율")
+    parser.add_argument('--start', type=float, default=0.0, help="시작 게임 시간 (초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="최대 송신 지터 (ms)")
+    args = parser.parse_args()
+    producer = GameClockProducer(args.host, args.port, args.match, args.interval, args.rate, args.start * 1000, args.jitter)
+    print(f"Sending game clock samples to {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        producer.run()
+    except KeyboardInterrupt:
+        pass
@@ -1,20 +1,54 @@
-from typing import List, Tuple, Optional
-from models import Highlight
-from commands import AddHighlightCommand, DeleteHighlightCommand, EditHighlightCommand
-from PyQt5.QtWidgets import QInputDialog, QWidget
+from typing import Iterable, List, Tuple, Optional
+from models import Highlight, format_time, parse_time, parse_offset
+from interval_index import IntervalIndex
+from columns import HighlightColumns
+from commands import Command, CompoundCommand, AddHighlightCommand, DeleteHighlightCommand, EditHighlightCommand, ShiftHighlightsCommand, ReplaceHighlightsCommand
+from normalize import NormalizeOptions, normalize_highlights
+from prompts import Prompter
 import logging
 
+class HighlightListener:
+    """HighlightManager 변경 알림 수신자. 필요한 메서드만 재정의한다."""
+    def highlights_about_to_insert(self, index: int):
+        pass
+
+    def highlights_inserted(self, index: int, highlight: Highlight):
+        pass
+
+    def highlights_about_to_remove(self, index: int):
+        pass
+
+    def highlights_removed(self, index: int, highlight: Highlight):
+        pass
+
+    def highlight_changed(self, index: int, highlight: Highlight):
+        pass
+
+    def highlights_about_to_reset(self):
+        pass
+
+    def highlights_reset(self):
+        pass
+
+    def recording_changed(self, start_ms: Optional[int]):
+        """기록 중인 하이라이트의 시작 시각이 바뀜 (None이면 기록 중 아님)"""
+        pass
+
 class HighlightManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.highlights: List[Highlight] = []
-        self.highlight_start_time: Optional[int] = None
+        self.index = IntervalIndex()  # 시작 시각 순 정렬된 하이라이트 구간 인덱스
+        self._list_cache: Optional[List[Highlight]] = None
+        self.listeners: List[HighlightListener] = []
+        self.highlight_start_time: Optional[int] = None  # 밀리초
 
     def start_recording(self, current_time: int) -> str:
+        """current_time: 타이머 경과 시간 (밀리초)"""
         try:
             if self.highlight_start_time is not None:
                 raise ValueError("이미 하이라이트 기록이 시작되었습니다.")
             self.highlight_start_time = current_time
+            self._notify_recording()
             return "하이라이트 기록 시작"
         except Exception as e:
             self.logger.error(f"Error starting highlight recording: {str(e)}")
@@ -29,22 +63,24 @@ class HighlightManager:
             highlight = Highlight(self.highlight_start_time, current_time, memo)
             command = AddHighlightCommand(self, highlight)
             self.highlight_start_time = None
+            self._notify_recording()
             return command, "하이라이트 기록 완료"
         except Exception as e:
             self.logger.error(f"Error stopping highlight recording: {str(e)}")
             raise
 
+    def cancel_recording(self):
+        if self.highlight_start_time is not None:
+            self.highlight_start_time = None
+            self._notify_recording()
+
     def get_recording_status(self, current_time: int) -> Optional[dict]:
         try:
             if self.highlight_start_time is not None:
-                duration = current_time - self.highlight_start_time
-                start_min = self.highlight_start_time // 60
-                start_sec = self.highlight_start_time % 60
-                end_min = current_time // 60
-                end_sec = current_time % 60
+                duration = (current_time - self.highlight_start_time) // 1000
                 return {
-                    'start': f"{start_min:02}:{start_sec:02}",
-                    'end': f"{end_min:02}:{end_sec:02}",
+                    'start': format_time(self.highlight_start_time),
+                    'end': format_time(current_time),
                     'duration': duration
                 }
             return None
@@ -52,57 +88,270 @@ class HighlightManager:
             self.logger.error(f"Error getting recording status: {str(e)}")
             return None
 
-    def add_highlight(self, highlight: Highlight):
+    def _notify_recording(self):
+        for listener in self.listeners:
+            listener.recording_changed(self.highlight_start_time)
+
+    def add_listener(self, listener: HighlightListener):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: HighlightListener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add_highlight(self, highlight: Highlight) -> int:
+        """시작 시각 순 위치에 삽입하고 그 인덱스를 반환"""
         try:
-            self.highlights.append(highlight)
-            self.logger.debug("Highlight added: %s", highlight.to_display_string())
+            index = self.index.insertion_rank(highlight)
+            for listener in self.listeners:
+                listener.highlights_about_to_insert(index)
+            self.index.insert(highlight)
+            self._list_cache = None
+            for listener in self.listeners:
+                listener.highlights_inserted(index, highlight)
+            self.logger.debug("Highlight added at index %d: %s", index, highlight.to_display_string())
+            return index
         except Exception as e:
             self.logger.error(f"Error adding highlight: {str(e)}")
             raise
 
     def delete(self, index: int) -> Tuple[Optional[DeleteHighlightCommand], Optional[str]]:
         try:
-            if index < 0 or index >= len(self.highlights):
+            if index < 0 or index >= len(self.index):
                 raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
-            command = DeleteHighlightCommand(self, index)
+            command = DeleteHighlightCommand(self, self.index[index])
             return command, "하이라이트 삭제됨"
         except Exception as e:
             self.logger.error(f"Error deleting highlight: {str(e)}")
             raise
 
+    def _highlights_for(self, indices: List[int]) -> List[Highlight]:
+        if not indices:
+            raise ValueError("선택된 하이라이트가 없습니다.")
+        for index in indices:
+            if index < 0 or index >= len(self.index):
+                raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
+        return [self.index[index] for index in sorted(set(indices))]
+
+    def delete_many(self, indices: List[int]) -> Tuple[Optional[Command], Optional[str]]:
+        """선택한 하이라이트를 한 번에 삭제 (실행 취소 한 번으로 복구)"""
+        try:
+            if len(indices) == 1:
+                return self.delete(indices[0])
+            highlights = self._highlights_for(indices)
+            command = CompoundCommand([DeleteHighlightCommand(self, h) for h in highlights], "bulk delete")
+            return command, f"하이라이트 {len(highlights)}개 삭제됨"
+        except Exception as e:
+            self.logger.error(f"Error deleting highlights: {str(e)}")
+            raise
+
+    def edit_memo_many(self, indices: List[int], memo: str) -> Tuple[Optional[Command], Optional[str]]:
+        """선택한 하이라이트의 메모를 한 번에 변경"""
+        try:
+            highlights = self._highlights_for(indices)
+            commands = [EditHighlightCommand(self, h, Highlight(h.start_ms, h.end_ms, memo)) for h in highlights]
+            return CompoundCommand(commands, "bulk edit"), f"하이라이트 {len(highlights)}개 수정됨"
+        except Exception as e:
+            self.logger.error(f"Error editing highlights: {str(e)}")
+            raise
+
+    def shift_many(self, indices: List[int], delta_ms: int) -> Tuple[Optional[Command], Optional[str]]:
+        """선택한 하이라이트의 시작/종료 시각을 delta_ms만큼 이동"""
+        try:
+            highlights = self._highlights_for(indices)
+            if any(h.start_ms + delta_ms < 0 for h in highlights):
+                raise ValueError("이동 후 시작 시간이 0보다 작아집니다.")
+            first, last = highlights[0], highlights[-1]
+            if self.index.count_range(first.start_ms, last.start_ms) == len(highlights):
+                # 선택이 시작 시각 구간 하나와 정확히 일치하면 구간 이동 한 번으로 처리
+                return self.shift_between(first.start_ms, last.start_ms, delta_ms)
+            commands = [
+                EditHighlightCommand(self, h, Highlight(h.start_ms + delta_ms, h.end_ms + delta_ms, h.memo))
+                for h in highlights
+            ]
+            return CompoundCommand(commands, "bulk shift"), f"하이라이트 {len(highlights)}개 이동됨"
+        except Exception as e:
+            self.logger.error(f"Error shifting highlights: {str(e)}")
+            raise
+
+    def shift_between(self, start_ms: int, end_ms: int, delta_ms: int) -> Tuple[Optional[Command], Optional[str]]:
+        """시작 시각이 [start_ms, end_ms]인 하이라이트를 모두 delta_ms만큼 이동하는 명령"""
+        try:
+            if start_ms < 0 or end_ms < start_ms:
+                raise ValueError("유효하지 않은 시간 범위입니다.")
+            count = self.index.count_range(start_ms, end_ms)
+            if not count:
+                raise ValueError("해당 구간에 하이라이트가 없습니다.")
+            command = ShiftHighlightsCommand(self, start_ms, end_ms, delta_ms)
+            return command, f"하이라이트 {count}개 이동됨"
+        except Exception as e:
+            self.logger.error(f"Error shifting highlights: {str(e)}")
+            raise
+
+    def shift_range(self, start_ms: int, end_ms: int, delta_ms: int) -> Tuple:
+        """
+        시작 시각이 [start_ms, end_ms]인 하이라이트와 (범위 안이면) 기록 중인 시작 시각을 이동.
+        인덱스의 구간 이동은 개수와 무관하게 O(log n)이므로 목록 뷰에는 초기화로 알린다.
+        :return: undo_shift()에 넘길 되돌리기 정보
+        """
+        try:
+            for listener in self.listeners:
+                listener.highlights_about_to_reset()
+            try:
+                token = self.index.shift_range(start_ms, end_ms, delta_ms)
+            finally:
+                self._list_cache = None
+                for listener in self.listeners:
+                    listener.highlights_reset()
+            recording = self.highlight_start_time is not None and start_ms <= self.highlight_start_time <= end_ms
+            if recording:
+                self.highlight_start_time += delta_ms
+                self._notify_recording()
+            self.logger.debug("Highlights in [%d, %d] shifted by %d ms", start_ms, end_ms, delta_ms)
+            return token, recording
+        except Exception as e:
+            self.logger.error(f"Error shifting highlight range: {str(e)}")
+            raise
+
+    def shifted_highlights(self, token: Tuple) -> List[Highlight]:
+        """shift_range()가 옮긴 하이라이트 (undo_shift 전에 호출)"""
+        return self.index.shifted(token[0])
+
+    def undo_shift(self, token: Tuple):
+        try:
+            index_token, recording = token
+            for listener in self.listeners:
+                listener.highlights_about_to_reset()
+            try:
+                self.index.undo_shift(index_token)
+            finally:
+                self._list_cache = None
+                for listener in self.listeners:
+                    listener.highlights_reset()
+            if recording and self.highlight_start_time is not None:
+                self.highlight_start_time -= index_token[-1]
+                self._notify_recording()
+            self.logger.debug("Highlight range shift undone")
+        except Exception as e:
+            self.logger.error(f"Error undoing highlight range shift: {str(e)}")
+            raise
+
+    def normalize(self, options: NormalizeOptions) -> Tuple[Optional[Command], Optional[str]]:
+        """겹치는 구간 병합/중복 제거 결과로 목록을 교체하는 명령 (변화가 없으면 명령 없음)"""
+        try:
+            highlights = self.get_highlights()
+            normalized = list(normalize_highlights(highlights, options))
+            if [(h.start_ms, h.end_ms, h.memo) for h in normalized] == [(h.start_ms, h.end_ms, h.memo) for h in highlights]:
+                return None, "정리할 하이라이트가 없습니다"
+            command = ReplaceHighlightsCommand(self, normalized, "normalize")
+            return command, f"하이라이트 정리됨 ({len(highlights)}개 -> {len(normalized)}개)"
+        except Exception as e:
+            self.logger.error(f"Error normalizing highlights: {str(e)}")
+            raise
+
+    def ask_edit_memo_many(self, indices: List[int], parent: Prompter) -> Tuple[Optional[Command], Optional[str]]:
+        try:
+            first = self._highlights_for(indices)[0]
+            memo = parent.ask_text("하이라이트 일괄 수정", f"선택한 {len(set(indices))}개의 새 메모를 입력하세요:", first.memo)
+            if memo is None:
+                return None, "하이라이트 수정 취소"
+            return self.edit_memo_many(indices, memo)
+        except Exception as e:
+            self.logger.error(f"Error editing highlights: {str(e)}")
+            raise
+
+    def ask_shift_many(self, indices: List[int], parent: Prompter) -> Tuple[Optional[Command], Optional[str]]:
+        try:
+            self._highlights_for(indices)
+            text = parent.ask_text("하이라이트 이동", "이동할 시간을 입력하세요 (예: +5, -1.5, -00:10):")
+            if text is None:
+                return None, "하이라이트 이동 취소"
+            try:
+                delta_ms = parse_offset(text)
+                return self.shift_many(indices, delta_ms)
+            except ValueError as e:
+                parent.show_warning("입력 오류", f"잘못된 시간 형식입니다: {str(e)}")
+                return None, ""
+        except Exception as e:
+            self.logger.error(f"Error shifting highlights: {str(e)}")
+            raise
+
+    def ask_shift_range(self, parent: Prompter, start_ms: int = 0) -> Tuple[Optional[Command], Optional[str]]:
+        """이동할 구간과 시간을 입력받아 구간 이동 명령 생성"""
+        try:
+            range_text = parent.ask_text("하이라이트 구간 이동", "이동할 구간을 입력하세요 (MM:SS~MM:SS, 끝을 비우면 마지막까지):", f"{format_time(start_ms, precise=True)}~")
+            if range_text is None:
+                return None, "하이라이트 이동 취소"
+            try:
+                start_text, _, end_text = range_text.partition('~')
+                start = parse_time(start_text) if start_text.strip() else 0
+                end = parse_time(end_text) if end_text.strip() else max(start, self.index[len(self.index) - 1].start_ms if len(self.index) else 0)
+                text = parent.ask_text("하이라이트 구간 이동", "이동할 시간을 입력하세요 (예: +5, -1.5, -00:10):")
+                if text is None:
+                    return None, "하이라이트 이동 취소"
+                return self.shift_between(start, end, parse_offset(text))
+            except ValueError as e:
+                parent.show_warning("입력 오류", f"잘못된 입력입니다: {str(e)}")
+                return None, ""
+        except Exception as e:
+            self.logger.error(f"Error shifting highlight range: {str(e)}")
+            raise
+
     def remove_highlight(self, index: int):
         try:
-            if index < 0 or index >= len(self.highlights):
+            if index < 0 or index >= len(self.index):
                 raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
-            self.highlights.pop(index)
+            self._remove_at(index)
             self.logger.debug("Highlight removed at index %d", index)
         except Exception as e:
             self.logger.error(f"Error removing highlight: {str(e)}")
             raise
 
-    def edit(self, index: int, parent: QWidget) -> Tuple[Optional[EditHighlightCommand], Optional[str]]:
+    def _remove_at(self, index: int) -> Highlight:
+        for listener in self.listeners:
+            listener.highlights_about_to_remove(index)
+        highlight = self.index.pop(index)
+        self._list_cache = None
+        for listener in self.listeners:
+            listener.highlights_removed(index, highlight)
+        return highlight
+
+    def remove(self, highlight: Highlight) -> int:
+        """하이라이트 객체를 삭제하고 삭제 전 인덱스를 반환"""
         try:
-            if index < 0 or index >= len(self.highlights):
+            index = self.index.index_of(highlight)
+            self._remove_at(index)
+            self.logger.debug("Highlight removed at index %d", index)
+            return index
+        except Exception as e:
+            self.logger.error(f"Error removing highlight: {str(e)}")
+            raise
+
+    def edit(self, index: int, parent: Prompter) -> Tuple[Optional[EditHighlightCommand], Optional[str]]:
+        try:
+            if index < 0 or index >= len(self.index):
                 raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
-            highlight = self.highlights[index]
-            memo, ok = QInputDialog.getText(parent, "하이라이트 수정", "새 메모를 입력하세요:", text=highlight.memo)
-            if not ok:
+            highlight = self.index[index]
+            memo = parent.ask_text("하이라이트 수정", "새 메모를 입력하세요:", highlight.memo)
+            if memo is None:
                 return None, "하이라이트 수정 취소"
-            start_time_str, ok = QInputDialog.getText(parent, "하이라이트 수정", "시작 시간을 입력하세요 (MM:SS):", text=f"{highlight.raw_start // 60:02}:{highlight.raw_start % 60:02}")
-            if not ok:
+            start_time_str = parent.ask_text("하이라이트 수정", "시작 시간을 입력하세요 (MM:SS 또는 MM:SS.mmm):", format_time(highlight.start_ms, precise=True))
+            if start_time_str is None:
                 return None, "하이라이트 수정 취소"
             try:
-                start_min, start_sec = map(int, start_time_str.split(':'))
-                start_time = start_min * 60 + start_sec
-                end_time_str, ok = QInputDialog.getText(parent, "하이라이트 수정", "종료 시간을 입력하세요 (MM:SS):", text=f"{highlight.raw_end // 60:02}:{highlight.raw_end % 60:02}")
-                if not ok:
+                start_time = parse_time(start_time_str)
+                end_time_str = parent.ask_text("하이라이트 수정", "종료 시간을 입력하세요 (MM:SS 또는 MM:SS.mmm):", format_time(highlight.end_ms, precise=True))
+                if end_time_str is None:
                     return None, "하이라이트 수정 취소"
-                end_min, end_sec = map(int, end_time_str.split(':'))
-                end_time = end_min * 60 + end_sec
+                end_time = parse_time(end_time_str)
                 if start_time < 0 or end_time < start_time:
                     raise ValueError("유효하지 않은 시간 범위입니다.")
                 new_highlight = Highlight(start_time, end_time, memo)
-                command = EditHighlightCommand(self, index, new_highlight)
+                command = EditHighlightCommand(self, highlight, new_highlight)
                 return command, "하이라이트 수정됨"
             except ValueError as e:
                 parent.show_warning("입력 오류", f"잘못된 시간 형식입니다: {str(e)}")
@@ -111,27 +360,95 @@ class HighlightManager:
             self.logger.error(f"Error editing highlight: {str(e)}")
             raise
 
-    def update_highlight(self, index: int, new_highlight: Highlight):
+    def replace_highlight(self, old_highlight: Highlight, new_highlight: Highlight) -> int:
+        """old_highlight를 new_highlight로 교체. 시작 시각이 바뀌면 정렬 위치도 바뀌므로 새 인덱스를 반환"""
         try:
-            if index < 0 or index >= len(self.highlights):
-                raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
-            self.highlights[index] = new_highlight
+            if (old_highlight.start_ms, old_highlight.end_ms) == (new_highlight.start_ms, new_highlight.end_ms):
+                # 메모만 바뀐 경우 행을 옮기지 않고 내용만 갱신
+                index = self.index.replace_in_place(old_highlight, new_highlight)
+                self._list_cache = None
+                for listener in self.listeners:
+                    listener.highlight_changed(index, new_highlight)
+                self.logger.debug("Highlight updated at index %d", index)
+                return index
+            self._remove_at(self.index.index_of(old_highlight))
+            index = self.add_highlight(new_highlight)
             self.logger.debug("Highlight updated at index %d", index)
+            return index
         except Exception as e:
             self.logger.error(f"Error updating highlight: {str(e)}")
             raise
 
+    def update_highlight(self, index: int, new_highlight: Highlight) -> int:
+        if index < 0 or index >= len(self.index):
+            raise ValueError("유효하지 않은 하이라이트 인덱스입니다.")
+        return self.replace_highlight(self.index[index], new_highlight)
+
     def get_highlights(self) -> List[Highlight]:
+        """시작 시각 순 하이라이트 목록 (변경 전까지 캐시됨, 수정하지 말 것)"""
         try:
-            return self.highlights
+            if self._list_cache is None:
+                self._list_cache = list(self.index)
+            return self._list_cache
         except Exception as e:
             self.logger.error(f"Error getting highlights: {str(e)}")
             raise
 
-    def restore_highlights(self, highlights: List[Highlight]):
+    def to_columns(self) -> HighlightColumns:
+        return HighlightColumns.from_highlights(self.index)
+
+    def highlight_at(self, index: int) -> Highlight:
+        return self.index[index]
+
+    def index_of(self, highlight: Highlight) -> int:
+        return self.index.index_of(highlight)
+
+    def find(self, start_ms: int, end_ms: int, memo: str, exclude=()) -> Highlight:
+        """값이 같은 하이라이트 객체 (exclude에 있는 id는 건너뜀, 저널 재생용)"""
+        for highlight in self.index.stabbing(start_ms):
+            if (highlight.start_ms, highlight.end_ms, highlight.memo) == (start_ms, end_ms, memo) and id(highlight) not in exclude:
+                return highlight
+        raise ValueError("일치하는 하이라이트가 없습니다.")
+
+    def highlights_at(self, time_ms: int) -> List[Highlight]:
+        """time_ms를 포함하는 하이라이트"""
+        return self.index.stabbing(time_ms)
+
+    def find_overlaps(self, start_ms: int, end_ms: int) -> List[Highlight]:
+        """[start_ms, end_ms] 구간과 겹치는 하이라이트"""
+        return self.index.overlapping(start_ms, end_ms)
+
+    def nearest_highlight(self, time_ms: int) -> Optional[Highlight]:
+        """time_ms(재생 위치 등)에 가장 가까운 하이라이트"""
+        return self.index.nearest(time_ms)
+
+    def replace_all(self, highlights: Iterable[Highlight]):
+        """기록 중 상태는 유지한 채 목록 전체를 교체"""
+        try:
+            for listener in self.listeners:
+                listener.highlights_about_to_reset()
+            self.index.settle()
+            self.index = IntervalIndex(highlights)
+            self._list_cache = None
+            for listener in self.listeners:
+                listener.highlights_reset()
+            self.logger.debug("Highlights replaced: %d highlights", len(self.index))
+        except Exception as e:
+            self.logger.error(f"Error replacing highlights: {str(e)}")
+            raise
+
+    def restore_highlights(self, highlights: Iterable[Highlight]):
+        """Highlight 목록 또는 HighlightColumns로 교체"""
         try:
-            self.highlights = highlights
+            for listener in self.listeners:
+                listener.highlights_about_to_reset()
+            self.index.settle()
+            self.index = IntervalIndex(highlights)
+            self._list_cache = None
+            for listener in self.listeners:
+                listener.highlights_reset()
             self.highlight_start_time = None
+            self._notify_recording()
             self.logger.debug("Highlights restored: %d highlights", len(highlights))
         except Exception as e:
             self.logger.error(f"Error restoring highlights: {str(e)}")
@@ -0,0 +1,458 @@
+import random
+from typing import Iterable, Iterator, List, Optional, Tuple
+from models import Highlight
+
+class _Node:
+    __slots__ = ('highlight', 'seq', 'priority', 'left', 'right', 'parent', 'size', 'max_end', 'lazy')
+
+    def __init__(self, highlight: Highlight, seq: int):
+        self.highlight = highlight
+        self.seq = seq
+        self.priority = random.random()
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+        self.parent: Optional['_Node'] = None
+        self.size = 1
+        self.max_end = highlight.end_ms
+        self.lazy = 0  # 자식 서브트리에 아직 반영하지 않은 시간 이동량 (자기 자신은 반영됨)
+
+    def key(self) -> Tuple[int, int, int]:
+        return (self.highlight.start_ms, self.highlight.end_ms, self.seq)
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+def _shift(node: Optional[_Node], delta: int):
+    """서브트리 전체를 delta만큼 이동. 루트만 즉시 바꾸고 자식은 접근할 때 반영 (O(1))"""
+    if node is None or not delta:
+        return
+    node.highlight.start_ms += delta
+    node.highlight.end_ms += delta
+    node.max_end += delta
+    node.lazy += delta
+
+def _push(node: _Node):
+    """지연된 이동량을 자식에게 전달. 자식에 접근하기 전에 반드시 호출"""
+    if node.lazy:
+        _shift(node.left, node.lazy)
+        _shift(node.right, node.lazy)
+        node.lazy = 0
+
+def _pull(node: _Node) -> _Node:
+    """자식 정보로 크기, 최대 종료 시각, 부모 포인터 갱신"""
+    node.size = 1
+    node.max_end = node.highlight.end_ms
+    for child in (node.left, node.right):
+        if child is not None:
+            child.parent = node
+            node.size += child.size
+            if child.max_end > node.max_end:
+                node.max_end = child.max_end
+    return node
+
+def _merge(a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+    """a의 모든 키 < b의 모든 키일 때 두 treap을 합침"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        _push(a)
+        a.right = _merge(a.right, b)
+        return _pull(a)
+    _push(b)
+    b.left = _merge(a, b.left)
+    return _pull(b)
+
+def _union(a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+    """키 범위가 겹칠 수 있는 두 treap을 합침 (O(m log(n/m)))"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority < b.priority:
+        a, b = b, a
+    _push(a)
+    left, right = _split_key(b, a.key())
+    a.left = _union(a.left, left)
+    a.right = _union(a.right, right)
+    return _pull(a)
+
+def _leftmost(node: _Node) -> _Node:
+    while True:
+        _push(node)
+        if node.left is None:
+            return node
+        node = node.left
+
+def _rightmost(node: _Node) -> _Node:
+    while True:
+        _push(node)
+        if node.right is None:
+            return node
+        node = node.right
+
+def _split_key(node: Optional[_Node], key: Tuple[int, int, int]) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """(key 미만, key 이상)으로 분할"""
+    if node is None:
+        return None, None
+    _push(node)
+    if node.key() < key:
+        left, right = _split_key(node.right, key)
+        node.right = left
+        return _pull(node), right
+    left, right = _split_key(node.left, key)
+    node.left = right
+    return left, _pull(node)
+
+def _split_rank(node: Optional[_Node], rank: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """(앞의 rank개, 나머지)로 분할"""
+    if node is None:
+        return None, None
+    _push(node)
+    left_size = _size(node.left)
+    if rank <= left_size:
+        left, right = _split_rank(node.left, rank)
+        node.left = right
+        return left, _pull(node)
+    left, right = _split_rank(node.right, rank - left_size - 1)
+    node.right = left
+    return _pull(node), right
+
+class IntervalIndex:
+    """
+    하이라이트 구간 인덱스.
+    시작 시각 순으로 정렬된 treap에 서브트리 크기와 최대 종료 시각을 보강하여
+    삽입/삭제/순위 조회와 '시각 t를 포함하는 구간', '겹치는 구간', '가장 가까운 구간' 질의를
+    O(log n) (+ 결과 개수)에 처리한다.
+    """
+    def __init__(self, highlights: Iterable[Highlight] = ()):
+        self._root: Optional[_Node] = None
+        self._nodes = {}  # id(highlight) -> _Node
+        self._seq = 0
+        self._build(sorted(highlights, key=lambda h: (h.start_ms, h.end_ms)))
+
+    def _new_node(self, highlight: Highlight) -> _Node:
+        if id(highlight) in self._nodes:
+            raise ValueError("이미 등록된 하이라이트입니다.")
+        self._seq += 1
+        node = _Node(highlight, self._seq)
+        self._nodes[id(highlight)] = node
+        return node
+
+    def _build(self, ordered: List[Highlight]):
+        """정렬된 목록으로 O(n) 구축 (우선순위 힙 조건을 스택으로 맞춤)"""
+        stack: List[_Node] = []
+        for highlight in ordered:
+            node = self._new_node(highlight)
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        if not stack:
+            return
+        self._root = stack[0]
+        # 후위 순회로 보강 정보 계산 (재귀 깊이 제한을 피하기 위해 반복문 사용)
+        order, pending = [], [self._root]
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            if node.left is not None:
+                pending.append(node.left)
+            if node.right is not None:
+                pending.append(node.right)
+        for node in reversed(order):
+            _pull(node)
+        self._root.parent = None
+
+    def _set_root(self, root: Optional[_Node]):
+        self._root = root
+        if root is not None:
+            root.parent = None
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[Highlight]:
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                _push(node)
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.highlight
+            node = node.right
+
+    def __contains__(self, highlight: Highlight) -> bool:
+        node = self._nodes.get(id(highlight))
+        return node is not None and node.highlight is highlight
+
+    def __getitem__(self, rank: int) -> Highlight:
+        if rank < 0:
+            rank += len(self)
+        if rank < 0 or rank >= len(self):
+            raise IndexError("하이라이트 인덱스 범위를 벗어났습니다.")
+        node = self._root
+        while True:
+            _push(node)
+            left_size = _size(node.left)
+            if rank < left_size:
+                node = node.left
+            elif rank == left_size:
+                return node.highlight
+            else:
+                rank -= left_size + 1
+                node = node.right
+
+    def insertion_rank(self, highlight: Highlight) -> int:
+        """highlight를 삽입하면 놓일 순위 (같은 시각이면 기존 항목 뒤)"""
+        key = (highlight.start_ms, highlight.end_ms)
+        rank, node = 0, self._root
+        while node is not None:
+            _push(node)
+            if (node.highlight.start_ms, node.highlight.end_ms) <= key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def insert(self, highlight: Highlight) -> int:
+        """삽입 후 정렬 순위를 반환"""
+        node = self._new_node(highlight)
+        left, right = _split_key(self._root, node.key())
+        rank = _size(left)
+        self._set_root(_merge(_merge(left, node), right))
+        return rank
+
+    def replace_in_place(self, old_highlight: Highlight, new_highlight: Highlight) -> int:
+        """시작/종료 시각이 같은 하이라이트로 교체 (정렬 위치 불변). 순위를 반환"""
+        if id(new_highlight) in self._nodes:
+            raise ValueError("이미 등록된 하이라이트입니다.")
+        rank = self.index_of(old_highlight)
+        if (old_highlight.start_ms, old_highlight.end_ms) != (new_highlight.start_ms, new_highlight.end_ms):
+            raise ValueError("시간이 다른 하이라이트는 제자리 교체할 수 없습니다.")
+        node = self._nodes.pop(id(old_highlight))
+        node.highlight = new_highlight
+        self._nodes[id(new_highlight)] = node
+        return rank
+
+    def index_of(self, highlight: Highlight) -> int:
+        """순위를 반환. 조상에 남은 지연 이동량도 반영하므로 호출 후 highlight의 시각은 최신 값"""
+        node = self._nodes.get(id(highlight))
+        if node is None or node.highlight is not highlight:
+            raise ValueError("등록되지 않은 하이라이트입니다.")
+        path = []
+        current = node
+        while current.parent is not None:
+            path.append(current.parent)
+            current = current.parent
+        for ancestor in reversed(path):
+            _push(ancestor)
+        rank = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                rank += _size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def remove(self, highlight: Highlight) -> int:
+        """삭제 전 정렬 순위를 반환"""
+        rank = self.index_of(highlight)
+        self.pop(rank)
+        return rank
+
+    def pop(self, rank: int) -> Highlight:
+        if rank < 0 or rank >= len(self):
+            raise IndexError("하이라이트 인덱스 범위를 벗어났습니다.")
+        left, rest = _split_rank(self._root, rank)
+        middle, right = _split_rank(rest, 1)
+        self._set_root(_merge(left, right))
+        del self._nodes[id(middle.highlight)]
+        return middle.highlight
+
+    def _count_before(self, key: Tuple[int, int, int]) -> int:
+        rank, node = 0, self._root
+        while node is not None:
+            _push(node)
+            if node.key() < key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def count_range(self, start_ms: int, end_ms: int) -> int:
+        """시작 시각이 [start_ms, end_ms]인 하이라이트 개수"""
+        if end_ms < start_ms:
+            return 0
+        return self._count_before((end_ms, 1 << 62, 1 << 62)) - self._count_before((start_ms, -1 << 62, -1))
+
+    def shift_range(self, start_ms: int, end_ms: int, delta_ms: int) -> Tuple:
+        """
+        시작 시각이 [start_ms, end_ms]인 하이라이트를 모두 delta_ms만큼 이동.
+        해당 구간을 잘라 루트에만 이동량을 기록하므로 개수와 무관하게 O(log n)이며,
+        이동 후 다른 하이라이트와 순서가 섞일 때만 O(m log(n/m)) 병합을 한다.
+        :return: undo_shift()에 넘길 되돌리기 정보
+        """
+        if end_ms < start_ms:
+            raise ValueError("유효하지 않은 시간 범위입니다.")
+        left, rest = _split_key(self._root, (start_ms, -1 << 62, -1))
+        middle, right = _split_key(rest, (end_ms, 1 << 62, 1 << 62))
+        if middle is None or not delta_ms:
+            self._set_root(_merge(_merge(left, middle), right))
+            return ('ranks', _size(left), 0, 0)
+        if _leftmost(middle).highlight.start_ms + delta_ms < 0:
+            self._set_root(_merge(_merge(left, middle), right))
+            raise ValueError("이동 후 시작 시간이 0보다 작아집니다.")
+        _shift(middle, delta_ms)
+        low, high = _leftmost(middle).key(), _rightmost(middle).key()
+        fits_left = left is None or _rightmost(left).key() < low
+        fits_right = right is None or high < _leftmost(right).key()
+        if fits_left and fits_right:
+            # 순서가 유지되면 연속된 순위 구간으로 되돌릴 수 있음
+            rank = _size(left)
+            count = _size(middle)
+            self._set_root(_merge(_merge(left, middle), right))
+            return ('ranks', rank, count, delta_ms)
+        moved = []
+        stack, node = [], middle
+        while stack or node is not None:
+            while node is not None:
+                _push(node)
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            moved.append(node.highlight)
+            node = node.right
+        self._set_root(_union(_merge(left, right), middle))
+        return ('items', moved, delta_ms)
+
+    def shifted(self, token: Tuple) -> List[Highlight]:
+        """shift_range() 직후 상태에서 그 이동으로 옮겨진 하이라이트 (시각은 최신 값)"""
+        if token[0] == 'ranks':
+            _, rank, count, _ = token
+            return [self[i] for i in range(rank, rank + count)]
+        moved = list(token[1])
+        for highlight in moved:
+            self.index_of(highlight)  # 이후 다른 이동이 조상에 남긴 지연 이동량 반영
+        return moved
+
+    def settle(self):
+        """
+        지연된 이동량을 모든 노드에 반영. 하이라이트 객체는 명령 기록과 공유되므로
+        인덱스를 버리기 전에 호출해야 트리 밖으로 나간 하이라이트가 옛 시각으로 남지 않는다.
+        """
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            _push(node)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+    def undo_shift(self, token: Tuple):
+        """shift_range() 직후 상태에서 이동을 되돌림"""
+        if token[0] == 'ranks':
+            _, rank, count, delta_ms = token
+            if not count:
+                return
+            left, rest = _split_rank(self._root, rank)
+            middle, right = _split_rank(rest, count)
+            _shift(middle, -delta_ms)
+            self._set_root(_merge(_merge(left, middle), right))
+            return
+        _, moved, delta_ms = token
+        for highlight in moved:
+            self.pop(self.index_of(highlight))
+        for highlight in moved:
+            highlight.start_ms -= delta_ms
+            highlight.end_ms -= delta_ms
+            self.insert(highlight)
+
+    def stabbing(self, time_ms: int) -> List[Highlight]:
+        """time_ms를 포함하는 (start <= t <= end) 하이라이트를 시작 순으로 반환"""
+        return self.overlapping(time_ms, time_ms)
+
+    def overlapping(self, start_ms: int, end_ms: int) -> List[Highlight]:
+        """[start_ms, end_ms]와 겹치는 하이라이트를 시작 순으로 반환"""
+        result: List[Highlight] = []
+        stack: List[Tuple[_Node, bool]] = []
+        if self._root is not None:
+            stack.append((self._root, False))
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                h = node.highlight
+                if h.end_ms >= start_ms:
+                    result.append(h)
+                continue
+            # 서브트리의 최대 종료 시각이 질의 시작보다 빠르면 통째로 건너뜀
+            if node.max_end < start_ms:
+                continue
+            _push(node)
+            if node.highlight.start_ms <= end_ms:
+                if node.right is not None:
+                    stack.append((node.right, False))
+                stack.append((node, True))
+            if node.left is not None:
+                stack.append((node.left, False))
+        return result
+
+    def nearest(self, time_ms: int) -> Optional[Highlight]:
+        """time_ms와의 거리(포함하면 0)가 가장 가까운 하이라이트"""
+        best_before = self._max_end_starting_by(time_ms)
+        if best_before is not None and best_before.end_ms >= time_ms:
+            return best_before
+        after = self._first_starting_after(time_ms)
+        if best_before is None:
+            return after
+        if after is None:
+            return best_before
+        return best_before if time_ms - best_before.end_ms <= after.start_ms - time_ms else after
+
+    def _max_end_starting_by(self, time_ms: int) -> Optional[Highlight]:
+        """시작 시각이 time_ms 이하인 하이라이트 중 종료 시각이 가장 늦은 것"""
+        best: Optional[Highlight] = None
+        node = self._root
+        while node is not None:
+            _push(node)
+            if node.highlight.start_ms <= time_ms:
+                for candidate in (node.highlight, self._argmax_end(node.left)):
+                    if candidate is not None and (best is None or candidate.end_ms > best.end_ms):
+                        best = candidate
+                node = node.right
+            else:
+                node = node.left
+        return best
+
+    @staticmethod
+    def _argmax_end(node: Optional[_Node]) -> Optional[Highlight]:
+        if node is None:
+            return None
+        target = node.max_end
+        while True:
+            _push(node)
+            if node.left is not None and node.left.max_end == target:
+                node = node.left
+            elif node.highlight.end_ms == target:
+                return node.highlight
+            else:
+                node = node.right
+
+    def _first_starting_after(self, time_ms: int) -> Optional[Highlight]:
+        result: Optional[Highlight] = None
+        node = self._root
+        while node is not None:
+            _push(node)
+            if node.highlight.start_ms > time_ms:
+                result = node.highlight
+                node = node.left
+            else:
+                node = node.right
+        return result
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from models import Highlight
+from highlight import HighlightListener
+from commands import (Command, CompoundCommand, AddHighlightCommand, DeleteHighlightCommand, EditHighlightCommand,
+                      ShiftHighlightsCommand, ReplaceHighlightsCommand, EditTimeCommand)
+import logging
+
+class Journal:
+    """
+    비정상 종료 대비 추가 전용(write-ahead) 저널.
+    첫 줄은 기준 세션 스냅샷 {'t': 'base', 'session': 파일}이고, 이후 줄마다 그 스냅샷 이후의 변경 레코드 하나.
+    레코드는 호출한 스레드에서 바로 직렬화하고, 쓰기 스레드가 flush_interval 동안 모아 한 번에 fsync한다.
+    체크포인트(reset)는 스냅샷 저장 직후 저널을 기준 줄 하나로 비운다.
+    """
+    def __init__(self, path: str, flush_interval: float = 0.2):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.flush_interval = flush_interval
+        self._io_lock = threading.Lock()  # 파일 쓰기/교체 (항상 _cond보다 먼저 획득)
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self.base_session: Optional[str] = None
+        self.records_since_checkpoint = 0
+        # 통계
+        self.fsync_count = 0
+        self.record_count = 0
+        self.max_batch = 0
+
+    def read(self) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """기준 세션과 그 이후 레코드. 쓰다가 끊긴 마지막 줄은 무시"""
+        if not os.path.exists(self.path):
+            return None, []
+        base, records = None, []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.logger.warning("Journal truncated at line %d", number + 1)
+                    break
+                if number == 0 and record.get('t') == 'base':
+                    base = record.get('session')
+                else:
+                    records.append(record)
+        return base, records
+
+    def has_pending(self) -> bool:
+        """마지막 체크포인트 이후 기록이 남아 있는지 (= 정상 종료되지 않음)"""
+        try:
+            return bool(self.read()[1])
+        except Exception as e:
+            self.logger.error(f"Error reading journal: {str(e)}")
+            return False
+
+    def open(self, base_session: Optional[str]):
+        """기준 세션으로 저널을 새로 시작하고 쓰기 스레드 실행"""
+        self.reset(base_session)
+        with self._cond:
+            self._stopped = False
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="Journal", daemon=True)
+            self._thread.start()
+
+    def append(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._cond:
+            self._pending.append(line)
+            self.records_since_checkpoint += 1
+            self._cond.notify()
+
+    def reset(self, base_session: Optional[str]):
+        """
+        체크포인트. 방금 저장한 스냅샷(base_session)에 아직 쓰지 않은 레코드까지 포함되어 있으므로
+        대기 중인 레코드는 버리고 저널을 기준 줄 하나로 교체한다.
+        """
+        try:
+            with self._io_lock:
+                with self._cond:
+                    self._pending.clear()
+                    self.records_since_checkpoint = 0
+                    self.base_session = base_session
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                temp_path = self.path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps({'t': 'base', 'session': base_session, 'time': time.time()}, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self.logger.debug("Journal checkpoint: base=%s", base_session)
+        except Exception as e:
+            self.logger.error(f"Error resetting journal: {str(e)}")
+            raise
+
+    def flush(self):
+        """대기 중인 레코드를 즉시 기록"""
+        with self._io_lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        """_io_lock 보유 상태에서 호출"""
+        with self._cond:
+            batch = self._pending
+            self._pending = []
+        if not batch or self._file is None:
+            return
+        self._file.write(''.join(line + '\n' for line in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsync_count += 1
+        self.record_count += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped and not self._pending:
+                    return
+                if not self._stopped:
+                    # 잠시 더 모아서 fsync 횟수를 줄임
+                    self._cond.wait(self.flush_interval)
+            try:
+                with self._io_lock:
+                    self._write_pending()
+            except Exception as e:
+                self.logger.error(f"Error writing journal: {str(e)}")
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._io_lock:
+            self._write_pending()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'records': self.record_count,
+            'fsyncs': self.fsync_count,
+            'max_batch': self.max_batch,
+            'since_checkpoint': self.records_since_checkpoint,
+        }
+
+class MatchJournal(HighlightListener):
+    """
+    매치 하나의 명령/타이머/기록 상태 변경을 저널 레코드로 변환.
+    매치는 기록 시점의 목록 인덱스('i')로 가리킨다. 매치 id는 복원할 때 1부터 다시 매겨지므로
+    체크포인트 이전에 닫힌 매치가 있으면 저널의 id와 복원된 id가 어긋난다.
+    :param locate: 현재 매치 인덱스 (목록에서 빠졌으면 None)
+    """
+    def __init__(self, journal: Journal, locate: Callable[[], Optional[int]]):
+        self.journal = journal
+        self.locate = locate
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # 명령 실행 중 생긴 타이머/기록 상태 레코드는 명령 레코드 뒤로 미룸
+        # (재생 시 명령이 같은 변경을 다시 만들므로 순서가 바뀌면 두 번 적용됨)
+        self._deferred: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def command_done(self, action: str, command: Command):
+        with self._lock:
+            if action == 'begin':
+                self._deferred = {}
+                return
+            deferred, self._deferred = self._deferred or {}, None
+        if action == 'abort':
+            return
+        index = self.locate()
+        if index is None:
+            return
+        # 실행 취소/다시 실행도 결과를 만드는 명령으로 남김 (체크포인트 이후 재생에는 실행 취소 기록이 없음)
+        record = command.inverse_record() if action == 'undo' else command.to_record()
+        if record is None:
+            self.logger.warning("Command %s cannot be journaled", command.__class__.__name__)
+            return
+        self.journal.append({'t': 'exec', 'i': index, 'command': record, 'action': action})
+        for kind, record in deferred.items():
+            self.journal.append({'t': kind, 'i': index, **record})
+
+    def _append_state(self, kind: str, record: Dict[str, Any]):
+        with self._lock:
+            if self._deferred is not None:
+                self._deferred[kind] = record  # 종류별 마지막 상태만 필요
+                return
+        index = self.locate()
+        if index is not None:
+            self.journal.append({'t': kind, 'i': index, **record})
+
+    def timer_changed(self, state: Dict[str, Any]):
+        self._append_state('timer', {'state': state})
+
+    def recording_changed(self, start_ms: Optional[int]):
+        self._append_state('rec', {'start_ms': start_ms})
+
+def command_from_record(record: Dict[str, Any], match, claimed: Optional[Set[int]] = None) -> Command:
+    """저널 레코드로 명령을 다시 생성. claimed: 같은 복합 명령에서 이미 대상으로 잡힌 하이라이트 id"""
+    manager = match.highlight_manager
+    claimed = set() if claimed is None else claimed
+    kind = record['type']
+
+    def find(row) -> Highlight:
+        highlight = manager.find(row[0], row[1], row[2], claimed)
+        claimed.add(id(highlight))
+        return highlight
+
+    if kind == 'add':
+        return AddHighlightCommand(manager, Highlight(*record['highlight']))
+    if kind == 'delete':
+        return DeleteHighlightCommand(manager, find(record['highlight']))
+    if kind == 'edit':
+        return EditHighlightCommand(manager, find(record['old']), Highlight(*record['new']))
+    if kind == 'shift':
+        return ShiftHighlightsCommand(manager, record['start_ms'], record['end_ms'], record['delta_ms'])
+    if kind == 'replace':
+        return ReplaceHighlightsCommand(manager, [Highlight(*row) for row in record['highlights']], record.get('name', ''))
+    if kind == 'compound':
+        commands = [command_from_record(sub, match, claimed) for sub in record['commands']]
+        return CompoundCommand(commands, record.get('name', ''))
+    if kind == 'time':
+        command = EditTimeCommand(match.timer_manager, record['old_time'], record['new_time'])
+        command.old_anchor = record['old_anchor']
+        command.new_anchor = record.get('new_anchor')
+        if record.get('shift'):
+            command.shift_highlights_with(manager)
+        return command
+    raise ValueError(f"알 수 없는 명령 레코드입니다: {kind}")
+
+def replay(match_manager, records: List[Dict[str, Any]]) -> int:
+    """
+    기준 세션을 복원한 match_manager에 레코드를 순서대로 다시 적용. 적용한 레코드 수를 반환.
+    호출 전 match_manager.journal을 떼어 두어야 재생 내용이 다시 기록되지 않는다.
+    """
+    applied = 0
+    for record in records:
+        kind = record['t']
+        if kind == 'match_add':
+            match_manager.add_match(record.get('name'))
+        elif kind == 'match_remove':
+            match_manager.remove_match(record['index'])
+        elif kind == 'match_rename':
+            match_manager.rename_match(record['index'], record['name'])
+        elif kind == 'match_current':
+            match_manager.set_current(record['index'])
+        else:
+            if 'i' in record:
+                index = record['i']
+                match = match_manager.matches[index] if 0 <= index < len(match_manager.matches) else None
+            else:
+                index = record['m']  # 인덱스를 남기기 전의 저널 (매치 id)
+                match = match_manager.find(index)
+            if match is None:
+                raise ValueError(f"저널의 매치를 찾을 수 없습니다: {index}")
+            if kind == 'exec':
+                command = command_from_record(record['command'], match)
+                if not match.command_manager.execute(command):
+                    raise ValueError(f"저널 명령을 다시 실행하지 못했습니다: {record['command']['type']}")
+            elif kind in ('undo', 'redo'):
+                # 명령 레코드로 바꾸기 전의 저널. 체크포인트 이전 명령이면 되돌릴 기록이 없음
+                done = match.command_manager.undo() if kind == 'undo' else match.command_manager.redo()
+                if not done:
+                    raise ValueError(f"저널의 {kind}를 다시 적용하지 못했습니다.")
+            elif kind == 'timer':
+                match.timer_manager.restore_state(record['state'])
+            elif kind == 'rec':
+                match.highlight_manager.highlight_start_time = record['start_ms']
+            else:
+                raise ValueError(f"알 수 없는 저널 레코드입니다: {kind}")
+        applied += 1
+    return applied
@@ -0,0 +1,130 @@
+import os
+from typing import Dict, List, Optional, Tuple, Union
+from columns import Row
+from models import display_string
+from exporters import safe_name, write_xmeml
+from autosave import Snapshot
+from timecode import FrameRate
+import logging
+
+class _TailFile:
+    """
+    줄 단위 텍스트 파일을 마지막으로 쓴 내용과 비교해 처음 달라진 줄부터 끝까지만 다시 씀.
+    기록 중에는 하이라이트가 대부분 끝에 추가되므로 보통 새 줄만 덧붙이게 된다.
+    파일이 밖에서 바뀌었거나(크기 불일치) 첫 줄부터 달라지면 임시 파일 + 교체로 전체를 씀.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: List[Row] = []
+        self.offsets: List[int] = [0]  # offsets[i]: i번째 줄의 시작 바이트 (마지막은 파일 크기)
+
+    def _intact(self) -> bool:
+        try:
+            return os.path.getsize(self.path) == self.offsets[-1]
+        except OSError:
+            return False
+
+    def write(self, rows: List[Row]) -> int:
+        """쓴 바이트 수를 반환 (바뀐 것이 없으면 0)"""
+        same = 0
+        limit = min(len(rows), len(self.rows))
+        while same < limit and rows[same] == self.rows[same]:
+            same += 1
+        intact = self._intact()
+        if intact and same == len(rows) == len(self.rows):
+            return 0
+        if not intact or same == 0:
+            same = 0
+        data = [(display_string(*row) + '\n').encode('utf-8') for row in rows[same:]]
+        offsets = self.offsets[:same + 1]
+        for line in data:
+            offsets.append(offsets[-1] + len(line))
+        payload = b''.join(data)
+        if same == 0:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        else:
+            with open(self.path, 'r+b') as f:
+                f.seek(offsets[same])
+                f.write(payload)
+                f.truncate()
+        self.rows = list(rows)
+        self.offsets = offsets
+        return len(payload)
+
+class LiveExporter:
+    """
+    기록 중 매치별 텍스트/마커 파일을 계속 최신으로 유지 (AutosaveService의 writer로 백그라운드 스레드에서 호출).
+    - 텍스트: 바뀐 줄부터 끝까지만 다시 씀 (_TailFile)
+    - XML 마커: 시퀀스 길이가 앞부분에 있어 부분 수정이 안 되므로, 바뀐 경우에만 임시 파일에 쓴 뒤 교체
+      (편집 프로그램이 반쯤 쓴 파일을 읽지 않음)
+    파일 이름은 '<폴더>/<매치 번호 2자리>_<매치 이름>.txt', '..._markers.xml'.
+    파일은 매치 id별로 추적하므로, 매치 이름이 바뀌거나 앞 매치가 닫혀 번호가 바뀌면 기존 파일의 이름을 바꾸고
+    닫힌 매치의 파일은 지운다 (이 내보내기가 만든 파일만).
+    """
+    def __init__(self, directory: str, frame_rate: Union[FrameRate, int, str] = 60, template_name: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.frame_rate = FrameRate.parse(frame_rate)
+        self.template_name = template_name
+        self._paths: Dict[int, str] = {}  # 매치 id -> 파일 기본 경로 (확장자 제외)
+        self._texts: Dict[int, _TailFile] = {}
+        self._markers: Dict[int, List[Row]] = {}  # 매치 id별 XML에 마지막으로 쓴 하이라이트
+        self.bytes_written = 0  # 마지막 호출에서 쓴 텍스트 바이트 (XML 제외)
+        self.xml_written = 0  # 마지막 호출에서 다시 쓴 XML 파일 수
+
+    def base_path(self, index: int, name: str) -> str:
+        return os.path.join(self.directory, f"{index + 1:02}_{safe_name(name)}")
+
+    @staticmethod
+    def _files(base_path: str) -> Tuple[str, str]:
+        return base_path + '.txt', base_path + '_markers.xml'
+
+    def _forget(self, match_id: int):
+        """닫힌 매치의 파일 삭제"""
+        for path in self._files(self._paths.pop(match_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        self._texts.pop(match_id, None)
+        self._markers.pop(match_id, None)
+
+    def _move(self, match_id: int, base_path: str):
+        """이름/번호가 바뀐 매치의 파일 이름 변경 (텍스트는 이어 쓸 수 있도록 그대로 옮김)"""
+        for old, new in zip(self._files(self._paths[match_id]), self._files(base_path)):
+            if os.path.exists(old):
+                os.replace(old, new)
+        self._paths[match_id] = base_path
+        self._texts[match_id].path = self._files(base_path)[0]
+        self._markers.pop(match_id, None)  # XML 안의 시퀀스 이름도 바뀌므로 다시 씀
+
+    def write(self, snapshot: Snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        self.bytes_written = self.xml_written = 0
+        present = {match_id for match_id, _, _ in snapshot}
+        for match_id in [match_id for match_id in self._paths if match_id not in present]:
+            self._forget(match_id)
+        # 닫힌 매치 뒤의 번호는 앞으로만 당겨지므로 앞 매치부터 옮기면 아직 쓰이는 파일을 덮어쓰지 않음
+        for index, (match_id, name, match_rows) in enumerate(snapshot):
+            rows = list(match_rows)
+            base_path = self.base_path(index, name)
+            if match_id in self._paths and self._paths[match_id] != base_path:
+                self._move(match_id, base_path)
+            if not rows and match_id not in self._paths:
+                continue  # 하이라이트가 없는 매치는 파일을 만들지 않음
+            self._paths[match_id] = base_path
+            text_path, xml_path = self._files(base_path)
+            text = self._texts.get(match_id)
+            if text is None:
+                text = self._texts[match_id] = _TailFile(text_path)
+            self.bytes_written += text.write(rows)
+            if self._markers.get(match_id) != rows:
+                temp_path = xml_path + '.tmp'
+                write_xmeml(temp_path, os.path.basename(base_path), rows, self.frame_rate, self.template_name)
+                os.replace(temp_path, xml_path)
+                self._markers[match_id] = rows
+                self.xml_written += 1
+        self.logger.debug("Live export: %d text bytes, %d marker files", self.bytes_written, self.xml_written)
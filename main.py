@@ -1,14 +1,22 @@
 import sys
 import logging
 import atexit
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from ui import HighlightRecorderUI
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtCore import QTimer
+from ui import HighlightRecorderUI, TimerSignalBridge, MainThreadInvoker
 from timer import TimerManager
 from highlight import HighlightManager
 from save import SaveManager
 from commands import CommandManager
-import os
+from match import MatchManager
+from gameclock import GameClockReceiver
+from normalize import NormalizeOptions
+from journal import Journal, replay
+from autosave import AutosaveService, AutosaveListener, Snapshot
+from columns import iter_rows
+from live_export import LiveExporter
+from exporters import available_formats, resolve_formats
+from typing import Optional
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,11 +27,46 @@ class HighlightRecorderApp:
             self.logger = logging.getLogger(__name__)
             self.logger.debug("HighlightRecorderApp initializing")
             self.app = QApplication(sys.argv)
-            self.timer_manager = TimerManager(self.update_timer_callback)
-            self.highlight_manager = HighlightManager()
-            self.save_manager = SaveManager(None)
-            self.command_manager = CommandManager()
+            # 타이머 틱은 클럭 스레드에서 발생하므로 브리지를 통해 GUI 스레드에서 처리
+            self.timer_bridge = TimerSignalBridge(self.update_timer_callback)
+            self._last_status_key = None
+            self.save_manager = SaveManager()
+            settings = self.save_manager.load_settings()
+            history_limits = {
+                'max_commands': settings.get('undo_max_commands', 500),
+                'max_bytes': settings.get('undo_max_bytes', 16 * 1024 * 1024),
+            }
+            # 모든 매치의 타이머는 하나의 클럭 스레드를 공유
+            self.match_manager = MatchManager(self.timer_bridge.post, history_limits=history_limits)
+            self.match_manager.add_match()
+            # 변경이 잠잠해지면 GUI 스레드에서 스냅샷만 만들고 파일 쓰기는 백그라운드에서 처리
+            self.invoker = MainThreadInvoker()
+            self.autosave = AutosaveService(
+                self.save_manager.autosave_file,
+                lambda origin: self.invoker.post(lambda: self.submit_autosave(origin)),
+                debounce=settings.get('autosave_debounce_ms', 500) / 1000,
+            )
+            self.match_manager.add_highlight_listener(AutosaveListener(self.autosave))
+            self.autosave.start()
+            # 'live_export_dir'를 지정하면 기록 중에도 매치별 텍스트/마커 파일을 계속 갱신 (같은 방식, 더 긴 간격)
+            self.live_export: Optional[AutosaveService] = None
+            live_dir = settings.get('live_export_dir')
+            if live_dir:
+                exporter = LiveExporter(live_dir, self.save_manager.saver.frame_rate, settings.get('xmeml_template'))
+                self.live_export = AutosaveService(
+                    live_dir,
+                    lambda origin: self.invoker.post(lambda: self.submit_live_export(origin)),
+                    debounce=settings.get('live_export_debounce_ms', 1000) / 1000,
+                    max_delay=settings.get('live_export_max_delay_ms', 5000) / 1000,
+                    writer=exporter.write,
+                )
+                self.match_manager.add_highlight_listener(AutosaveListener(self.live_export))
+                self.live_export.start()
             self.session_saved = False  # 세션 저장 플래그 추가
+            # 비정상 종료 대비 저널 (마지막 체크포인트 이후의 변경을 기록)
+            self.journal = Journal('autosaves/journal.jsonl')
+            self.session_file: Optional[str] = None  # 이번 실행에서 체크포인트를 덮어쓰는 세션 파일
+            self.base_session: Optional[str] = None  # 저널이 이어서 기록하는 기준 세션
             callbacks = {
                 'start_match': self.start_match,
                 'toggle_timer': self.toggle_timer,
@@ -32,20 +75,36 @@ class HighlightRecorderApp:
                 'edit_match_time': self.edit_match_time,
                 'delete_highlight': self.delete_highlight,
                 'edit_highlight': self.edit_highlight_inline,
+                'shift_highlights': self.shift_highlights,
                 'save_highlights': self.save_highlights,
+                'choose_export_formats': self.choose_export_formats,
                 'undo': self.undo,
                 'redo': self.redo,
                 'save_theme': self.save_theme,
+                'add_match': self.add_match,
+                'close_match': self.close_match,
+                'switch_match': self.switch_match,
+                'rename_match': self.rename_match,
+                'search_memos': self.search_memos,
+                'normalize_highlights': self.normalize_highlights,
             }
             self.ui = HighlightRecorderUI(callbacks)
             self.save_manager.parent = self.ui
             self.ui.current_theme = self.save_manager.load_theme()
             self.ui.apply_theme()
             self.ui.closeEvent = self.close_event
+            self.game_clock = None
+            self.start_game_clock()
+            self.refresh_match_view()
             atexit.register(self.save_session)
             if not self.handle_session_choice():
                 self.logger.debug("Application startup cancelled")
                 sys.exit(0)
+            self.journal.open(self.base_session)
+            self.match_manager.attach_journal(self.journal)
+            self.checkpoint_timer = QTimer()
+            self.checkpoint_timer.timeout.connect(self.checkpoint_if_needed)
+            self.checkpoint_timer.start(int(settings.get('journal_checkpoint_seconds', 60) * 1000))
             self.logger.debug("HighlightRecorderApp initialized successfully")
         except Exception as e:
             print(f"Error initializing HighlightRecorderApp: {str(e)}")
@@ -53,6 +112,10 @@ class HighlightRecorderApp:
 
     def handle_session_choice(self) -> bool:
         try:
+            base, records = self.journal.read()
+            if records and self.ui.ask_journal_recovery(len(records)):
+                self.recover_from_journal(base, records)
+                return True
             sessions = self.save_manager.list_sessions()
             if not sessions:
                 self.ui.update_status("새 세션 시작")
@@ -71,9 +134,190 @@ class HighlightRecorderApp:
             self.ui.show_error(f"세션 선택 중 오류: {str(e)}")
             return False
 
-    def update_timer_callback(self, minutes: int, seconds: int, elapsed_time: int):
+    def recover_from_journal(self, base: Optional[str], records):
+        """기준 세션을 불러온 뒤 저널 레코드를 재생하고, 복구된 상태를 새 체크포인트로 저장"""
+        try:
+            if self.save_manager.session_exists(base):
+                self.load_session(base)
+            else:
+                self.match_manager.restore([])
+            applied = replay(self.match_manager, records)
+            self.refresh_match_view()
+            self.checkpoint()
+            self.ui.update_status(f"비정상 종료 복구됨 (변경 {applied}건)")
+            self.logger.debug("Recovered %d journal records on top of %s", applied, base)
+        except Exception as e:
+            self.logger.error(f"Error recovering from journal: {str(e)}")
+            self.refresh_match_view()
+            self.ui.show_warning("복구 실패", f"저널 일부를 복구하지 못했습니다: {str(e)}")
+
+    def checkpoint(self):
+        """현재 상태를 세션 파일에 저장하고 저널을 비움 (저널 재생 시간을 짧게 유지)"""
+        try:
+            matches = self.match_manager.get_state()
+            session_file = self.save_manager.save_session(matches, self.ui.get_memo(), self.match_manager.current_index, self.session_file)
+            if session_file:
+                self.session_file = session_file
+                self.base_session = session_file
+                self.journal.reset(session_file)
+        except Exception as e:
+            self.logger.error(f"Error in checkpoint: {str(e)}")
+
+    def autosave_snapshot(self) -> Snapshot:
+        """
+        GUI 스레드에서 값으로 복사 (Highlight 객체는 편집/구간 이동 때 제자리에서 바뀌므로 참조를 넘기지 않음).
+        튜플 변환만 하므로 하이라이트 수만큼의 짧은 작업이며 문자열 변환과 쓰기는 백그라운드에서 한다.
+        """
+        return [(m.match_id, m.name, tuple(iter_rows(m.highlight_manager.get_highlights())))
+                for m in self.match_manager.matches]
+
+    def submit_autosave(self, origin: float):
+        try:
+            self.autosave.submit(self.autosave_snapshot(), origin)
+        except Exception as e:
+            self.logger.error(f"Error in submit_autosave: {str(e)}")
+
+    def submit_live_export(self, origin: float):
+        try:
+            self.live_export.submit(self.autosave_snapshot(), origin)
+        except Exception as e:
+            self.logger.error(f"Error in submit_live_export: {str(e)}")
+
+    def notify_matches_changed(self):
+        """매치 추가/닫기/이름 변경 (하이라이트 변경은 AutosaveListener가 알림)"""
+        self.autosave.notify()
+        if self.live_export is not None:
+            self.live_export.notify()
+
+    def checkpoint_if_needed(self):
+        if self.journal.records_since_checkpoint:
+            self.checkpoint()
+
+    @property
+    def timer_manager(self) -> TimerManager:
+        return self.match_manager.current.timer_manager
+
+    @property
+    def highlight_manager(self) -> HighlightManager:
+        return self.match_manager.current.highlight_manager
+
+    @property
+    def command_manager(self) -> CommandManager:
+        return self.match_manager.current.command_manager
+
+    def refresh_match_view(self):
+        """현재 매치 기준으로 탭, 타이머, 버튼, 하이라이트 목록을 다시 표시"""
+        match = self.match_manager.current
+        self.ui.set_match_tabs([m.name for m in self.match_manager.matches], self.match_manager.current_index)
+        timer = match.timer_manager
+        self.ui.pause_button.setText('타이머 재개' if timer.paused else '타이머 일시정지')
+        recording = match.highlight_manager.highlight_start_time is not None
+        self.ui.record_button.setText('기록 중지' if recording else '하이라이트 기록')
+        self.ui.set_highlight_manager(match.highlight_manager)
+        self._last_status_key = None
+        elapsed_ms = timer.get_elapsed_ms()
+        seconds = elapsed_ms // 1000
+        self.update_timer_callback(match.match_id, seconds // 60, seconds % 60, elapsed_ms)
+
+    def add_match(self):
+        try:
+            match = self.match_manager.add_match()
+            self.match_manager.set_current(len(self.match_manager.matches) - 1)
+            self.refresh_match_view()
+            self.notify_matches_changed()
+            self.ui.update_status(f"{match.name} 추가됨")
+        except Exception as e:
+            self.logger.error(f"Error in add_match: {str(e)}")
+            self.ui.show_error(f"매치 추가 중 오류: {str(e)}")
+
+    def close_match(self, index: int):
+        try:
+            match = self.match_manager.matches[index]
+            if match.highlight_manager.get_highlights():
+                reply = QMessageBox.question(self.ui, '매치 닫기',
+                                             f"{match.name}의 하이라이트가 모두 사라집니다. 닫으시겠습니까?",
+                                             QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
+            self.match_manager.remove_match(index)
+            self.refresh_match_view()
+            self.notify_matches_changed()
+            self.ui.update_status(f"{match.name} 닫힘")
+        except ValueError as e:
+            self.logger.warning(str(e))
+            self.ui.show_warning("오류", str(e))
+        except Exception as e:
+            self.logger.error(f"Error in close_match: {str(e)}")
+            self.ui.show_error(f"매치 닫기 중 오류: {str(e)}")
+
+    def switch_match(self, index: int):
+        try:
+            if index < 0 or index == self.match_manager.current_index:
+                return
+            self.match_manager.set_current(index)
+            self.refresh_match_view()
+        except Exception as e:
+            self.logger.error(f"Error in switch_match: {str(e)}")
+            self.ui.show_error(f"매치 전환 중 오류: {str(e)}")
+
+    def rename_match(self, index: int):
+        try:
+            if index < 0:
+                return
+            name = self.ui.ask_match_name(self.match_manager.matches[index].name)
+            if name is None:
+                return
+            self.match_manager.rename_match(index, name)
+            self.refresh_match_view()
+            self.notify_matches_changed()
+        except ValueError as e:
+            self.logger.warning(str(e))
+            self.ui.show_warning("입력 오류", str(e))
+        except Exception as e:
+            self.logger.error(f"Error in rename_match: {str(e)}")
+            self.ui.show_error(f"매치 이름 변경 중 오류: {str(e)}")
+
+    def start_game_clock(self):
+        """설정에 game_clock_port가 있으면 외부 게임 시계 수신 시작"""
+        port = self.save_manager.load_settings().get('game_clock_port')
+        if port is None:
+            return
+        try:
+            self.game_clock = GameClockReceiver(self.resolve_match_timer, port=int(port), dispatch=self.invoker.post)
+            self.game_clock.start()
+            self.ui.update_status(f"게임 시계 수신 대기 (UDP {self.game_clock.port})")
+        except Exception as e:
+            self.logger.error(f"Error starting game clock receiver: {str(e)}")
+            self.game_clock = None
+            self.ui.show_warning("게임 시계", f"게임 시계 수신을 시작할 수 없습니다: {str(e)}")
+
+    def resolve_match_timer(self, match_key: Optional[str]) -> Optional[TimerManager]:
+        """게임 시계 패킷의 매치 지정(이름 또는 1부터 시작하는 번호)을 타이머로 변환. invoker를 거쳐 GUI 스레드에서 호출됨"""
+        matches = self.match_manager.matches
+        if match_key is None:
+            return self.match_manager.current.timer_manager
+        key = str(match_key)
+        for match in matches:
+            if match.name == key:
+                return match.timer_manager
+        if key.isdigit() and 1 <= int(key) <= len(matches):
+            return matches[int(key) - 1].timer_manager
+        return None
+
+    def update_timer_callback(self, match_id: int, minutes: int, seconds: int, elapsed_ms: int):
+        # 현재 보고 있는 매치의 틱만 화면에 반영
+        if match_id != self.match_manager.current.match_id:
+            return
         self.ui.update_timer_display(minutes, seconds)
-        status = self.highlight_manager.get_recording_status(elapsed_time)
+        if self.game_clock is not None:
+            self.game_clock.note_displayed(self.timer_manager)
+            self.ui.update_clock_source(self.game_clock.get_stats())
+        # 초나 기록 시작점이 바뀐 경우에만 기록 상태 문자열을 다시 계산
+        status_key = (elapsed_ms // 1000, self.highlight_manager.highlight_start_time)
+        if status_key == self._last_status_key:
+            return
+        self._last_status_key = status_key
+        status = self.highlight_manager.get_recording_status(elapsed_ms)
         self.ui.update_recording_status(status)
 
     def start_match(self):
@@ -102,7 +346,7 @@ class HighlightRecorderApp:
             message = self.timer_manager.reset()
             self.ui.update_status(message)
             self.ui.record_button.setText('하이라이트 기록')
-            self.highlight_manager.highlight_start_time = None
+            self.highlight_manager.cancel_recording()
         except ValueError as e:
             self.logger.warning(str(e))
             self.ui.show_warning("오류", str(e))
@@ -112,7 +356,7 @@ class HighlightRecorderApp:
 
     def record_highlight(self):
         try:
-            current_time = self.timer_manager.get_elapsed_time()
+            current_time = self.timer_manager.get_elapsed_ms()
             if self.highlight_manager.highlight_start_time is None:
                 message = self.highlight_manager.start_recording(current_time)
                 if message:
@@ -127,8 +371,7 @@ class HighlightRecorderApp:
                     self.ui.update_status(message)
                     self.ui.record_button.setText('하이라이트 기록')
                     self.ui.clear_memo()
-                    self.ui.update_highlights_view(self.highlight_manager.get_highlights())
-                    self.save_manager.saved = False
+                    self.match_manager.current.saved = False
         except ValueError as e:
             self.logger.warning(str(e))
             self.ui.show_warning("오류", str(e))
@@ -138,16 +381,15 @@ class HighlightRecorderApp:
 
     def delete_highlight(self):
         try:
-            index = self.ui.get_selected_highlight_index()
-            if index == -1:
+            indices = self.ui.get_selected_highlight_indices()
+            if not indices:
                 self.ui.show_info("알림", "삭제할 하이라이트를 선택하세요.")
                 return
-            command, message = self.highlight_manager.delete(index)
+            command, message = self.highlight_manager.delete_many(indices)
             if command and message:
                 self.command_manager.execute(command)
                 self.ui.update_status(message)
-                self.ui.update_highlights_view(self.highlight_manager.get_highlights())
-                self.save_manager.saved = False
+                self.match_manager.current.saved = False
         except ValueError as e:
             self.logger.warning(str(e))
             self.ui.show_warning("오류", str(e))
@@ -157,9 +399,20 @@ class HighlightRecorderApp:
 
     def edit_match_time(self):
         try:
-            command, message = self.timer_manager.edit_time(self.ui, self.ui)
+            command, message = self.timer_manager.edit_time(self.ui, self.ui.show_error)
             if command and message:
-                self.command_manager.execute(command)
+                count = self.highlight_manager.index.count_range(command.old_anchor, command.old_time)
+                if count and self.should_shift_highlights(command, count):
+                    command.shift_highlights_with(self.highlight_manager)
+                if not self.command_manager.execute(command):
+                    if command.shift_command is not None:
+                        self.ui.show_warning("입력 오류", "이동 후 시작 시간이 0보다 작아지는 하이라이트가 있어 시간을 수정하지 않았습니다.")
+                    else:
+                        self.ui.show_error("타이머 시간을 수정하지 못했습니다.")
+                    return
+                if command.shift_command is not None:
+                    message = f"{message} (하이라이트 {count}개 함께 이동)"
+                    self.match_manager.current.saved = False
                 self.ui.update_status(message)
         except ValueError as e:
             self.logger.warning(str(e))
@@ -168,18 +421,33 @@ class HighlightRecorderApp:
             self.logger.error(f"Error in edit_match_time: {str(e)}")
             self.ui.show_error(f"타이머 시간 수정 중 오류: {str(e)}")
 
+    def should_shift_highlights(self, command, count: int) -> bool:
+        """
+        시간 수정 시 마지막 보정 이후 기록된 하이라이트 count개도 함께 이동할지 결정.
+        설정 auto_shift_on_time_edit: true(항상), false(안 함), 없으면 매번 확인
+        """
+        delta_ms = command.new_time - command.old_time
+        if not delta_ms:
+            return False
+        setting = self.save_manager.load_settings().get('auto_shift_on_time_edit')
+        if setting is not None:
+            return bool(setting)
+        return self.ui.ask_shift_after_time_edit(count, delta_ms)
+
     def edit_highlight_inline(self):
         try:
-            index = self.ui.get_selected_highlight_index()
-            if index == -1:
+            indices = self.ui.get_selected_highlight_indices()
+            if not indices:
                 self.ui.show_info("알림", "수정할 하이라이트를 선택하세요.")
                 return
-            command, message = self.highlight_manager.edit(index, self.ui)
+            if len(indices) > 1:
+                command, message = self.highlight_manager.ask_edit_memo_many(indices, self.ui)
+            else:
+                command, message = self.highlight_manager.edit(indices[0], self.ui)
             if command and message:
                 self.command_manager.execute(command)
                 self.ui.update_status(message)
-                self.ui.update_highlights_view(self.highlight_manager.get_highlights())
-                self.save_manager.saved = False
+                self.match_manager.current.saved = False
         except ValueError as e:
             self.logger.warning(str(e))
             self.ui.show_warning("입력 오류", str(e))
@@ -187,9 +455,54 @@ class HighlightRecorderApp:
             self.logger.error(f"Error in edit_highlight_inline: {str(e)}")
             self.ui.show_error(f"하이라이트 수정 중 오류: {str(e)}")
 
+    def shift_highlights(self):
+        try:
+            indices = self.ui.get_selected_highlight_indices()
+            if indices:
+                command, message = self.highlight_manager.ask_shift_many(indices, self.ui)
+            else:
+                # 선택이 없으면 마지막 시간 수정 이후 구간을 기본값으로 구간 이동
+                command, message = self.highlight_manager.ask_shift_range(self.ui, self.timer_manager.last_correction_ms)
+            if command and message:
+                if self.command_manager.execute(command):
+                    self.ui.update_status(message)
+                    self.match_manager.current.saved = False
+            elif message:
+                self.ui.update_status(message)
+        except ValueError as e:
+            self.logger.warning(str(e))
+            self.ui.show_warning("입력 오류", str(e))
+        except Exception as e:
+            self.logger.error(f"Error in shift_highlights: {str(e)}")
+            self.ui.show_error(f"하이라이트 이동 중 오류: {str(e)}")
+
+    def normalize_highlights(self):
+        """
+        겹치거나 가까운 구간을 합치고 중복 메모를 정리 (실행 취소 가능).
+        간격은 export_merge_gap_ms 설정을 따르며, 여유 시간은 내보낼 때만 적용한다.
+        """
+        try:
+            settings = self.save_manager.load_settings()
+            options = NormalizeOptions.from_settings(settings)
+            options = NormalizeOptions(merge_gap_ms=options.merge_gap_ms or 0, dedupe=True)
+            command, message = self.highlight_manager.normalize(options)
+            if command and message:
+                if self.command_manager.execute(command):
+                    self.match_manager.current.saved = False
+            if message:
+                self.ui.update_status(message)
+        except Exception as e:
+            self.logger.error(f"Error in normalize_highlights: {str(e)}")
+            self.ui.show_error(f"하이라이트 정리 중 오류: {str(e)}")
+
     def save_highlights(self):
+        """형식별 내보내기는 백그라운드 스레드에서 하고, 끝나면 GUI 스레드에서 결과(형식별 소요 시간)를 표시"""
         try:
-            message = self.save_manager.save(self.highlight_manager.get_highlights())
+            match = self.match_manager.current
+            message = self.save_manager.save(
+                match.highlight_manager.get_highlights(),
+                on_done=lambda finish: self.invoker.post(lambda: self.save_finished(finish)),
+                on_saved=lambda: setattr(match, 'saved', True))
             self.ui.update_status(message)
         except RuntimeError as e:
             self.logger.error(str(e))
@@ -198,12 +511,34 @@ class HighlightRecorderApp:
             self.logger.error(f"Error in save_highlights: {str(e)}")
             self.ui.show_error(f"하이라이트 저장 중 오류: {str(e)}")
 
+    def save_finished(self, finish):
+        try:
+            self.ui.update_status(finish())
+        except RuntimeError as e:
+            self.logger.error(str(e))
+            self.ui.show_error(str(e))
+        except Exception as e:
+            self.logger.error(f"Error in save_finished: {str(e)}")
+            self.ui.show_error(f"하이라이트 저장 중 오류: {str(e)}")
+
+    def choose_export_formats(self):
+        try:
+            selected = resolve_formats(self.save_manager.load_settings().get('export_formats'))
+            keys = self.ui.ask_export_formats(available_formats(), selected)
+            if keys is None:
+                return
+            keys = resolve_formats(keys)
+            self.save_manager.save_setting('export_formats', keys)
+            self.ui.update_status(f"내보내기 형식: {', '.join(keys)}")
+        except Exception as e:
+            self.logger.error(f"Error in choose_export_formats: {str(e)}")
+            self.ui.show_error(f"내보내기 형식 설정 중 오류: {str(e)}")
+
     def undo(self):
         try:
             if self.command_manager.undo():
-                self.ui.update_highlights_view(self.highlight_manager.get_highlights())
                 self.ui.update_status("실행 취소됨")
-                self.save_manager.saved = False
+                self.match_manager.current.saved = False
             else:
                 self.ui.update_status("취소할 작업이 없습니다")
         except Exception as e:
@@ -213,9 +548,8 @@ class HighlightRecorderApp:
     def redo(self):
         try:
             if self.command_manager.redo():
-                self.ui.update_highlights_view(self.highlight_manager.get_highlights())
                 self.ui.update_status("다시 실행됨")
-                self.save_manager.saved = False
+                self.match_manager.current.saved = False
             else:
                 self.ui.update_status("다시 실행할 작업이 없습니다")
         except Exception as e:
@@ -227,10 +561,19 @@ class HighlightRecorderApp:
             if self.session_saved:
                 self.logger.debug("Session already saved, skipping")
                 return
-            timer_state = self.timer_manager.get_state()
-            highlights = self.highlight_manager.get_highlights()
+            matches = self.match_manager.get_state()
             memo = self.ui.get_memo()
-            self.save_manager.save_session(timer_state, highlights, memo)
+            session_file = self.save_manager.save_session(matches, memo, self.match_manager.current_index, self.session_file)
+            if session_file:
+                # 정상 종료: 저널을 비워 다음 실행에서 복구를 묻지 않게 함
+                self.session_file = session_file
+                self.journal.reset(session_file)
+                self.journal.close()
+            self.autosave.stop()
+            self.autosave.save_now(self.autosave_snapshot())
+            if self.live_export is not None:
+                self.live_export.stop()
+                self.live_export.save_now(self.autosave_snapshot())
             self.session_saved = True
             self.logger.debug("Session saved successfully")
         except Exception as e:
@@ -243,20 +586,10 @@ class HighlightRecorderApp:
                 self.ui.update_status("새 세션 시작")
                 self.logger.warning("No valid session data found for %s", session_file)
                 return
-            # 타이머 복원
-            timer_data = session_data.get('timer', {})
-            self.timer_manager.restore_state(timer_data)
-            # 버튼 상태 업데이트
-            if timer_data.get('running', False) and not timer_data.get('paused', False):
-                self.ui.pause_button.setText('타이머 일시정지')
-            elif timer_data.get('paused', False):
-                self.ui.pause_button.setText('타이머 재개')
-            else:
-                self.ui.pause_button.setText('타이머 일시정지')
-            # 하이라이트 복원
-            highlights = session_data.get('highlights', [])
-            self.highlight_manager.restore_highlights(highlights)
-            self.ui.update_highlights_view(highlights)
+            # 매치별 타이머, 하이라이트 복원 후 화면 갱신
+            self.match_manager.restore(session_data.get('matches', []), session_data.get('current_match', 0))
+            self.base_session = session_file
+            self.refresh_match_view()
             # 메모 복원
             memo = session_data.get('memo', '')
             self.ui.memo_input.setText(memo)
@@ -265,12 +598,18 @@ class HighlightRecorderApp:
         except Exception as e:
             self.logger.error(f"Error loading session: {str(e)}")
             self.ui.show_warning("세션 복구 실패", f"세션 복구에 실패했습니다: {str(e)}. 새 세션으로 시작합니다.")
-            self.timer_manager.reset()
-            self.highlight_manager.restore_highlights([])
-            self.ui.update_highlights_view([])
+            self.match_manager.restore([])
+            self.refresh_match_view()
             self.ui.memo_input.clear()
             self.ui.update_status("새 세션 시작")
 
+    def search_memos(self):
+        try:
+            self.ui.show_memo_search(self.save_manager.search_memos)
+        except Exception as e:
+            self.logger.error(f"Error in search_memos: {str(e)}")
+            self.ui.show_error(f"메모 검색 중 오류: {str(e)}")
+
     def save_theme(self):
         try:
             self.save_manager.save_theme(self.ui.current_theme)
@@ -280,11 +619,12 @@ class HighlightRecorderApp:
 
     def close_event(self, event):
         try:
-            self.save_session()
-            if self.save_manager.check_unsaved(self.highlight_manager.get_highlights()):
-                event.accept()
-            else:
+            # 종료를 취소하면 저널/자동 저장을 계속 써야 하므로 확인이 끝난 뒤에 정리
+            if not self.save_manager.check_unsaved(self.match_manager.matches):
                 event.ignore()
+                return
+            self.save_session()
+            event.accept()
         except Exception as e:
             self.logger.error(f"Error in close_event: {str(e)}")
             self.ui.show_error(f"프로그램 종료 중 오류: {str(e)}")
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('ui.py', '.'), ('timer.py', '.'), ('highlight.py', '.'), ('save.py', '.'), ('highlight_saver.py', '.'), ('models.py', '.')],
+    datas=[('ui.py', '.'), ('timer.py', '.'), ('highlight.py', '.'), ('save.py', '.'), ('highlight_saver.py', '.'), ('models.py', '.'), ('clock.py', '.'), ('match.py', '.'), ('gameclock.py', '.'), ('interval_index.py', '.'), ('columns.py', '.'), ('memo_index.py', '.'), ('normalize.py', '.'), ('journal.py', '.'), ('session_manifest.py', '.'), ('autosave.py', '.'), ('storage_sqlite.py', '.'), ('session_format.py', '.'), ('snapshot_store.py', '.'), ('xmeml_writer.py', '.'), ('xmeml_template.py', '.'), ('exporters.py', '.'), ('prompts.py', '.'), ('live_export.py', '.'), ('timecode.py', '.'), ('templates', 'templates')],
     hiddenimports=['PyQt5', 'PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.sip', 'PyQt5.Qt'],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,179 @@
+from typing import Any, Callable, Dict, List, Optional
+from clock import ClockEngine, get_default_clock
+from timer import TimerManager
+from highlight import HighlightManager
+from commands import CommandManager
+from journal import Journal, MatchJournal
+import logging
+
+class Match:
+    """매치 하나의 타이머, 하이라이트 목록, 실행 취소 기록"""
+    def __init__(self, match_id: int, name: str, clock: ClockEngine, update_callback: Callable[[int, int, int], None],
+                 history_limits: Optional[Dict[str, int]] = None):
+        self.match_id = match_id
+        self.name = name
+        self.timer_manager = TimerManager(update_callback, clock)
+        self.highlight_manager = HighlightManager()
+        self.command_manager = CommandManager(**(history_limits or {}))
+        self.saved = False  # 마지막 변경 이후 하이라이트를 내보냈는지 (매치마다 따로 저장하므로 매치별)
+        self.journal_listener: Optional[MatchJournal] = None
+
+    def attach_journal(self, journal: Optional[Journal], locate: Optional[Callable[[], Optional[int]]] = None):
+        """
+        명령 실행, 타이머 상태, 기록 시작 변경을 저널에 남김 (None이면 해제).
+        :param locate: 레코드에 남길 현재 매치 인덱스 (MatchManager가 넘김)
+        """
+        if self.journal_listener is not None:
+            self.highlight_manager.remove_listener(self.journal_listener)
+            self.journal_listener = None
+        if journal is None:
+            self.command_manager.listener = None
+            self.timer_manager.state_listener = None
+            return
+        self.journal_listener = MatchJournal(journal, locate or (lambda: 0))
+        self.command_manager.listener = self.journal_listener.command_done
+        self.timer_manager.state_listener = self.journal_listener.timer_changed
+        self.highlight_manager.add_listener(self.journal_listener)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'timer': self.timer_manager.get_state(),
+            'highlights': self.highlight_manager.get_highlights(),
+            'recording_start_ms': self.highlight_manager.highlight_start_time,
+            'saved': self.saved,
+        }
+
+    def close(self):
+        self.timer_manager.close()
+
+class MatchManager:
+    """
+    동시에 진행되는 여러 매치를 관리.
+    모든 매치의 타이머는 하나의 ClockEngine 스레드를 공유한다.
+    """
+    def __init__(self, tick_callback: Callable[[int, int, int, int], None], clock: Optional[ClockEngine] = None,
+                 history_limits: Optional[Dict[str, int]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.clock = clock or get_default_clock()
+        self.history_limits = history_limits  # 매치별 CommandManager 실행 취소 기록 제한
+        self.tick_callback = tick_callback  # (match_id, minutes, seconds, elapsed_ms)
+        self.matches: List[Match] = []
+        self.current_index = 0
+        self._next_id = 1
+        self.journal: Optional[Journal] = None
+        self.highlight_listeners: List = []  # 모든 매치(이후 추가되는 매치 포함)의 HighlightManager에 등록
+
+    def attach_journal(self, journal: Optional[Journal]):
+        """이후 모든 매치의 변경을 journal에 기록 (None이면 기록 중지, 저널 재생/복원 중에 사용)"""
+        self.journal = journal
+        for match in self.matches:
+            match.attach_journal(journal, self._locator(match))
+
+    def add_highlight_listener(self, listener):
+        self.highlight_listeners.append(listener)
+        for match in self.matches:
+            match.highlight_manager.add_listener(listener)
+
+    def _locator(self, match: Match) -> Callable[[], Optional[int]]:
+        """저널 레코드용 매치 인덱스 (닫힌 매치면 None)"""
+        def locate() -> Optional[int]:
+            for index, candidate in enumerate(self.matches):
+                if candidate is match:
+                    return index
+            return None
+        return locate
+
+    def _record(self, record: Dict[str, Any]):
+        if self.journal is not None:
+            self.journal.append(record)
+
+    @property
+    def current(self) -> Match:
+        return self.matches[self.current_index]
+
+    def add_match(self, name: Optional[str] = None) -> Match:
+        try:
+            match_id = self._next_id
+            self._next_id += 1
+            if not name:
+                name = f"매치 {match_id}"
+            callback = lambda m, s, e, match_id=match_id: self.tick_callback(match_id, m, s, e)
+            match = Match(match_id, name, self.clock, callback, self.history_limits)
+            self.matches.append(match)
+            match.attach_journal(self.journal, self._locator(match))
+            for listener in self.highlight_listeners:
+                match.highlight_manager.add_listener(listener)
+            self._record({'t': 'match_add', 'name': name})
+            self.logger.debug("Match added: %s (id=%d)", name, match_id)
+            return match
+        except Exception as e:
+            self.logger.error(f"Error adding match: {str(e)}")
+            raise
+
+    def remove_match(self, index: int):
+        try:
+            if index < 0 or index >= len(self.matches):
+                raise ValueError("유효하지 않은 매치 인덱스입니다.")
+            if len(self.matches) == 1:
+                raise ValueError("마지막 매치는 닫을 수 없습니다.")
+            match = self.matches.pop(index)
+            match.close()
+            if self.current_index >= len(self.matches) or self.current_index > index:
+                self.current_index = max(0, self.current_index - 1)
+            self._record({'t': 'match_remove', 'index': index})
+            self.logger.debug("Match removed: %s (id=%d)", match.name, match.match_id)
+        except Exception as e:
+            self.logger.error(f"Error removing match: {str(e)}")
+            raise
+
+    def set_current(self, index: int):
+        if index < 0 or index >= len(self.matches):
+            raise ValueError("유효하지 않은 매치 인덱스입니다.")
+        self.current_index = index
+        self._record({'t': 'match_current', 'index': index})
+
+    def rename_match(self, index: int, name: str):
+        if index < 0 or index >= len(self.matches):
+            raise ValueError("유효하지 않은 매치 인덱스입니다.")
+        if not name.strip():
+            raise ValueError("매치 이름이 비어 있습니다.")
+        self.matches[index].name = name.strip()
+        self._record({'t': 'match_rename', 'index': index, 'name': name.strip()})
+
+    def find(self, match_id: int) -> Optional[Match]:
+        for match in self.matches:
+            if match.match_id == match_id:
+                return match
+        return None
+
+    def get_state(self) -> List[Dict[str, Any]]:
+        return [match.get_state() for match in self.matches]
+
+    def restore(self, matches_state: List[Dict[str, Any]], current_index: int = 0):
+        """
+        저장된 매치 목록으로 교체. 빈 목록이면 새 매치 하나로 시작.
+        복원 과정은 저널에 남기지 않으므로 호출한 쪽에서 이후 체크포인트를 저장해야 한다.
+        """
+        journal = self.journal
+        self.attach_journal(None)
+        try:
+            for match in self.matches:
+                match.close()
+            self.matches = []
+            self._next_id = 1
+            for state in matches_state:
+                match = self.add_match(state.get('name'))
+                match.timer_manager.restore_state(state.get('timer', {}))
+                match.highlight_manager.restore_highlights(state.get('highlights', []))
+                match.highlight_manager.highlight_start_time = state.get('recording_start_ms')
+                match.saved = state.get('saved', False)
+            if not self.matches:
+                self.add_match()
+            self.current_index = min(max(current_index, 0), len(self.matches) - 1)
+            self.logger.debug("Matches restored: %d matches", len(self.matches))
+        except Exception as e:
+            self.logger.error(f"Error restoring matches: {str(e)}")
+            raise
+        finally:
+            self.attach_journal(journal)
@@ -0,0 +1,311 @@
+import os
+import re
+import json
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+from session_format import is_session_file, read_session, highlight_rows
+import logging
+
+# 한글 음절의 초성 (호환용 자모)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_SET = set(CHOSEONG)
+_WORD_RE = re.compile(r'\w+')
+_CHOSEONG_PREFIX = '#'  # 초성 n-gram 키 (일반 n-gram과 충돌하지 않도록 구분)
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize('NFC', text).lower()
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(normalize(text))
+
+def choseong(word: str) -> str:
+    """한글 음절은 초성으로, 그 외 문자는 그대로 (예: '클러치' -> 'ㅋㄹㅊ')"""
+    result = []
+    for char in word:
+        code = ord(char) - 0xAC00
+        result.append(CHOSEONG[code // 588] if 0 <= code < 11172 else char)
+    return ''.join(result)
+
+def is_choseong_query(word: str) -> bool:
+    return bool(word) and all(char in _CHOSEONG_SET for char in word)
+
+def _grams(word: str, prefix: str = '') -> Set[str]:
+    """한 글자 + 두 글자 n-gram. 부분 문자열 질의는 질의의 n-gram이 모두 포함된 메모만 후보가 된다."""
+    grams = {prefix + char for char in word}
+    grams.update(prefix + word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+def memo_grams(memo: str) -> Set[str]:
+    grams: Set[str] = set()
+    for word in words(memo):
+        grams |= _grams(word)
+        if any('가' <= char <= '힣' for char in word):
+            grams |= _grams(choseong(word), _CHOSEONG_PREFIX)
+    return grams
+
+def query_grams(word: str) -> Set[str]:
+    if is_choseong_query(word):
+        return _grams(word, _CHOSEONG_PREFIX)
+    return _grams(word)
+
+def memo_matches(memo: str, query_words: List[str]) -> bool:
+    """n-gram 후보를 실제 부분 문자열 포함 여부로 확인 (단어 단위, 초성 질의 지원)"""
+    memo_words = words(memo)
+    for query in query_words:
+        if is_choseong_query(query):
+            if not any(query in choseong(word) for word in memo_words):
+                return False
+        elif not any(query in word for word in memo_words):
+            return False
+    return True
+
+class MemoIndex:
+    """
+    autosaves/sessions의 모든 세션에 있는 하이라이트 메모에 대한 역색인.
+    메모를 단어별 1~2글자 n-gram(한글은 초성 n-gram 포함)으로 나눠 저장하므로
+    '클러'나 'ㅋㄹㅊ'처럼 단어 일부만 입력해도 찾을 수 있다.
+    세션이 저장/삭제될 때마다 해당 세션만 갱신한다. 전체 색인(JSON)은 가끔만 다시 쓰고,
+    그 사이의 세션 추가/삭제는 '<색인 파일>.log'에 한 줄씩 덧붙인다 (체크포인트마다 색인 전체를 쓰지 않음).
+    로그가 compact_every줄을 넘거나 색인 파일 크기의 절반을 넘으면 색인에 합치고 로그를 비운다.
+    """
+    VERSION = 1
+
+    def __init__(self, index_file: str, session_dir: str, compact_every: int = 50):
+        self.logger = logging.getLogger(__name__)
+        self.index_file = index_file
+        self.log_file = index_file + '.log'
+        self.session_dir = session_dir
+        self.compact_every = compact_every
+        self._log_lines = 0
+        self.sessions: Dict[str, Dict[str, Any]] = {}  # 세션 파일 이름 -> {'mtime', 'size', 'timestamp', 'docs'}
+        self.docs: Dict[int, list] = {}  # 문서 id -> [세션 파일 이름, 매치 번호, 매치 이름, start_ms, end_ms, memo]
+        self.postings: Dict[str, Set[int]] = {}
+        self._next_id = 1
+        self._loaded = False
+
+    def load(self):
+        """저장된 색인을 읽고 세션 폴더와 맞춤 (최초 검색/갱신 시 한 번)"""
+        self._loaded = True
+        rebuilt = False
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.sessions = data.get('sessions', {})
+                    self.docs = {int(doc_id): doc for doc_id, doc in data.get('docs', {}).items()}
+                    self.postings = {gram: set(ids) for gram, ids in data.get('postings', {}).items()}
+                    self._next_id = data.get('next_id', max(self.docs, default=0) + 1)
+            self._replay_log()
+        except Exception as e:
+            # 색인이 깨졌으면 세션 파일에서 다시 만든다
+            self.logger.warning(f"Memo index unreadable, rebuilding: {str(e)}")
+            self.sessions, self.docs, self.postings, self._next_id = {}, {}, {}, 1
+            rebuilt = True
+        if self.sync() or rebuilt or self._log_lines:
+            self.flush()
+
+    def _replay_log(self):
+        """마지막으로 합친 뒤의 세션 추가/삭제를 다시 적용. 쓰다가 끊긴 마지막 줄은 무시"""
+        self._log_lines = 0
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.logger.warning("Memo index log truncated after %d records", self._log_lines)
+                    break
+                if record['op'] == 'add':
+                    self._remove(record['name'])
+                    for doc in record['docs']:
+                        doc_id = doc[0]
+                        self.docs[doc_id] = doc[1:]
+                        for gram in memo_grams(doc[6]):
+                            self.postings.setdefault(gram, set()).add(doc_id)
+                        self._next_id = max(self._next_id, doc_id + 1)
+                    self.sessions[record['name']] = record['entry']
+                else:
+                    for name in record['names']:
+                        self._remove(name)
+                self._log_lines += 1
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def sync(self) -> bool:
+        """세션 폴더와 비교해 삭제/변경/누락된 세션만 다시 색인. 변경이 있으면 True"""
+        changed = False
+        try:
+            os.makedirs(self.session_dir, exist_ok=True)
+            present = {}
+            for name in os.listdir(self.session_dir):
+                if is_session_file(name):
+                    stat = os.stat(os.path.join(self.session_dir, name))
+                    present[name] = (stat.st_mtime, stat.st_size)
+            for name in list(self.sessions):
+                if name not in present:
+                    self._remove(name)
+                    changed = True
+            for name, (mtime, size) in present.items():
+                entry = self.sessions.get(name)
+                if entry is not None and entry['mtime'] == mtime and entry['size'] == size:
+                    continue
+                self._add(name, read_session(os.path.join(self.session_dir, name)))
+                changed = True
+        except Exception as e:
+            self.logger.error(f"Error syncing memo index: {str(e)}")
+        return changed
+
+    def _add(self, name: str, session_data: Dict[str, Any]):
+        if name in self.sessions:
+            self._remove(name)
+        raw_matches = session_data.get('matches')
+        if raw_matches is None:
+            raw_matches = [{'name': None, 'highlights': session_data.get('highlights', [])}]
+        doc_ids = []
+        for match_index, match in enumerate(raw_matches):
+            match_name = match.get('name') or f"매치 {match_index + 1}"
+            for start_ms, end_ms, memo in highlight_rows(match.get('highlights', [])):
+                if not memo:
+                    continue
+                doc_id = self._next_id
+                self._next_id += 1
+                self.docs[doc_id] = [name, match_index, match_name, start_ms, end_ms, memo]
+                for gram in memo_grams(memo):
+                    self.postings.setdefault(gram, set()).add(doc_id)
+                doc_ids.append(doc_id)
+        path = os.path.join(self.session_dir, name)
+        stat = os.stat(path) if os.path.exists(path) else None
+        self.sessions[name] = {
+            'mtime': stat.st_mtime if stat else 0,
+            'size': stat.st_size if stat else 0,
+            'timestamp': session_data.get('timestamp', ''),
+            'docs': doc_ids,
+        }
+
+    def _remove(self, name: str):
+        entry = self.sessions.pop(name, None)
+        if entry is None:
+            return
+        for doc_id in entry['docs']:
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                continue
+            for gram in memo_grams(doc[5]):
+                ids = self.postings.get(gram)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del self.postings[gram]
+
+    def add_session(self, session_file: str, session_data: Dict[str, Any]):
+        """저장 직후의 세션 하나만 색인에 추가 (같은 파일이면 교체). 색인 파일 대신 로그에 그 세션만 덧붙임"""
+        try:
+            self._ensure_loaded()
+            name = os.path.basename(session_file)
+            self._add(name, session_data)
+            entry = self.sessions[name]
+            self._append_log({'op': 'add', 'name': name, 'entry': entry,
+                              'docs': [[doc_id] + self.docs[doc_id] for doc_id in entry['docs']]})
+        except Exception as e:
+            self.logger.error(f"Error indexing session: {str(e)}")
+
+    def remove_sessions(self, session_files: Iterable[str]):
+        try:
+            self._ensure_loaded()
+            names = [os.path.basename(session_file) for session_file in session_files]
+            for name in names:
+                self._remove(name)
+            if names:
+                self._append_log({'op': 'remove', 'names': names})
+        except Exception as e:
+            self.logger.error(f"Error removing sessions from memo index: {str(e)}")
+
+    def _append_log(self, record: Dict[str, Any]):
+        """로그에 한 줄 추가. 로그가 길어지면 색인 파일에 합침"""
+        os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            size = f.tell()
+        self._log_lines += 1
+        try:
+            index_size = os.path.getsize(self.index_file)
+        except OSError:
+            index_size = 0
+        if self._log_lines >= self.compact_every or size > index_size // 2:
+            self.flush()
+
+    def clear(self):
+        self.sessions, self.docs, self.postings, self._next_id = {}, {}, {}, 1
+        self._loaded = True
+        self.flush()
+
+    def flush(self):
+        """
+        색인 전체를 쓰고 로그를 비움 (압축). 임시 파일에 쓴 뒤 교체하여 중간에 종료되어도 색인 파일이 깨지지 않게 하며,
+        교체 후 로그를 지우기 전에 종료되면 다음 로드에서 같은 추가/삭제를 한 번 더 적용할 뿐이다.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+            data = {
+                'version': self.VERSION,
+                'next_id': self._next_id,
+                'sessions': self.sessions,
+                'docs': self.docs,
+                'postings': {gram: sorted(ids) for gram, ids in self.postings.items()},
+            }
+            temp_file = self.index_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, self.index_file)
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
+            self._log_lines = 0
+        except Exception as e:
+            self.logger.error(f"Error writing memo index: {str(e)}")
+
+    def search(self, query: str, limit: Optional[int] = 200) -> List[Dict[str, Any]]:
+        """
+        모든 세션에서 메모 검색. 질의의 단어가 모두 (부분 문자열로) 들어 있는 메모를 반환.
+        :return: 최근 세션, 시작 시각 순 [{'session', 'timestamp', 'match_index', 'match', 'start_ms', 'end_ms', 'memo'}]
+        """
+        try:
+            self._ensure_loaded()
+            query_words = words(query)
+            if not query_words:
+                return []
+            grams = set()
+            for word in query_words:
+                grams |= query_grams(word)
+            postings = [self.postings.get(gram) for gram in grams]
+            if any(ids is None for ids in postings):
+                return []
+            # 가장 짧은 목록부터 교집합
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates &= ids
+                if not candidates:
+                    return []
+            results = []
+            for doc_id in candidates:
+                name, match_index, match_name, start_ms, end_ms, memo = self.docs[doc_id]
+                if not memo_matches(memo, query_words):
+                    continue
+                results.append({
+                    'session': os.path.join(self.session_dir, name),
+                    'timestamp': self.sessions[name]['timestamp'],
+                    'match_index': match_index,
+                    'match': match_name,
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'memo': memo,
+                })
+            results.sort(key=lambda r: (r['timestamp'], -r['match_index'], -r['start_ms']), reverse=True)
+            return results[:limit] if limit else results
+        except Exception as e:
+            self.logger.error(f"Error searching memos: {str(e)}")
+            return []
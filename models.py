@@ -1,10 +1,75 @@
 from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+def format_time(ms: int, precise: bool = False) -> str:
+    """밀리초를 MM:SS 문자열로 변환. precise=True이고 1초 미만 값이 있으면 MM:SS.mmm"""
+    seconds, millis = divmod(int(ms), 1000)
+    text = f"{seconds // 60:02}:{seconds % 60:02}"
+    if precise and millis:
+        text += f".{millis:03}"
+    return text
+
+def parse_time(text: str) -> int:
+    """MM:SS 또는 MM:SS.mmm 문자열을 밀리초로 변환"""
+    minutes_str, seconds_str = text.strip().split(':')
+    minutes = int(minutes_str)
+    if '.' in seconds_str:
+        sec_str, frac_str = seconds_str.split('.', 1)
+        millis = int((frac_str + '000')[:3]) if frac_str else 0
+    else:
+        sec_str, millis = seconds_str, 0
+    seconds = int(sec_str)
+    if minutes < 0 or seconds < 0:
+        raise ValueError("음수 시간은 허용되지 않습니다.")
+    return (minutes * 60 + seconds) * 1000 + millis
+
+def parse_offset(text: str) -> int:
+    """부호 있는 시간 차이를 밀리초로 변환 (초 단위 숫자 '+5', '-1.5' 또는 '-MM:SS[.mmm]')"""
+    text = text.strip()
+    sign = -1 if text.startswith('-') else 1
+    body = text.lstrip('+-').strip()
+    if not body:
+        raise ValueError("시간이 비어 있습니다.")
+    if ':' in body:
+        return sign * parse_time(body)
+    return sign * round(float(body) * 1000)
+
+def ms_to_frames(ms: int, timebase: int) -> int:
+    """밀리초를 해당 프레임 속도의 정확한 프레임 번호로 변환 (해당 시각이 속한 프레임)"""
+    return int(ms) * timebase // 1000
+
+def row_from_dict(data: Dict[str, Any]) -> Tuple[int, int, str]:
+    """세션 JSON 항목을 (start_ms, end_ms, memo)로 변환"""
+    # 이전 세션은 초 단위 정수 raw_start/raw_end로 저장됨
+    if 'start_ms' in data:
+        return int(data['start_ms']), int(data['end_ms']), data.get('memo', '')
+    return round(data['raw_start'] * 1000), round(data['raw_end'] * 1000), data.get('memo', '')
+
+def display_string(start_ms: int, end_ms: int, memo: str) -> str:
+    return f"{format_time(start_ms)}~{format_time(end_ms)}, {memo}"
 
 @dataclass
 class Highlight:
-    raw_start: int
-    raw_end: int
+    # 시즌 아카이브는 수십만 개를 다루므로 인스턴스별 __dict__를 만들지 않음
+    __slots__ = ('start_ms', 'end_ms', 'memo')
+    start_ms: int
+    end_ms: int
     memo: str
 
+    @property
+    def raw_start(self) -> float:
+        return self.start_ms / 1000
+
+    @property
+    def raw_end(self) -> float:
+        return self.end_ms / 1000
+
     def to_display_string(self):
-        return f"{self.raw_start//60:02}:{self.raw_start%60:02}~{self.raw_end//60:02}:{self.raw_end%60:02}, {self.memo}"
\ No newline at end of file
+        return display_string(self.start_ms, self.end_ms, self.memo)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'start_ms': self.start_ms, 'end_ms': self.end_ms, 'memo': self.memo}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Highlight':
+        return cls(*row_from_dict(data))
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from models import Highlight
+from columns import HighlightColumns, iter_rows
+
+MEMO_SEPARATOR = " / "
+
+@dataclass(frozen=True)
+class NormalizeOptions:
+    """
+    내보내기 전 하이라이트 정리 옵션.
+    - merge_gap_ms: 겹치거나 간격이 이 값 이하인 구간을 하나로 합침 (None이면 합치지 않음)
+    - pre_roll_ms / post_roll_ms: 앞뒤 여유 시간 (시작은 0 미만으로 내려가지 않음)
+    - dedupe: 합쳐진 구간 안의 같은 메모, 완전히 같은 하이라이트를 한 번만 남김
+    """
+    merge_gap_ms: Optional[int] = None
+    pre_roll_ms: int = 0
+    post_roll_ms: int = 0
+    dedupe: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.merge_gap_ms is not None or bool(self.pre_roll_ms) or bool(self.post_roll_ms) or self.dedupe
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> 'NormalizeOptions':
+        """settings.json의 export_merge_gap_ms, export_pre_roll_ms, export_post_roll_ms, export_dedupe"""
+        gap = settings.get('export_merge_gap_ms')
+        return cls(
+            merge_gap_ms=None if gap is None else int(gap),
+            pre_roll_ms=int(settings.get('export_pre_roll_ms', 0)),
+            post_roll_ms=int(settings.get('export_post_roll_ms', 0)),
+            dedupe=bool(settings.get('export_dedupe', False)),
+        )
+
+def _join_memos(memos: List[str], dedupe: bool) -> str:
+    memos = [memo for memo in memos if memo]
+    if dedupe:
+        memos = list(dict.fromkeys(memos))
+    return MEMO_SEPARATOR.join(memos)
+
+def normalize_highlights(highlights: Union[Iterable[Highlight], HighlightColumns],
+                         options: NormalizeOptions) -> HighlightColumns:
+    """
+    정렬 한 번과 한 번의 순회로 여유 시간 적용, 구간 병합, 중복 제거를 수행.
+    입력(실시간 목록)은 수정하지 않고 새 HighlightColumns를 반환한다.
+    """
+    rows = sorted(iter_rows(highlights), key=lambda row: (row[0], row[1]))
+    result = HighlightColumns()
+    pre, post = options.pre_roll_ms, options.post_roll_ms
+    gap = options.merge_gap_ms
+    group_start = group_end = None
+    group_memos: List[str] = []
+    # 같은 (시작, 끝)은 정렬 후 연속해 있지만 메모 순서는 입력 순서이므로, 그 구간에서 나온 메모를 모두 기억
+    previous = None
+    seen: Set[str] = set()
+    for start_ms, end_ms, memo in rows:
+        # max(0, s - pre)는 단조 증가이므로 여유 시간을 적용해도 정렬 순서가 유지됨
+        start_ms = max(0, start_ms - pre)
+        end_ms = end_ms + post
+        if gap is None:
+            if options.dedupe:
+                if (start_ms, end_ms) != previous:
+                    previous = (start_ms, end_ms)
+                    seen.clear()
+                elif memo in seen:
+                    continue
+                seen.add(memo)
+            result.append(start_ms, end_ms, memo)
+            continue
+        if group_start is not None and start_ms <= group_end + gap:
+            group_end = max(group_end, end_ms)
+            group_memos.append(memo)
+            continue
+        if group_start is not None:
+            result.append(group_start, group_end, _join_memos(group_memos, options.dedupe))
+        group_start, group_end, group_memos = start_ms, end_ms, [memo]
+    if group_start is not None:
+        result.append(group_start, group_end, _join_memos(group_memos, options.dedupe))
+    return result
@@ -0,0 +1,26 @@
+from typing import Optional
+import logging
+
+class Prompter:
+    """
+    관리자 클래스(HighlightManager, TimerManager, SaveManager)가 사용자에게 묻거나 알릴 때 쓰는 인터페이스.
+    Qt 대화상자 구현은 ui.HighlightRecorderUI이며, 이 기본 구현은 Qt 없이 동작한다
+    (입력은 모두 취소, 경고/오류는 로그) — 일괄 내보내기, 벤치마크, 헤드리스 환경용.
+    """
+    def ask_text(self, title: str, label: str, text: str = '') -> Optional[str]:
+        """한 줄 입력. 취소하면 None"""
+        return None
+
+    def ask_save_path(self, title: str, file_filter: str) -> Optional[str]:
+        """저장할 파일 경로. 취소하면 None"""
+        return None
+
+    def ask_save_before_exit(self) -> Optional[bool]:
+        """저장하지 않은 하이라이트가 있을 때: True 저장 후 종료, False 저장하지 않고 종료, None 취소"""
+        return False
+
+    def show_warning(self, title: str, message: str):
+        logging.getLogger(__name__).warning(f"{title}: {message}")
+
+    def show_error(self, message: str):
+        logging.getLogger(__name__).error(message)
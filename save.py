@@ -1,107 +1,245 @@
 import os
 import json
 import glob
+import threading
 from datetime import datetime
-from typing import List, Dict, Any
-from PyQt5.QtWidgets import QMessageBox
+from typing import Callable, List, Dict, Any, Optional
 from highlight_saver import HighlightSaver
+from prompts import Prompter
+from timecode import FrameRate
+from exporters import summarize
 from models import Highlight
+from columns import HighlightColumns, iter_rows
+from memo_index import MemoIndex
+from normalize import NormalizeOptions
+from session_manifest import SessionManifest
+from autosave import write_atomic, format_snapshot
+from storage_sqlite import SqliteSessionStore, is_session_ref
+from session_format import COMPACT_EXTENSION, JSON_EXTENSION, is_session_file, read_session, write_session
+from snapshot_store import DELTA_EXTENSION, DeltaSnapshotStore, is_snapshot_file
 import logging
 
 class SaveManager:
-    def __init__(self, parent):
-        self.parent = parent
-        self.saved = False
+    def __init__(self, parent: Optional[Prompter] = None):
+        self.parent = parent or Prompter()  # 대화상자 (GUI에서는 HighlightRecorderUI)
         self.logger = logging.getLogger(__name__)
-        self.saver = HighlightSaver(parent)
+        self.saver = HighlightSaver()
+        self.exporting = False  # 백그라운드 내보내기 진행 중 (GUI 스레드에서만 읽고 씀)
         self.session_dir = 'autosaves/sessions'
         self.settings_file = 'autosaves/settings.json'
-        self.max_sessions = 10
+        self.autosave_file = 'autosaves/highlights_autosave.txt'
+        settings = self.load_settings()
+        self.saver.template_name = settings.get('xmeml_template')  # 예: '4k60' 또는 템플릿 파일 경로
+        self.saver.frame_rate = self._frame_rate(settings)
+        self.max_sessions = settings.get('max_sessions', 10)
+        # 'session_format': 'delta'(기본, 이전 스냅샷 대비 변경분 .hld), 'compact'(압축 .hls), 'json'. 읽기는 모든 형식 지원
+        self.session_extension = {'json': JSON_EXTENSION, 'compact': COMPACT_EXTENSION}.get(
+            settings.get('session_format'), DELTA_EXTENSION)
+        self.snapshots = DeltaSnapshotStore(self.session_dir, settings.get('session_rebase_every', 20))
+        self.manifest = SessionManifest(self.session_dir)
+        self.memo_index = MemoIndex('autosaves/memo_index.json', self.session_dir)
+        # 'session_backend': 'sqlite'이면 세션을 autosaves/sessions.db에 저장 (기본은 session_*.json 파일)
+        self.store: Optional[SqliteSessionStore] = None
+        if settings.get('session_backend') == 'sqlite':
+            self.store = self._open_store(settings)
 
-    def save(self, highlights: List[Highlight]) -> str:
+    def _frame_rate(self, settings: Dict[str, Any]) -> FrameRate:
+        try:
+            return FrameRate.parse(settings.get('frame_rate'))
+        except ValueError as e:
+            self.logger.error(f"Invalid frame_rate setting, using 60: {str(e)}")
+            return FrameRate.parse(60)
+
+    def _open_store(self, settings: Dict[str, Any]) -> Optional[SqliteSessionStore]:
+        """SQLite 저장소 열기. 처음 사용할 때 기존 JSON 세션을 가져옴. 실패하면 JSON 파일로 계속 저장"""
+        try:
+            max_mb = settings.get('session_retention_mb')
+            store = SqliteSessionStore('autosaves/sessions.db',
+                                       max_age_days=settings.get('session_retention_days'),
+                                       max_bytes=None if max_mb is None else int(max_mb * 1024 * 1024))
+            if store.is_empty():
+                store.import_json_dir(self.session_dir)
+            return store
+        except Exception as e:
+            self.logger.error(f"Failed to open session database, using JSON sessions: {str(e)}")
+            return None
+
+    def save(self, highlights: List[Highlight], file_path: Optional[str] = None,
+             on_done: Optional[Callable[[Callable[[], str]], None]] = None,
+             on_saved: Optional[Callable[[], None]] = None, title: str = "하이라이트 저장") -> str:
+        """
+        하이라이트를 설정된 형식들로 저장.
+        :param file_path: 저장할 텍스트 파일 경로 (없으면 저장 대화상자로 물어봄)
+        :param on_done: 지정하면 내보내기를 백그라운드 스레드에서 하고 바로 반환한다. 끝나면 그 스레드에서
+                        on_done(finish)를 호출하며, 호출한 쪽은 GUI 스레드에서 finish()로 결과 메시지를 얻는다
+                        (실패하면 RuntimeError). GUI에서는 MainThreadInvoker.post로 넘긴다
+        :param on_saved: 모든 형식을 저장했을 때 결과 메시지를 만들기 전에 호출 (매치의 저장 상태 표시용)
+        :param title: 저장 대화상자 제목
+        """
         if not highlights:
             self.logger.warning("No highlights to save")
             return "저장할 하이라이트가 없습니다."
-        success = self.saver.save_highlights(highlights)
+        if self.exporting:
+            return "이전 내보내기가 아직 진행 중입니다."
+        if file_path is None:
+            file_path = self.parent.ask_save_path(title, "Text Files (*.txt);;All Files (*)")
+            if not file_path:
+                self.logger.warning("Save cancelled")
+                return "파일 저장 취소"
+        settings = self.load_settings()
+        options = NormalizeOptions.from_settings(settings)
+        formats = settings.get('export_formats')
+        if on_done is None:
+            return self._save_result(self.saver.save_highlights(highlights, file_path, options, formats), on_saved)
+        # 내보내는 동안 GUI 스레드에서 하이라이트가 바뀌어도 영향이 없도록 값으로 복사
+        rows = tuple(iter_rows(highlights))
+
+        def run():
+            success = self.saver.save_highlights(rows, file_path, options, formats)
+            on_done(lambda: self._save_result(success, on_saved))
+
+        self.exporting = True
+        threading.Thread(target=run, name="HighlightExport").start()
+        return f"하이라이트 내보내는 중... ({len(rows)}개)"
+
+    def _save_result(self, success: bool, on_saved: Optional[Callable[[], None]] = None) -> str:
+        """내보내기 결과 메시지 (last_results 요약). 실패한 형식이 있으면 RuntimeError"""
+        self.exporting = False
         if success:
-            self.saved = True
+            if on_saved is not None:
+                on_saved()
             self.logger.debug("Highlights saved successfully")
-            return "파일 저장됨"
+            return f"파일 저장됨 ({summarize(self.saver.last_results)})"
+        failed = [result.key for result in self.saver.last_results if not result.ok]
+        if failed:
+            self.logger.error("Failed to export: %s", ', '.join(failed))
+            raise RuntimeError(f"하이라이트 저장 실패: {', '.join(failed)}")
         self.logger.error("Failed to save highlights")
         raise RuntimeError("하이라이트 저장 실패")
 
     def auto_save(self, highlights: List[Highlight]):
+        """현재 하이라이트를 자동 저장 파일에 동기 저장 (평소에는 AutosaveService가 백그라운드로 처리)"""
         if not highlights:
             return
         try:
-            os.makedirs('autosaves', exist_ok=True)
-            with open('autosaves/highlights_autosave.txt', 'w', encoding='utf-8') as f:
-                for h in highlights:
-                    f.write(h.to_display_string() + '\n')
+            write_atomic(self.autosave_file, format_snapshot([(0, '', highlights)]))
             self.logger.debug("Auto-save completed")
         except Exception as e:
             self.logger.error(f"Error in auto_save: {str(e)}")
 
-    def check_unsaved(self, highlights: List[Highlight]):
-        if highlights and not self.saved:
-            try:
-                reply = QMessageBox.question(self.parent, '종료 확인',
-                                            '하이라이트가 저장되지 않았습니다. 저장 후 종료하시겠습니까?',
-                                            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
-                                            QMessageBox.Cancel)
-                if reply == QMessageBox.Yes:
-                    self.save(highlights)
-                    return True
-                elif reply == QMessageBox.No:
-                    return True
-                return False
-            except Exception as e:
-                self.logger.error(f"Error checking unsaved: {str(e)}")
-                return True
-        return True
-
-    def save_session(self, timer_state: Dict[str, Any], highlights: List[Highlight], memo: str):
+    def check_unsaved(self, matches: List[Any]):
+        """
+        하이라이트를 내보내지 않은 매치가 있으면 저장 여부를 물음. 저장을 고르면 그런 매치를 하나씩 저장한다.
+        :param matches: saved 속성과 highlight_manager가 있는 매치 목록 (MatchManager.matches)
+        :return: 종료해도 되면 True, 취소하거나 저장에 실패하면 None
+        """
+        unsaved = [m for m in matches if not m.saved and m.highlight_manager.get_highlights()]
+        if not unsaved:
+            return True
         try:
-            os.makedirs(self.session_dir, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            session_file = os.path.join(self.session_dir, f'session_{timestamp}.json')
+            reply = self.parent.ask_save_before_exit()
+            if reply is None:
+                return None
+            if reply:
+                if self.exporting:
+                    raise RuntimeError("이전 내보내기가 아직 진행 중입니다. 끝난 뒤 다시 종료하세요.")
+                for match in unsaved:
+                    self.save(match.highlight_manager.get_highlights(), title=f"하이라이트 저장 - {match.name}",
+                              on_saved=lambda match=match: setattr(match, 'saved', True))
+            return True
+        except Exception as e:
+            # 저장하고 종료하기로 했는데 실패하면 하이라이트를 잃지 않도록 종료를 취소
+            self.logger.error(f"Error checking unsaved: {str(e)}")
+            self.parent.show_error(str(e))
+            return None
+
+    def save_session(self, matches: List[Dict[str, Any]], memo: str, current_match: int = 0,
+                     session_file: Optional[str] = None) -> Optional[str]:
+        """
+        세션 저장.
+        :param matches: 매치별 {'name', 'timer', 'highlights'} 목록
+        :param memo: 입력 중이던 메모
+        :param current_match: 선택되어 있던 매치 인덱스
+        :param session_file: 덮어쓸 세션 파일 (체크포인트). 없으면 새 파일
+        :return: 저장한 세션 파일 경로 (실패 시 None)
+        """
+        try:
+            if session_file is None and self.store is None:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                session_file = os.path.join(self.session_dir, f'session_{timestamp}{self.session_extension}')
+            current = matches[current_match] if 0 <= current_match < len(matches) else {}
             session_data = {
                 'timestamp': datetime.now().isoformat(),
-                'highlight_count': len(highlights),
-                'total_time': timer_state.get('elapsed_time', 0),
-                'timer': timer_state,
-                'highlights': [
-                    {'raw_start': h.raw_start, 'raw_end': h.raw_end, 'memo': h.memo}
-                    for h in highlights
+                'highlight_count': sum(len(m['highlights']) for m in matches),
+                'total_time': current.get('timer', {}).get('elapsed_time', 0),  # 세션 목록 표시용 (초)
+                'matches': [
+                    {
+                        'name': m['name'],
+                        'timer': m['timer'],
+                        'highlights': m['highlights'],
+                        'recording_start_ms': m.get('recording_start_ms'),
+                        'saved': m.get('saved', False),
+                    }
+                    for m in matches
                 ],
+                'current_match': current_match,
                 'memo': memo,
-                'saved': self.saved
+                'saved': all(m.get('saved', False) for m in matches)
             }
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, ensure_ascii=False, indent=2)
+            if self.store is not None and (session_file is None or is_session_ref(session_file)):
+                session_file = self.store.save_session(session_data, session_file)
+                self.store.apply_retention(keep=session_file)
+                return session_file
+            os.makedirs(self.session_dir, exist_ok=True)
+            # 저장 도중 종료되어도 이전 스냅샷이 남도록 임시 파일에 쓴 뒤 교체
+            if is_snapshot_file(session_file):
+                self.snapshots.write(session_file, session_data)
+            else:
+                write_session(session_file, session_data)
             self.logger.debug("Session saved to %s", session_file)
+            self.manifest.update(session_file, session_data)
+            self.memo_index.add_session(session_file, session_data)
             self._limit_sessions()
+            return session_file
         except Exception as e:
             self.logger.error(f"Failed to save session: {str(e)}")
+            return None
 
     def load_session(self, session_file: str) -> Dict[str, Any]:
         try:
-            if not os.path.exists(session_file):
-                self.logger.debug("Session file not found: %s", session_file)
-                return {}
-            with open(session_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.saved = data.get('saved', False)
+            if is_session_ref(session_file):
+                data = self.store.load_session(session_file) if self.store is not None else {}
+                if not data:
+                    self.logger.debug("Session not found: %s", session_file)
+                    return {}
+            else:
+                if not os.path.exists(session_file):
+                    self.logger.debug("Session file not found: %s", session_file)
+                    return {}
+                # 델타 세션은 이어서 저장할 때 변경분만 쓰도록 불러온 스냅샷을 기억
+                data = self.snapshots.read(session_file, remember=True) if is_snapshot_file(session_file) \
+                    else read_session(session_file)
             self.logger.debug("Session loaded from %s", session_file)
+            # 단일 매치 시절 세션은 최상위 timer/highlights를 매치 하나로 취급
+            raw_matches = data.get('matches')
+            if raw_matches is None:
+                raw_matches = [{'timer': data.get('timer', {}), 'highlights': data.get('highlights', [])}]
             return {
                 'timestamp': data.get('timestamp', ''),
                 'highlight_count': data.get('highlight_count', 0),
                 'total_time': data.get('total_time', 0),
-                'timer': data.get('timer', {}),
-                'highlights': [
-                    Highlight(h['raw_start'], h['raw_end'], h['memo'])
-                    for h in data.get('highlights', [])
+                'matches': [
+                    {
+                        'name': m.get('name'),
+                        'timer': m.get('timer', {}),
+                        'highlights': self._columns(m.get('highlights', [])),
+                        'recording_start_ms': m.get('recording_start_ms'),
+                        # 매치별 저장 상태를 남기기 전의 세션은 최상위 값을 따름
+                        'saved': m.get('saved', data.get('saved', False)),
+                    }
+                    for m in raw_matches
                 ],
+                'current_match': data.get('current_match', 0),
                 'memo': data.get('memo', '')
             }
         except Exception as e:
@@ -110,21 +248,17 @@ class SaveManager:
                 self.parent.show_warning("세션 복구 실패", "세션 파일을 읽을 수 없습니다. 새 세션으로 시작합니다.")
             return {}
 
+    @staticmethod
+    def _columns(highlights) -> HighlightColumns:
+        # 압축 형식은 이미 HighlightColumns로 풀려 있음
+        if isinstance(highlights, HighlightColumns):
+            return highlights
+        return HighlightColumns.from_dicts(highlights)
+
     def list_sessions(self) -> List[Dict[str, Any]]:
+        """세션 목록 (최근 순). 세션 파일 대신 manifest의 메타데이터만 읽음"""
         try:
-            os.makedirs(self.session_dir, exist_ok=True)
-            session_files = glob.glob(os.path.join(self.session_dir, 'session_*.json'))
-            sessions = []
-            for file in session_files:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    sessions.append({
-                        'file': file,
-                        'timestamp': data.get('timestamp', ''),
-                        'highlight_count': data.get('highlight_count', 0),
-                        'total_time': data.get('total_time', 0)
-                    })
-            sessions.sort(key=lambda x: x['timestamp'], reverse=True)
+            sessions = self.store.list_sessions() if self.store is not None else self.manifest.sessions()
             self.logger.debug("Found %d sessions", len(sessions))
             return sessions
         except Exception as e:
@@ -133,45 +267,84 @@ class SaveManager:
 
     def _limit_sessions(self):
         try:
-            session_files = glob.glob(os.path.join(self.session_dir, 'session_*.json'))
-            session_files.sort(key=lambda x: os.path.getmtime(x))
+            session_files = self.manifest.oldest_first()
+            removed = []
             while len(session_files) > self.max_sessions:
                 oldest_file = session_files.pop(0)
-                os.remove(oldest_file)
+                if os.path.exists(oldest_file):
+                    os.remove(oldest_file)
+                removed.append(oldest_file)
                 self.logger.debug("Deleted old session file: %s", oldest_file)
+            if removed:
+                self.manifest.remove(removed)
+                self.memo_index.remove_sessions(removed)
+                self.snapshots.collect_garbage()
         except Exception as e:
             self.logger.error(f"Failed to limit sessions: {str(e)}")
 
+    def session_exists(self, session_file: Optional[str]) -> bool:
+        """세션 파일 경로 또는 'sqlite:<id>' 참조가 실제로 있는지"""
+        if not session_file:
+            return False
+        if is_session_ref(session_file):
+            return self.store is not None and self.store.has_session(session_file)
+        return os.path.exists(session_file)
+
+    def import_json_sessions(self) -> int:
+        """session_*.json 파일을 SQLite 저장소로 일괄 가져오기 (이미 가져온 파일은 건너뜀)"""
+        if self.store is None:
+            return 0
+        return self.store.import_json_dir(self.session_dir)
+
     def clear_session(self):
+        if self.store is not None:
+            # SQLite 저장소는 새 세션을 시작해도 기록을 지우지 않고 보관 정책으로만 정리
+            return
         try:
             if os.path.exists(self.session_dir):
-                for file in glob.glob(os.path.join(self.session_dir, 'session_*.json')):
-                    os.remove(file)
+                for file in glob.glob(os.path.join(self.session_dir, 'session_*')):
+                    if is_session_file(file):
+                        os.remove(file)
+                self.manifest.clear()
+                self.memo_index.clear()
+                self.snapshots.forget()
+                self.snapshots.collect_garbage()
                 self.logger.debug("All session files deleted")
-            self.saved = False
         except Exception as e:
             self.logger.error(f"Error clearing sessions: {str(e)}")
 
-    def save_theme(self, theme: str):
+    def search_memos(self, query: str) -> List[Dict[str, Any]]:
+        """저장된 모든 세션의 하이라이트 메모 검색"""
+        if self.store is not None:
+            return self.store.search(query)
+        return self.memo_index.search(query)
+
+    def load_settings(self) -> Dict[str, Any]:
+        try:
+            if not os.path.exists(self.settings_file):
+                return {}
+            with open(self.settings_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Failed to load settings: {str(e)}")
+            return {}
+
+    def save_setting(self, key: str, value: Any):
+        """다른 설정 값은 유지한 채 하나의 설정만 갱신"""
         try:
             os.makedirs('autosaves', exist_ok=True)
-            settings = {'theme': theme}
+            settings = self.load_settings()
+            settings[key] = value
             with open(self.settings_file, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
-            self.logger.debug("Theme settings saved to %s", self.settings_file)
+            self.logger.debug("Setting '%s' saved to %s", key, self.settings_file)
         except Exception as e:
-            self.logger.error(f"Failed to save theme: {str(e)}")
+            self.logger.error(f"Failed to save setting {key}: {str(e)}")
+
+    def save_theme(self, theme: str):
+        self.save_setting('theme', theme)
 
     def load_theme(self) -> str:
-        try:
-            if not os.path.exists(self.settings_file):
-                self.logger.debug("No theme settings found")
-                return "light"
-            with open(self.settings_file, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
-            theme = settings.get('theme', 'light')
-            self.logger.debug("Theme loaded: %s", theme)
-            return theme
-        except Exception as e:
-            self.logger.error(f"Failed to load theme: {str(e)}")
-            return "light"
\ No newline at end of file
+        theme = self.load_settings().get('theme', 'light')
+        self.logger.debug("Theme loaded: %s", theme)
+        return theme
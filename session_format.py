@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import zlib
+import struct
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from models import Highlight, row_from_dict
+from columns import HighlightColumns, Row
+
+# 압축 세션 파일 (.hls)
+#   MAGIC(4) | 버전 u16 | 헤더 길이 u32 | 헤더 JSON(UTF-8, 비압축) | 하이라이트 블록...
+# 헤더에는 세션 메타데이터와 매치별 블록 위치(헤더 끝 기준 offset, length, count)가 들어 있어
+# 목록 표시에는 헤더만 읽고, 하이라이트는 블록(최대 BLOCK_SIZE개) 단위로 필요할 때 푼다.
+# 블록: zlib( u32 개수 | u32 메모 테이블 길이 | 시작 시각 차분 q[] | 길이 q[] | 메모 번호 I[] | 메모 테이블 JSON )
+MAGIC = b'HLS\x01'
+VERSION = 1
+BLOCK_SIZE = 8192
+COMPACT_EXTENSION = '.hls'
+JSON_EXTENSION = '.json'
+DELTA_EXTENSION = '.hld'  # snapshot_store.DeltaSnapshotStore
+_PREAMBLE = struct.Struct('<4sHI')
+_BLOCK_HEADER = struct.Struct('<II')
+
+def is_session_file(name: str) -> bool:
+    """세션 폴더의 세션 파일 (session_*.json, session_*.hls, session_*.hld)"""
+    name = os.path.basename(name)
+    return name.startswith('session_') and name.endswith((JSON_EXTENSION, COMPACT_EXTENSION, DELTA_EXTENSION))
+
+def is_compact(path: str) -> bool:
+    return path.endswith(COMPACT_EXTENSION)
+
+def highlight_rows(highlights: Union[HighlightColumns, Iterable[Highlight], Iterable[Dict[str, Any]]]) -> Iterator[Row]:
+    """HighlightColumns, Highlight 목록, 세션 JSON의 하이라이트 dict 목록을 모두 (start_ms, end_ms, memo)로"""
+    if isinstance(highlights, HighlightColumns):
+        return highlights.rows()
+    return (row_from_dict(h) if isinstance(h, dict) else (h.start_ms, h.end_ms, h.memo) for h in highlights)
+
+def _to_little(data: array) -> bytes:
+    if sys.byteorder == 'big':
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+def _from_little(typecode: str, raw: bytes) -> array:
+    data = array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+def encode_block(rows: List[Row]) -> bytes:
+    memo_lookup: Dict[str, int] = {}
+    memos: List[str] = []
+    deltas, lengths, ids = array('q'), array('q'), array('I')
+    previous = 0
+    for start_ms, end_ms, memo in rows:
+        # 시작 시각은 거의 정렬되어 있으므로 차분과 길이로 저장하면 작은 수가 반복되어 잘 압축됨
+        deltas.append(start_ms - previous)
+        lengths.append(end_ms - start_ms)
+        previous = start_ms
+        memo_id = memo_lookup.get(memo)
+        if memo_id is None:
+            memo_id = memo_lookup[memo] = len(memos)
+            memos.append(memo)
+        ids.append(memo_id)
+    memo_table = json.dumps(memos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    payload = b''.join((_BLOCK_HEADER.pack(len(rows), len(memo_table)),
+                        _to_little(deltas), _to_little(lengths), _to_little(ids), memo_table))
+    return zlib.compress(payload, 6)
+
+def decode_block(raw: bytes) -> Tuple[array, array, array, List[str]]:
+    payload = zlib.decompress(raw)
+    count, memo_size = _BLOCK_HEADER.unpack_from(payload)
+    offset = _BLOCK_HEADER.size
+    deltas = _from_little('q', payload[offset:offset + count * 8])
+    offset += count * 8
+    lengths = _from_little('q', payload[offset:offset + count * 8])
+    offset += count * 8
+    ids = _from_little('I', payload[offset:offset + count * 4])
+    offset += count * 4
+    memos = json.loads(payload[offset:offset + memo_size].decode('utf-8'))
+    starts = array('q', accumulate(deltas))
+    ends = array('q', map(int.__add__, starts, lengths))
+    return starts, ends, ids, memos
+
+def write_compact(path: str, session_data: Dict[str, Any], block_size: int = BLOCK_SIZE):
+    """세션 dict(save_session과 같은 형태)를 압축 형식으로 원자적 저장"""
+    header = {key: value for key, value in session_data.items() if key != 'matches'}
+    header['matches'] = []
+    blocks: List[bytes] = []
+    offset = 0
+    for match in session_data.get('matches', []):
+        rows = list(highlight_rows(match.get('highlights', [])))
+        entry = {key: value for key, value in match.items() if key != 'highlights'}
+        entry['count'] = len(rows)
+        entry['blocks'] = []
+        for i in range(0, len(rows), block_size):
+            block = encode_block(rows[i:i + block_size])
+            entry['blocks'].append([offset, len(block), min(block_size, len(rows) - i)])
+            blocks.append(block)
+            offset += len(block)
+        header['matches'].append(entry)
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class CompactSessionReader:
+    """
+    압축 세션 파일 읽기. 생성 시 헤더만 읽고, 하이라이트는 iter_blocks/highlights 호출 시 블록 단위로 푼다.
+    with 문으로 사용하거나 close()로 파일을 닫는다.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            magic, version, header_size = _PREAMBLE.unpack(self._file.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError("세션 파일 형식이 아닙니다.")
+            if version > VERSION:
+                raise ValueError(f"지원하지 않는 세션 파일 버전입니다: {version}")
+            self.header: Dict[str, Any] = json.loads(self._file.read(header_size).decode('utf-8'))
+            self._data_offset = _PREAMBLE.size + header_size
+        except Exception:
+            self._file.close()
+            raise
+
+    def __enter__(self) -> 'CompactSessionReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def match_count(self) -> int:
+        return len(self.header['matches'])
+
+    def iter_blocks(self, match_index: int) -> Iterator[HighlightColumns]:
+        """매치 하나의 하이라이트를 블록(최대 BLOCK_SIZE개)씩 HighlightColumns로"""
+        for offset, length, _ in self.header['matches'][match_index]['blocks']:
+            self._file.seek(self._data_offset + offset)
+            columns = HighlightColumns()
+            columns.extend_block(*decode_block(self._file.read(length)))
+            yield columns
+
+    def highlights(self, match_index: int) -> HighlightColumns:
+        columns = HighlightColumns()
+        for offset, length, _ in self.header['matches'][match_index]['blocks']:
+            self._file.seek(self._data_offset + offset)
+            columns.extend_block(*decode_block(self._file.read(length)))
+        return columns
+
+def read_header(path: str) -> Dict[str, Any]:
+    """세션 메타데이터만 (압축 형식은 헤더만 읽고, JSON과 델타 세션 파일은 파일 전체를 읽음)"""
+    if is_compact(path):
+        with CompactSessionReader(path) as reader:
+            return reader.header
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def read_session(path: str) -> Dict[str, Any]:
+    """
+    두 형식 모두 세션 JSON과 같은 구조의 dict로 읽음.
+    압축/델타 형식의 매치 하이라이트는 dict 목록 대신 HighlightColumns이다.
+    """
+    if path.endswith(DELTA_EXTENSION):
+        from snapshot_store import read_snapshot  # snapshot_store가 이 모듈을 쓰므로 순환 import 방지
+        return read_snapshot(path)
+    if not is_compact(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with CompactSessionReader(path) as reader:
+        data = dict(reader.header)
+        matches = []
+        for index, entry in enumerate(reader.header['matches']):
+            match = {key: value for key, value in entry.items() if key not in ('count', 'blocks')}
+            match['highlights'] = reader.highlights(index)
+            matches.append(match)
+        data['matches'] = matches
+        return data
+
+def write_session(path: str, session_data: Dict[str, Any]):
+    """확장자에 맞는 형식으로 원자적 저장 (.hls: 압축 형식, .json: 기존 JSON)"""
+    if is_compact(path):
+        write_compact(path, session_data)
+        return
+    data = dict(session_data)
+    data['matches'] = [
+        dict(match, highlights=[{'start_ms': start, 'end_ms': end, 'memo': memo}
+                                for start, end, memo in highlight_rows(match.get('highlights', []))])
+        for match in session_data.get('matches', [])
+    ]
+    temp_file = path + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
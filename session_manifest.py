@@ -0,0 +1,126 @@
+import os
+import json
+from session_format import is_session_file, read_header
+from typing import Any, Dict, Iterable, List
+import logging
+
+class SessionManifest:
+    """
+    세션 파일 메타데이터(시각, 하이라이트 수, 경과 시간) 목록을 manifest.json 하나로 유지.
+    시작 시에는 폴더를 한 번 훑어 mtime/크기가 달라진 세션 파일만 다시 읽으므로
+    하이라이트가 많은 세션이 수천 개여도 목록을 바로 보여줄 수 있다.
+    """
+    VERSION = 1
+
+    def __init__(self, session_dir: str, file_name: str = 'manifest.json'):
+        self.logger = logging.getLogger(__name__)
+        self.session_dir = session_dir
+        self.path = os.path.join(session_dir, file_name)
+        self.entries: Dict[str, Dict[str, Any]] = {}  # 세션 파일 이름 -> 메타데이터
+        self._loaded = False
+
+    @staticmethod
+    def _metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'timestamp': data.get('timestamp', ''),
+            'highlight_count': data.get('highlight_count', 0),
+            'total_time': data.get('total_time', 0),
+        }
+
+    def load(self):
+        """manifest를 읽고 실제 세션 파일과 맞춤. 바뀐 것이 있으면 다시 저장"""
+        self._loaded = True
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.entries = data.get('sessions', {})
+        except Exception as e:
+            self.logger.warning(f"Session manifest unreadable, rebuilding: {str(e)}")
+            self.entries = {}
+        changed = False
+        try:
+            os.makedirs(self.session_dir, exist_ok=True)
+            present = set()
+            with os.scandir(self.session_dir) as it:
+                for item in it:
+                    if not is_session_file(item.name):
+                        continue
+                    present.add(item.name)
+                    stat = item.stat()
+                    entry = self.entries.get(item.name)
+                    if entry is not None and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                        continue
+                    try:
+                        # 압축 형식은 헤더만 읽음
+                        metadata = self._metadata(read_header(item.path))
+                    except Exception as e:
+                        self.logger.warning(f"Skipping unreadable session {item.name}: {str(e)}")
+                        continue
+                    metadata.update(mtime=stat.st_mtime, size=stat.st_size)
+                    self.entries[item.name] = metadata
+                    changed = True
+            for name in list(self.entries):
+                if name not in present:
+                    del self.entries[name]
+                    changed = True
+        except Exception as e:
+            self.logger.error(f"Error scanning session folder: {str(e)}")
+        if changed:
+            self.flush()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def update(self, session_file: str, session_data: Dict[str, Any]):
+        """방금 저장한 세션 하나의 메타데이터 갱신"""
+        self._ensure_loaded()
+        stat = os.stat(session_file)
+        metadata = self._metadata(session_data)
+        metadata.update(mtime=stat.st_mtime, size=stat.st_size)
+        self.entries[os.path.basename(session_file)] = metadata
+        self.flush()
+
+    def remove(self, session_files: Iterable[str]):
+        self._ensure_loaded()
+        for session_file in session_files:
+            self.entries.pop(os.path.basename(session_file), None)
+        self.flush()
+
+    def clear(self):
+        self.entries = {}
+        self._loaded = True
+        self.flush()
+
+    def flush(self):
+        try:
+            os.makedirs(self.session_dir, exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'sessions': self.entries}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"Error writing session manifest: {str(e)}")
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """최근 세션부터 [{'file', 'timestamp', 'highlight_count', 'total_time'}]"""
+        self._ensure_loaded()
+        sessions = [
+            {
+                'file': os.path.join(self.session_dir, name),
+                'timestamp': entry['timestamp'],
+                'highlight_count': entry['highlight_count'],
+                'total_time': entry['total_time'],
+            }
+            for name, entry in self.entries.items()
+        ]
+        sessions.sort(key=lambda x: x['timestamp'], reverse=True)
+        return sessions
+
+    def oldest_first(self) -> List[str]:
+        """수정 시각이 오래된 세션 파일부터"""
+        self._ensure_loaded()
+        names = sorted(self.entries, key=lambda name: self.entries[name]['mtime'])
+        return [os.path.join(self.session_dir, name) for name in names]
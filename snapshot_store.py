@@ -0,0 +1,233 @@
+import os
+import json
+import zlib
+import struct
+import hashlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+from columns import HighlightColumns, Row
+from session_format import BLOCK_SIZE, encode_block, decode_block
+import logging
+
+# 델타 세션 파일 (.hld)
+# 세션 파일에는 메타데이터와 매치 정보, 그리고 하이라이트를 재구성할 객체 해시 목록(chain)만 들어 있다.
+# chain[0]은 전체 하이라이트(base, 압축 세션과 같은 블록), 이후는 직전 스냅샷 대비 추가/삭제된 하이라이트(delta)이며
+# 객체는 내용의 해시를 이름으로 objects/ 폴더에 한 번만 저장된다 (같은 내용이면 다시 쓰지 않음).
+DELTA_EXTENSION = '.hld'
+FORMAT_VERSION = 1
+OBJECT_DIR = 'objects'
+_BASE, _DELTA = b'B', b'D'  # 객체 첫 바이트
+_LENGTH = struct.Struct('<I')
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _encode_delta(matches: List[Dict[str, Any]]) -> bytes:
+    raw = json.dumps(matches, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _DELTA + zlib.compress(raw, 6)
+
+def _encode_base(counters: List[Counter]) -> bytes:
+    """매치별 하이라이트를 압축 세션 형식과 같은 블록으로 (매치 하나가 블록 여러 개)"""
+    layout, blocks = [], []
+    for counter in counters:
+        rows = sorted(counter.elements(), key=lambda row: (row[0], row[1]))
+        sizes = []
+        for i in range(0, len(rows), BLOCK_SIZE):
+            block = encode_block(rows[i:i + BLOCK_SIZE])
+            sizes.append(len(block))
+            blocks.append(block)
+        layout.append(sizes)
+    header = json.dumps(layout, separators=(',', ':')).encode('utf-8')
+    return b''.join([_BASE, _LENGTH.pack(len(header)), header] + blocks)
+
+def _decode_base(data: bytes) -> List[Counter]:
+    (header_size,) = _LENGTH.unpack_from(data, 1)
+    offset = 1 + _LENGTH.size
+    layout = json.loads(data[offset:offset + header_size].decode('utf-8'))
+    offset += header_size
+    counters = []
+    for sizes in layout:
+        counter = Counter()
+        for size in sizes:
+            starts, ends, ids, memos = decode_block(data[offset:offset + size])
+            counter.update(zip(starts, ends, map(memos.__getitem__, ids)))
+            offset += size
+        counters.append(counter)
+    return counters
+
+def _rows_of(highlights) -> List[Row]:
+    if isinstance(highlights, HighlightColumns):
+        return list(highlights.rows())
+    return [(h['start_ms'], h['end_ms'], h['memo']) if isinstance(h, dict) else (h.start_ms, h.end_ms, h.memo)
+            for h in highlights]
+
+def _columns(counter: Counter) -> HighlightColumns:
+    columns = HighlightColumns()
+    for row in sorted(counter.elements(), key=lambda row: (row[0], row[1])):
+        columns.append(*row)
+    return columns
+
+class DeltaSnapshotStore:
+    """
+    세션 스냅샷을 기준(base) + 직전 스냅샷 대비 차이(delta)로 저장.
+    - 직전에 쓰거나 불러온 스냅샷의 하이라이트를 메모리에 두고, 다음 저장 때는 바뀐 하이라이트만 객체로 쓴다.
+    - chain 길이가 rebase_every에 이르거나 변경이 전체의 절반을 넘으면 새 base를 쓴다 (재구성 비용 제한).
+    - 어떤 세션 파일에서도 참조하지 않는 객체는 collect_garbage()로 지운다.
+    """
+    def __init__(self, session_dir: str, rebase_every: int = 20):
+        self.logger = logging.getLogger(__name__)
+        self.session_dir = session_dir
+        self.object_dir = os.path.join(session_dir, OBJECT_DIR)
+        self.rebase_every = max(1, rebase_every)
+        # 직전 스냅샷: (chain, 매치별 하이라이트 Counter)
+        self._last: Optional[Tuple[List[str], List[Counter]]] = None
+        self.bytes_written = 0  # 마지막 저장에서 쓴 바이트 (세션 파일 + 새 객체)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.object_dir, digest[:2], digest)
+
+    def _write_object(self, data: bytes) -> Tuple[str, int]:
+        """객체 저장. 이미 있으면 쓰지 않음. (해시, 쓴 바이트)"""
+        digest = _digest(data)
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return digest, len(data)
+
+    def _read_object(self, digest: str) -> bytes:
+        with open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def _delta(self, previous: List[Counter], current: List[Counter]) -> Tuple[List[Dict[str, Any]], int]:
+        matches, changes = [], 0
+        for index, counter in enumerate(current):
+            base = previous[index] if index < len(previous) else Counter()
+            removed = list((base - counter).elements())
+            added = list((counter - base).elements())
+            changes += len(removed) + len(added)
+            matches.append({'removed': removed, 'added': added})
+        return matches, changes
+
+    def write(self, path: str, session_data: Dict[str, Any]):
+        """save_session과 같은 형태의 세션 dict를 저장. 객체를 먼저 쓰고 세션 파일을 원자적으로 교체"""
+        try:
+            current = [Counter(_rows_of(m.get('highlights', []))) for m in session_data.get('matches', [])]
+            total = sum(sum(counter.values()) for counter in current)
+            data, chain = None, []
+            if self._last is not None and len(self._last[0]) < self.rebase_every:
+                delta, changes = self._delta(self._last[1], current)
+                if changes * 2 <= total:
+                    data, chain = _encode_delta(delta), list(self._last[0])
+            rebased = data is None
+            if rebased:
+                data = _encode_base(current)
+            digest, written = self._write_object(data)
+            chain.append(digest)
+            snapshot = {key: value for key, value in session_data.items() if key != 'matches'}
+            snapshot['format'] = 'delta'
+            snapshot['version'] = FORMAT_VERSION
+            snapshot['matches'] = [{key: value for key, value in m.items() if key != 'highlights'}
+                                   for m in session_data.get('matches', [])]
+            snapshot['chain'] = chain
+            text = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            self._last = (chain, current)
+            self.bytes_written = written + len(text.encode('utf-8'))
+            self.logger.debug("Snapshot %s written (%s, depth %d, %d bytes)",
+                              path, 'base' if rebased else 'delta', len(chain), self.bytes_written)
+            if rebased:
+                # 덮어쓴 세션 파일의 이전 chain이 더 이상 필요 없을 수 있음
+                self.collect_garbage()
+        except Exception as e:
+            self.logger.error(f"Error writing snapshot: {str(e)}")
+            raise
+
+    def read(self, path: str, remember: bool = False) -> Dict[str, Any]:
+        """
+        세션 파일을 재구성해 세션 JSON과 같은 구조로 반환 (하이라이트는 HighlightColumns).
+        remember=True면 다음 저장을 이 스냅샷 대비 delta로 쓴다 (불러온 세션을 이어서 기록할 때).
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        counters: List[Counter] = []
+        for digest in snapshot['chain']:
+            data = self._read_object(digest)
+            if data[:1] == _BASE:
+                counters = _decode_base(data)
+                continue
+            changes = json.loads(zlib.decompress(data[1:]).decode('utf-8'))
+            del counters[len(changes):]  # 삭제된 매치
+            for index, change in enumerate(changes):
+                if index >= len(counters):
+                    counters.append(Counter())
+                counters[index].subtract(map(tuple, change['removed']))
+                counters[index].update(map(tuple, change['added']))
+        counters = [+counter for counter in counters]  # 0 이하 항목 제거
+        data = {key: value for key, value in snapshot.items() if key not in ('format', 'version', 'chain')}
+        data['matches'] = [
+            dict(match, highlights=_columns(counters[index]) if index < len(counters) else HighlightColumns())
+            for index, match in enumerate(snapshot.get('matches', []))
+        ]
+        if remember:
+            self._last = (list(snapshot['chain']), counters[:len(data['matches'])])
+        return data
+
+    def forget(self):
+        """다음 저장은 base로 (세션 초기화 등)"""
+        self._last = None
+
+    def _referenced(self) -> Set[str]:
+        referenced = set(self._last[0]) if self._last is not None else set()
+        if not os.path.isdir(self.session_dir):
+            return referenced
+        for name in os.listdir(self.session_dir):
+            if not (name.startswith('session_') and name.endswith(DELTA_EXTENSION)):
+                continue
+            try:
+                with open(os.path.join(self.session_dir, name), 'r', encoding='utf-8') as f:
+                    referenced.update(json.load(f).get('chain', []))
+            except Exception as e:
+                # 읽지 못한 세션이 있으면 필요한 객체를 지울 수 있으므로 정리를 건너뜀
+                raise RuntimeError(f"세션 파일을 읽을 수 없습니다: {name}") from e
+        return referenced
+
+    def collect_garbage(self) -> int:
+        """어느 세션 파일에서도 참조하지 않는 객체 삭제. 삭제한 객체 수를 반환"""
+        try:
+            if not os.path.isdir(self.object_dir):
+                return 0
+            referenced = self._referenced()
+            removed = 0
+            for prefix in os.listdir(self.object_dir):
+                folder = os.path.join(self.object_dir, prefix)
+                for digest in os.listdir(folder):
+                    if digest not in referenced:
+                        os.remove(os.path.join(folder, digest))
+                        removed += 1
+                if not os.listdir(folder):
+                    os.rmdir(folder)
+            if removed:
+                self.logger.debug("Removed %d unreferenced snapshot objects", removed)
+            return removed
+        except Exception as e:
+            self.logger.error(f"Error collecting snapshot objects: {str(e)}")
+            return 0
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """델타 세션 파일 하나를 재구성 (같은 폴더의 objects/ 사용)"""
+    return DeltaSnapshotStore(os.path.dirname(path)).read(path)
+
+def is_snapshot_file(path: str) -> bool:
+    return path.endswith(DELTA_EXTENSION)
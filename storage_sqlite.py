@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import glob
+import time
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from memo_index import words, is_choseong_query, memo_matches
+from columns import HighlightColumns
+from session_format import is_session_file, read_session, highlight_rows
+import logging
+
+SESSION_PREFIX = 'sqlite:'  # 세션 목록/저널에서 JSON 파일 경로와 구분하기 위한 세션 참조 접두어
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    highlight_count INTEGER NOT NULL,
+    total_time INTEGER NOT NULL,
+    current_match INTEGER NOT NULL,
+    memo TEXT NOT NULL,
+    saved INTEGER NOT NULL,
+    byte_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    timer TEXT NOT NULL,
+    recording_start_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY,
+    match_id INTEGER NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    memo TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imported_files (
+    name TEXT PRIMARY KEY,
+    session_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at);
+CREATE INDEX IF NOT EXISTS idx_matches_session ON matches(session_id, position);
+CREATE INDEX IF NOT EXISTS idx_highlights_time ON highlights(match_id, start_ms, end_ms);
+DROP INDEX IF EXISTS idx_highlights_memo;
+"""
+
+# 메모 부분 문자열 검색용 FTS5 trigram 색인 (highlights를 원본으로 하는 외부 콘텐츠 테이블, SQLite 3.34 이상).
+# B-트리 색인은 LIKE '%단어%'에 쓰이지 않으므로 세 글자 이상 단어는 이 색인으로 후보를 찾는다.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE highlights_fts USING fts5(memo, content='highlights', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER highlights_fts_insert AFTER INSERT ON highlights WHEN new.memo != '' BEGIN
+    INSERT INTO highlights_fts (rowid, memo) VALUES (new.id, new.memo);
+END;
+CREATE TRIGGER highlights_fts_delete AFTER DELETE ON highlights WHEN old.memo != '' BEGIN
+    INSERT INTO highlights_fts (highlights_fts, rowid, memo) VALUES ('delete', old.id, old.memo);
+END;
+INSERT INTO highlights_fts (highlights_fts) VALUES ('rebuild');
+"""
+FTS_MIN_LENGTH = 3  # trigram 색인은 세 글자 이상 질의만 찾을 수 있음
+
+def is_session_ref(session: Optional[str]) -> bool:
+    return bool(session) and session.startswith(SESSION_PREFIX)
+
+def session_ref(session_id: int) -> str:
+    return f"{SESSION_PREFIX}{session_id}"
+
+def session_id_of(session: str) -> int:
+    return int(session[len(SESSION_PREFIX):])
+
+def _row_size(memo: str) -> int:
+    # 하이라이트 한 줄의 대략적인 저장 크기 (정수 두 개 + 메모 + 행 오버헤드)
+    return 24 + len(memo.encode('utf-8'))
+
+class SqliteSessionStore:
+    """
+    세션/매치/하이라이트를 SQLite 파일 하나에 저장하는 세션 저장소.
+    WAL 모드로 열어 저장 중에도 목록 조회가 막히지 않고, 세션 하나는 트랜잭션 하나로 일괄 삽입한다.
+    개수 대신 보관 기간(max_age_days)과 전체 크기(max_bytes)로 오래된 세션을 정리하며,
+    기존 session_*.json 파일을 한 번에 가져올 수 있다.
+    세션은 'sqlite:<id>' 문자열로 참조하므로 세션 목록, 저널 기준 세션에서 파일 경로와 같이 쓸 수 있다.
+    """
+    def __init__(self, db_file: str, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_file = db_file
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts = False  # 메모 FTS5 색인 사용 여부 (FTS5/trigram을 지원하지 않는 SQLite면 LIKE로만 검색)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 체크포인트 시에만 fsync해도 커밋이 깨지지 않음
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self.fts = self._ensure_fts(conn)
+            self._conn = conn
+        return self._conn
+
+    def _ensure_fts(self, conn: sqlite3.Connection) -> bool:
+        """메모 FTS 색인이 없으면 만들고 기존 하이라이트로 채움"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'highlights_fts'").fetchone() is not None:
+            return True
+        try:
+            conn.executescript("BEGIN;" + FTS_SCHEMA + "COMMIT;")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self.logger.warning(f"FTS5 trigram unavailable, memo search uses LIKE: {str(e)}")
+            return False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _insert(self, session_data: Dict[str, Any], created_at: float,
+                session_id: Optional[int] = None) -> int:
+        """트랜잭션 안에서 호출. 세션 하나와 그 매치/하이라이트를 삽입하고 세션 id를 반환"""
+        conn = self.conn
+        raw_matches = session_data.get('matches')
+        if raw_matches is None:
+            # 단일 매치 시절 세션
+            raw_matches = [{'timer': session_data.get('timer', {}), 'highlights': session_data.get('highlights', [])}]
+        cursor = conn.execute(
+            "INSERT INTO sessions (id, created_at, timestamp, highlight_count, total_time, current_match, memo, saved,"
+            " byte_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (session_id, created_at, session_data.get('timestamp', ''), session_data.get('highlight_count', 0),
+             session_data.get('total_time', 0), session_data.get('current_match', 0),
+             session_data.get('memo', ''), int(bool(session_data.get('saved', False)))))
+        session_id = cursor.lastrowid
+        byte_size = 0
+        for position, match in enumerate(raw_matches):
+            timer = json.dumps(match.get('timer', {}), ensure_ascii=False)
+            match_id = conn.execute(
+                "INSERT INTO matches (session_id, position, name, timer, recording_start_ms) VALUES (?, ?, ?, ?, ?)",
+                (session_id, position, match.get('name'), timer, match.get('recording_start_ms'))).lastrowid
+            rows = [(match_id, start_ms, end_ms, memo)
+                    for start_ms, end_ms, memo in highlight_rows(match.get('highlights', []))]
+            conn.executemany("INSERT INTO highlights (match_id, start_ms, end_ms, memo) VALUES (?, ?, ?, ?)", rows)
+            byte_size += len(timer) + sum(_row_size(row[3]) for row in rows)
+        conn.execute("UPDATE sessions SET byte_size = ? WHERE id = ?", (byte_size, session_id))
+        return session_id
+
+    def save_session(self, session_data: Dict[str, Any], session: Optional[str] = None) -> str:
+        """
+        세션 저장 (트랜잭션 하나). session이 주어지면 같은 id로 교체 (체크포인트).
+        :return: 세션 참조 'sqlite:<id>'
+        """
+        try:
+            with self.conn:
+                session_id = None
+                if is_session_ref(session):
+                    session_id = session_id_of(session)
+                    self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                session_id = self._insert(session_data, time.time(), session_id=session_id)
+            self.logger.debug("Session saved to %s (id %d)", self.db_file, session_id)
+            return session_ref(session_id)
+        except Exception as e:
+            self.logger.error(f"Error saving session to database: {str(e)}")
+            raise
+
+    def load_session(self, session: str) -> Dict[str, Any]:
+        """세션 JSON 파일과 같은 형태의 dict (하이라이트는 HighlightColumns). 없으면 {}"""
+        try:
+            session_id = session_id_of(session)
+            row = self.conn.execute(
+                "SELECT timestamp, highlight_count, total_time, current_match, memo, saved FROM sessions WHERE id = ?",
+                (session_id,)).fetchone()
+            if row is None:
+                self.logger.debug("Session not found in database: %s", session)
+                return {}
+            timestamp, highlight_count, total_time, current_match, memo, saved = row
+            matches = []
+            for match_id, name, timer, recording_start_ms in self.conn.execute(
+                    "SELECT id, name, timer, recording_start_ms FROM matches WHERE session_id = ? ORDER BY position",
+                    (session_id,)).fetchall():
+                highlights = HighlightColumns()
+                for row in self.conn.execute(
+                        "SELECT start_ms, end_ms, memo FROM highlights WHERE match_id = ? ORDER BY start_ms, end_ms, id",
+                        (match_id,)):
+                    highlights.append(*row)
+                matches.append({'name': name, 'timer': json.loads(timer), 'highlights': highlights,
+                                'recording_start_ms': recording_start_ms})
+            return {
+                'timestamp': timestamp,
+                'highlight_count': highlight_count,
+                'total_time': total_time,
+                'matches': matches,
+                'current_match': current_match,
+                'memo': memo,
+                'saved': bool(saved),
+            }
+        except Exception as e:
+            self.logger.error(f"Error loading session from database: {str(e)}")
+            raise
+
+    def has_session(self, session: str) -> bool:
+        try:
+            return self.conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id_of(session),)).fetchone() is not None
+        except Exception as e:
+            self.logger.error(f"Error checking session: {str(e)}")
+            return False
+
+    def list_sessions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """최근 세션부터 [{'file', 'timestamp', 'highlight_count', 'total_time'}] (하이라이트는 읽지 않음)"""
+        sql = "SELECT id, timestamp, highlight_count, total_time FROM sessions ORDER BY created_at DESC, id DESC"
+        params = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        return [
+            {'file': session_ref(session_id), 'timestamp': timestamp,
+             'highlight_count': highlight_count, 'total_time': total_time}
+            for session_id, timestamp, highlight_count, total_time in self.conn.execute(sql, params)
+        ]
+
+    def delete_sessions(self, sessions: Iterable[str]):
+        with self.conn:
+            self.conn.executemany("DELETE FROM sessions WHERE id = ?", [(session_id_of(s),) for s in sessions])
+
+    def apply_retention(self, keep: Optional[str] = None) -> int:
+        """
+        보관 기간이 지난 세션을 지우고, 전체 크기가 max_bytes를 넘으면 오래된 세션부터 지움.
+        가장 최근 세션과 keep(현재 사용 중인 세션)은 지우지 않는다. 지운 세션 수를 반환.
+        """
+        if self.max_age_days is None and self.max_bytes is None:
+            return 0
+        try:
+            rows = self.conn.execute("SELECT id, created_at, byte_size FROM sessions ORDER BY created_at, id").fetchall()
+            if not rows:
+                return 0
+            protected = {rows[-1][0]}
+            if is_session_ref(keep):
+                protected.add(session_id_of(keep))
+            doomed = []
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                doomed = [session_id for session_id, created_at, _ in rows
+                          if created_at < cutoff and session_id not in protected]
+            if self.max_bytes is not None:
+                removed = set(doomed)
+                total = sum(size for session_id, _, size in rows if session_id not in removed)
+                for session_id, _, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    if session_id in removed or session_id in protected:
+                        continue
+                    doomed.append(session_id)
+                    total -= size
+            if doomed:
+                with self.conn:
+                    self.conn.executemany("DELETE FROM sessions WHERE id = ?", [(session_id,) for session_id in doomed])
+                self.logger.debug("Retention removed %d sessions", len(doomed))
+            return len(doomed)
+        except Exception as e:
+            self.logger.error(f"Error applying session retention: {str(e)}")
+            return 0
+
+    def import_json_sessions(self, paths: Iterable[str]) -> int:
+        """
+        세션 파일(session_*.json, 압축 형식 포함)들을 트랜잭션 하나로 가져옴. 이미 가져온 파일(같은 파일 이름)은
+        보관 정책으로 지워졌더라도 다시 가져오지 않는다.
+        세션 생성 시각은 파일의 timestamp(없으면 수정 시각)를 사용한다. 가져온 세션 수를 반환.
+        """
+        try:
+            imported = 0
+            with self.conn:
+                known = {name for (name,) in self.conn.execute("SELECT name FROM imported_files")}
+                for path in paths:
+                    source = os.path.basename(path)
+                    if source in known:
+                        continue
+                    try:
+                        data = read_session(path)
+                    except Exception as e:
+                        self.logger.warning(f"Skipping unreadable session {path}: {str(e)}")
+                        continue
+                    try:
+                        created_at = datetime.fromisoformat(data['timestamp']).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        created_at = os.path.getmtime(path)
+                    session_id = self._insert(data, created_at)
+                    self.conn.execute("INSERT INTO imported_files (name, session_id) VALUES (?, ?)", (source, session_id))
+                    known.add(source)
+                    imported += 1
+            self.logger.debug("Imported %d JSON sessions into %s", imported, self.db_file)
+            return imported
+        except Exception as e:
+            self.logger.error(f"Error importing JSON sessions: {str(e)}")
+            raise
+
+    def import_json_dir(self, session_dir: str) -> int:
+        paths = glob.glob(os.path.join(session_dir, 'session_*'))
+        return self.import_json_sessions(sorted(path for path in paths if is_session_file(path)))
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def search(self, query: str, limit: Optional[int] = 200) -> List[Dict[str, Any]]:
+        """
+        모든 세션에서 메모 검색 (MemoIndex.search와 같은 결과 형식).
+        세 글자 이상 단어는 FTS5 trigram 색인으로, 더 짧은 단어는 LIKE로 후보를 줄이고,
+        초성 질의를 포함한 최종 판정은 memo_matches로 한다.
+        """
+        try:
+            query_words = words(query)
+            if not query_words:
+                return []
+            sql = ("SELECT s.id, s.timestamp, m.position, m.name, h.start_ms, h.end_ms, h.memo"
+                   " FROM highlights h JOIN matches m ON m.id = h.match_id JOIN sessions s ON s.id = m.session_id"
+                   " WHERE h.memo != ''")
+            params = []
+            fts_words = []
+            for word in query_words:
+                if is_choseong_query(word):
+                    continue
+                if self.fts and len(word) >= FTS_MIN_LENGTH:
+                    fts_words.append('"' + word.replace('"', '""') + '"')
+                else:
+                    sql += " AND h.memo LIKE ? ESCAPE '\\'"
+                    escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                    params.append(f"%{escaped}%")
+            if fts_words:
+                sql += " AND h.id IN (SELECT rowid FROM highlights_fts WHERE highlights_fts MATCH ?)"
+                params.append(' AND '.join(fts_words))
+            sql += " ORDER BY s.created_at DESC, s.id DESC, m.position, h.start_ms DESC"
+            results = []
+            for session_id, timestamp, position, name, start_ms, end_ms, memo in self.conn.execute(sql, params):
+                if not memo_matches(memo, query_words):
+                    continue
+                results.append({
+                    'session': session_ref(session_id),
+                    'timestamp': timestamp,
+                    'match_index': position,
+                    'match': name or f"매치 {position + 1}",
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'memo': memo,
+                })
+                if limit and len(results) >= limit:
+                    break
+            return results
+        except Exception as e:
+            self.logger.error(f"Error searching memos in database: {str(e)}")
+            return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        sessions, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(byte_size), 0) FROM sessions").fetchone()
+        highlights = self.conn.execute("SELECT COUNT(*) FROM highlights").fetchone()[0]
+        return {'sessions': sessions, 'highlights': highlights, 'bytes': total,
+                'file_bytes': os.path.getsize(self.db_file) if os.path.exists(self.db_file) else 0}
+
+if __name__ == "__main__":
+    # 기존 JSON 세션 일괄 가져오기: python storage_sqlite.py [세션 폴더] [DB 파일]
+    logging.basicConfig(level=logging.INFO)
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else 'autosaves/sessions'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'autosaves/sessions.db'
+    store = SqliteSessionStore(db_path)
+    began = time.perf_counter()
+    count = store.import_json_dir(source_dir)
+    print(f"{count} sessions imported in {time.perf_counter() - began:.2f}s: {store.get_stats()}")
+    store.close()
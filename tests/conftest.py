@@ -0,0 +1,15 @@
+import os
+import sys
+
+# 저장소 최상위 모듈(journal, match, ...)을 패키지 설치 없이 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture(scope='session')
+def qapp():
+    """Qt 위젯/신호 테스트용 QApplication (PyQt5가 없으면 건너뜀, 화면 없이 실행)"""
+    pytest.importorskip('PyQt5')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from autosave import AutosaveService, format_snapshot
+
+SNAPSHOT = [(1, 'A', ((1000, 2000, '골'), (62500, 63000, '')))]
+
+class Recorder:
+    """request_snapshot 호출 시각을 기록하고 바로 스냅샷을 넘김"""
+    def __init__(self):
+        self.requests = []
+        self.service = None
+        self.event = threading.Event()
+
+    def __call__(self, origin):
+        self.requests.append((time.monotonic(), origin))
+        self.service.submit(SNAPSHOT, origin)
+        self.event.set()
+
+def start(tmp_path, debounce, max_delay):
+    recorder = Recorder()
+    service = AutosaveService(str(tmp_path / 'autosave.txt'), recorder, debounce=debounce, max_delay=max_delay)
+    recorder.service = service
+    service.start()
+    return service, recorder
+
+def test_burst_is_saved_once_after_debounce(tmp_path):
+    service, recorder = start(tmp_path, debounce=0.15, max_delay=5.0)
+    try:
+        first = time.monotonic()
+        for _ in range(20):
+            service.notify()
+        assert recorder.event.wait(2.0)
+        time.sleep(0.3)
+    finally:
+        service.stop()
+    assert len(recorder.requests) == 1
+    requested, origin = recorder.requests[0]
+    assert origin >= first and requested - origin >= 0.15
+    with open(service.path, encoding='utf-8') as f:
+        assert f.read() == '00:01~00:02, 골\n01:02~01:03, \n'
+    assert not os.path.exists(service.path + '.tmp')
+    assert service.get_stats()['saves'] == 1
+
+def test_continuous_changes_are_saved_by_max_delay(tmp_path):
+    service, recorder = start(tmp_path, debounce=0.1, max_delay=0.3)
+    try:
+        first = time.monotonic()
+        while time.monotonic() - first < 0.8:
+            service.notify()  # debounce보다 자주 바뀌어도 max_delay마다 저장
+            time.sleep(0.02)
+        requests = list(recorder.requests)
+    finally:
+        service.stop()
+    assert len(requests) >= 2
+    requested, origin = requests[0]
+    assert 0.3 <= requested - origin < 0.5
+
+def test_save_now_writes_synchronously(tmp_path):
+    service, recorder = start(tmp_path, debounce=10.0, max_delay=10.0)
+    service.notify()
+    service.stop()
+    service.save_now(SNAPSHOT + [(2, 'B', ())])
+    assert recorder.requests == []
+    with open(service.path, encoding='utf-8') as f:
+        assert f.read() == '# A\n00:01~00:02, 골\n01:02~01:03, \n# B\n'
+
+def test_format_snapshot_single_match_keeps_legacy_format():
+    assert format_snapshot(SNAPSHOT) == '00:01~00:02, 골\n01:02~01:03, \n'
+
+def test_invoker_runs_on_gui_thread(qapp):
+    from ui import MainThreadInvoker
+    invoker = MainThreadInvoker()
+    ran = []
+    worker = threading.Thread(target=lambda: invoker.post(lambda: ran.append(threading.current_thread())))
+    worker.start()
+    worker.join()
+    qapp.processEvents()
+    assert ran == [threading.main_thread()]
@@ -0,0 +1,66 @@
+import threading
+import time
+from clock import ClockEngine
+from timer import TimerManager
+
+class Periodic:
+    """period초마다 origin 기준 절대 시각에 틱을 받는 구독자"""
+    def __init__(self, period, count):
+        self.period = period
+        self.count = count
+        self.origin = time.monotonic()
+        self.ticks = []
+        self.threads = set()
+        self.done = threading.Event()
+
+    def next_deadline(self):
+        if len(self.ticks) >= self.count:
+            return None
+        return self.origin + (len(self.ticks) + 1) * self.period
+
+    def on_tick(self, now):
+        self.ticks.append(now)
+        self.threads.add(threading.current_thread().name)
+        if len(self.ticks) >= self.count:
+            self.done.set()
+
+def test_ticks_follow_absolute_deadlines():
+    clock = ClockEngine()
+    fast, slow = Periodic(0.02, 15), Periodic(0.05, 6)
+    try:
+        clock.subscribe(fast)
+        clock.subscribe(slow)
+        assert fast.done.wait(2.0) and slow.done.wait(2.0)
+    finally:
+        clock.stop()
+    for subscriber in (fast, slow):
+        for number, now in enumerate(subscriber.ticks, 1):
+            # 예정 시각 전에 틱이 오지 않고, 지연이 누적되지 않음 (드리프트 없음)
+            deadline = subscriber.origin + number * subscriber.period
+            assert deadline <= now < deadline + 0.25
+    # 두 구독자가 하나의 클럭 스레드를 공유
+    assert fast.threads | slow.threads == {'ClockEngine'}
+    stats = clock.get_jitter_stats()
+    assert stats['ticks'] == 21 and 0 <= stats['max_ms'] < 250
+
+def test_timer_ticks_on_second_boundaries():
+    clock = ClockEngine()
+    updates = []
+    arrived = threading.Event()
+
+    def update(minutes, seconds, elapsed_ms):
+        updates.append((minutes, seconds, elapsed_ms))
+        if elapsed_ms >= 62000:
+            arrived.set()
+
+    timer = TimerManager(update, clock)
+    try:
+        timer.restore_state({'elapsed_ms': 61850, 'running': True})
+        assert arrived.wait(2.0)
+    finally:
+        timer.close()
+        clock.stop()
+    # 복원 직후 현재 값, 이후 다음 초 경계에서 정확히 62초
+    assert updates[0][:2] == (1, 1)
+    assert updates[-1][:2] == (1, 2) and 62000 <= updates[-1][2] < 62100
+    assert len(updates) == 2
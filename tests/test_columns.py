@@ -0,0 +1,32 @@
+from array import array
+from columns import HighlightColumns, iter_rows
+from models import Highlight
+
+ROWS = [(1000, 2000, '골'), (3000, 4500, ''), (5000, 6000, '골')]
+
+def test_columns_intern_memos_and_iterate_rows():
+    columns = HighlightColumns.from_highlights(Highlight(*row) for row in ROWS)
+    assert len(columns) == 3
+    assert columns.memos == ['골', '']
+    assert list(columns.memo_ids) == [0, 1, 0]
+    assert list(columns.rows()) == ROWS
+    assert columns[2] == Highlight(5000, 6000, '골')
+    assert list(columns) == [Highlight(*row) for row in ROWS]
+    assert columns.max_end() == 6000 and HighlightColumns().max_end(7) == 7
+
+def test_dicts_round_trip_including_legacy_seconds():
+    columns = HighlightColumns.from_dicts([{'start_ms': 1000, 'end_ms': 2000, 'memo': '골'},
+                                           {'raw_start': 3, 'raw_end': 4.5, 'memo': ''}])
+    assert list(columns.to_dicts()) == [{'start_ms': 1000, 'end_ms': 2000, 'memo': '골'},
+                                        {'start_ms': 3000, 'end_ms': 4500, 'memo': ''}]
+
+def test_extend_block_maps_block_local_memo_ids():
+    columns = HighlightColumns.from_highlights([Highlight(0, 10, 'b')])
+    columns.extend_block(array('q', [20, 30]), array('q', [25, 35]), [1, 0], ['a', 'b'])
+    assert list(columns.rows()) == [(0, 10, 'b'), (20, 25, 'b'), (30, 35, 'a')]
+    assert columns.memos == ['b', 'a']
+
+def test_iter_rows_accepts_every_shape():
+    highlights = [Highlight(*row) for row in ROWS]
+    for source in (highlights, HighlightColumns.from_highlights(highlights), ROWS):
+        assert list(iter_rows(source)) == ROWS
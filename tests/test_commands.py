@@ -0,0 +1,66 @@
+from commands import AddHighlightCommand, CommandManager, CompoundCommand, DeleteHighlightCommand
+from highlight import HighlightManager
+from models import Highlight
+
+def rows(manager):
+    return [(h.start_ms, h.end_ms, h.memo) for h in manager.get_highlights()]
+
+def make_manager(count=5):
+    manager = HighlightManager()
+    manager.restore_highlights([Highlight(i * 1000, i * 1000 + 500, f'm{i}') for i in range(count)])
+    return manager
+
+def test_compound_rolls_back_on_failure():
+    manager = make_manager()
+    before = rows(manager)
+    stranger = Highlight(99000, 99500, '없음')  # 목록에 없으므로 삭제 실패
+    command = CompoundCommand([AddHighlightCommand(manager, Highlight(500, 700, '새')),
+                               DeleteHighlightCommand(manager, manager.highlight_at(0)),
+                               DeleteHighlightCommand(manager, stranger)], "bulk")
+    history = CommandManager()
+    assert not history.execute(command)
+    assert rows(manager) == before
+    assert not history.undo_stack and history.history_bytes == 0
+
+def test_compound_is_one_undo_entry():
+    manager = make_manager()
+    before = rows(manager)
+    history = CommandManager()
+    command, _ = manager.delete_many([0, 2, 4])
+    assert isinstance(command, CompoundCommand)
+    assert history.execute(command)
+    assert [row[2] for row in rows(manager)] == ['m1', 'm3']
+    assert len(history.undo_stack) == 1
+    assert history.undo() and rows(manager) == before
+    assert history.redo() and [row[2] for row in rows(manager)] == ['m1', 'm3']
+
+def test_history_is_capped_by_bytes():
+    manager = make_manager(0)
+    history = CommandManager(max_bytes=20000)
+    for i in range(50):
+        assert history.execute(AddHighlightCommand(manager, Highlight(i * 1000, i * 1000 + 500, 'x' * 1000 + str(i))))
+        assert history.history_bytes <= history.max_bytes
+    assert 1 < len(history.undo_stack) < 50
+    assert history.history_bytes == sum(command.size_bytes() for command in history.undo_stack)
+    # 가장 오래된 기록부터 삭제되므로 최근 명령은 되돌릴 수 있음
+    assert history.undo_stack[-1].highlight.memo.endswith('49')
+    while history.undo():
+        pass
+    assert len(manager) == 50 - len(history.redo_stack)
+
+def test_history_keeps_latest_command_over_the_cap():
+    manager = make_manager(0)
+    history = CommandManager(max_bytes=10)
+    assert history.execute(AddHighlightCommand(manager, Highlight(0, 500, 'x' * 5000)))
+    assert len(history.undo_stack) == 1 and history.undo()
+
+def test_new_command_releases_redo_bytes():
+    manager = make_manager(0)
+    history = CommandManager(max_commands=3)
+    for i in range(5):
+        history.execute(AddHighlightCommand(manager, Highlight(i * 1000, i * 1000 + 500, str(i))))
+    assert len(history.undo_stack) == 3
+    history.undo()
+    history.execute(AddHighlightCommand(manager, Highlight(9000, 9500, '9')))
+    assert not history.redo_stack
+    assert history.history_bytes == sum(command.size_bytes() for command in history.undo_stack)
@@ -0,0 +1,67 @@
+import os
+import pytest
+from export_cli import collect_sources, main
+from session_format import write_session
+from storage_sqlite import SqliteSessionStore
+
+def session(*matches):
+    return {'timestamp': '2024-06-01T09:30:00', 'current_match': 0, 'memo': '', 'matches': [
+        {'name': name, 'timer': {}, 'highlights': [{'start_ms': s, 'end_ms': e, 'memo': m} for s, e, m in rows]}
+        for name, rows in matches]}
+
+@pytest.fixture
+def day(tmp_path):
+    sessions = tmp_path / 'sessions'
+    sessions.mkdir()
+    write_session(str(sessions / 'session_a.json'), session(('1경기', [(1000, 2000, '골')]), ('빈 매치', [])))
+    write_session(str(sessions / 'session_b.hls'), session(('결승: A/B', [(5000, 7000, ''), (9000, 9500, '세이브')])))
+    with open(sessions / 'session_b.json.tmp', 'w') as f:
+        f.write('쓰다 만 파일')
+    return tmp_path
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_exports_every_match_of_every_session(day, workers, capsys):
+    output = day / 'out'
+    code = main([str(day / 'sessions'), '-o', str(output), '--formats', 'text', 'srt',
+                 '--settings', str(day / 'none.json'), '--workers', workers])
+    assert code == 0
+    assert sorted(os.listdir(output)) == ['session_a_01_1경기.srt', 'session_a_01_1경기.txt',
+                                          'session_b_01_결승_A_B.srt', 'session_b_01_결승_A_B.txt']
+    assert read(output / 'session_b_01_결승_A_B.txt') == '00:05~00:07, \n00:09~00:09, 세이브\n'
+    assert '세션 2개, 매치 2개, 하이라이트 3개, 파일 4개' in capsys.readouterr().out
+
+def test_include_empty_and_settings(day):
+    output = day / 'out'
+    with open(day / 'settings.json', 'w', encoding='utf-8') as f:
+        f.write('{"export_formats": ["csv"], "frame_rate": "25"}')
+    assert main([str(day / 'sessions' / 'session_a.json'), '-o', str(output), '--include-empty',
+                 '--settings', str(day / 'settings.json')]) == 0
+    assert sorted(os.listdir(output)) == ['session_a_01_1경기.csv', 'session_a_02_빈_매치.csv']
+    assert '00:00:01:00,00:00:02:00' in read(output / 'session_a_01_1경기.csv')
+
+def test_sqlite_sessions_and_duplicate_names(day):
+    db = str(day / 'sessions.db')
+    store = SqliteSessionStore(db)
+    first = store.save_session(session(('A', [(1000, 2000, 'x')])))
+    store.save_session(session(('B', [(3000, 4000, 'y')])))
+    store.close()
+    copy = day / 'copy'
+    copy.mkdir()
+    write_session(str(copy / 'session_a.json'), session(('C', [])))
+    sources = collect_sources([db, str(day / 'sessions'), str(copy)])
+    assert [stem for _, _, stem in sources] == [first.replace(':', '_'), sources[1][2], 'session_a', 'session_b',
+                                                'session_a-2']
+    assert sources[0][:2] == (db, first)
+
+def test_failures_are_reported(day, capsys):
+    with open(day / 'sessions' / 'session_c.json', 'w') as f:
+        f.write('{깨진')
+    assert main([str(day / 'sessions'), '-o', str(day / 'out'), '--formats', 'text',
+                 '--settings', str(day / 'none.json')]) == 1
+    assert 'session_c:' in capsys.readouterr().out
+    assert main([str(day / 'missing'), '--settings', str(day / 'none.json')]) == 1
+    assert main([str(day / 'sessions'), '--frame-rate', '25df', '--settings', str(day / 'none.json')]) == 1
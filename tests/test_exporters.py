@@ -0,0 +1,96 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+import pytest
+from exporters import (EXPORTERS, ExportSnapshot, Exporter, export_all, register, resolve_formats, safe_name,
+                       summarize)
+from highlight_saver import HighlightSaver
+from models import Highlight
+
+SNAPSHOT = ExportSnapshot.capture('경기 1', [(1000, 2500, '골\n장면'), (61000, 62000, ''), (3599999, 3600500, 'a --> b')],
+                                  '29.97df')
+
+def written(tmp_path, key, snapshot=SNAPSHOT):
+    path = str(tmp_path / f'out.{key}')
+    EXPORTERS[key].write(snapshot, path)
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+def test_csv(tmp_path):
+    assert written(tmp_path, 'csv') == (
+        '\ufeffstart,end,start_ms,end_ms,start_tc,end_tc,memo\r\n'
+        '00:01,00:02.500,1000,2500,00:00:00;29,00:00:02;14,"골\n장면"\r\n'
+        '01:01,01:02,61000,62000,00:01:01;00,00:01:02;00,\r\n'
+        '59:59.999,60:00.500,3599999,3600500,01:00:00;00,01:00:00;15,a --> b\r\n')
+
+def test_edl(tmp_path):
+    assert written(tmp_path, 'edl') == (
+        'TITLE: 경기 1\r\nFCM: DROP FRAME\r\n\r\n'
+        '001  AX       V     C        00:00:00;29 00:00:02;14 00:00:00;29 00:00:02;14\r\n* COMMENT: 골 장면\r\n\r\n'
+        '002  AX       V     C        00:01:01;00 00:01:02;00 00:01:01;00 00:01:02;00\r\n\r\n'
+        '003  AX       V     C        01:00:00;00 01:00:00;15 01:00:00;00 01:00:00;15\r\n* COMMENT: a --> b\r\n\r\n')
+
+def test_srt_and_vtt(tmp_path):
+    assert written(tmp_path, 'srt') == (
+        '1\n00:00:01,000 --> 00:00:02,500\n골 장면\n\n'
+        '2\n00:01:01,000 --> 00:01:02,000\n-\n\n'
+        '3\n00:59:59,999 --> 01:00:00,500\na --> b\n\n')
+    assert written(tmp_path, 'vtt') == (
+        'WEBVTT\n\n'
+        '1\n00:00:01.000 --> 00:00:02.500\n골 장면\n\n'
+        '2\n00:01:01.000 --> 00:01:02.000\n-\n\n'
+        '3\n00:59:59.999 --> 01:00:00.500\na -> b\n\n')
+
+def test_text_and_json(tmp_path):
+    assert written(tmp_path, 'text') == '00:01~00:02, 골\n장면\n01:01~01:02, \n59:59~60:00, a --> b\n'
+    data = json.loads(written(tmp_path, 'json'))
+    assert (data['name'], data['frame_rate'], data['timebase'], data['ntsc']) == ('경기 1', '29.97DF', 30, True)
+    assert [tuple(h.values()) for h in data['highlights']] == list(SNAPSHOT.rows)
+
+def test_fcpxml_uses_frame_exact_rationals(tmp_path):
+    root = ET.fromstring(written(tmp_path, 'fcpxml').split('\n', 2)[2])
+    assert root.find('resources/format').attrib['frameDuration'] == '1001/30000s'
+    sequence = root.find('library/event/project/sequence')
+    assert sequence.attrib['tcFormat'] == 'DF'
+    assert [m.attrib for m in sequence.iter('marker')] == [
+        {'start': '29029/30000s', 'duration': '45045/30000s', 'value': '골 장면'},
+        {'start': '1829828/30000s', 'duration': '30030/30000s', 'value': ''},
+        {'start': '107999892/30000s', 'duration': '15015/30000s', 'value': 'a --> b'}]
+
+def test_xmeml_uses_snapshot_frame_rate(tmp_path):
+    root = ET.fromstring(written(tmp_path, 'xmeml').encode('utf-8'))
+    assert root.findtext('sequence/rate/timebase') == '30' and root.findtext('sequence/rate/ntsc') == 'TRUE'
+    assert [m.findtext('in') for m in root.findall('sequence/marker')] == ['29', '1828', '107892']
+
+class Failing(Exporter):
+    key, label, suffix = 'failing', '실패', '.fail'
+
+    def write(self, snapshot, path):
+        raise OSError("디스크 가득 참")
+
+def test_export_all_keeps_order_and_isolates_failures(tmp_path, monkeypatch):
+    monkeypatch.setitem(EXPORTERS, 'failing', Failing())
+    base = str(tmp_path / 'nested' / '경기1')
+    results = export_all(SNAPSHOT, base, ['srt', 'failing', 'unknown', 'text'])
+    assert [(r.key, r.ok) for r in results] == [('srt', True), ('failing', False), ('text', True)]
+    assert results[1].error == "디스크 가득 참"
+    assert sorted(os.listdir(tmp_path / 'nested')) == ['경기1.srt', '경기1.txt']
+    assert 'failing' in summarize(results)
+
+def test_saver_reports_failed_formats(tmp_path, monkeypatch):
+    monkeypatch.setitem(EXPORTERS, 'failing', Failing())
+    saver = HighlightSaver()
+    path = str(tmp_path / '경기1.txt')
+    assert saver.save_highlights([Highlight(1000, 2000, 'a')], path)
+    assert sorted(os.listdir(tmp_path)) == ['경기1.txt', '경기1_markers.xml']
+    assert not saver.save_highlights([Highlight(1000, 2000, 'a')], path, formats=['text', 'failing'])
+    assert [r.ok for r in saver.last_results] == [True, False]
+
+def test_registry_helpers(monkeypatch):
+    assert resolve_formats(None) == ['text', 'xmeml']
+    assert resolve_formats(['nope']) == ['text', 'xmeml']
+    assert resolve_formats(['edl', 'nope', 'csv']) == ['edl', 'csv']
+    monkeypatch.setitem(EXPORTERS, 'failing', Failing())
+    register(Failing())
+    assert resolve_formats(['failing']) == ['failing']
+    assert safe_name(' 결승: A/B? ') == '결승_A_B' and safe_name('...') == 'match'
@@ -0,0 +1,24 @@
+import time
+from timer import TimerManager
+from gameclock import GameClockReceiver
+
+def test_correction_emits_tick_and_samples_display_latency():
+    receiver = None
+    ticks = []
+
+    def displayed(minutes, seconds, elapsed_ms):
+        ticks.append(elapsed_ms)
+        receiver.note_displayed(timer)
+
+    timer = TimerManager(displayed)
+    receiver = GameClockReceiver(lambda key: timer)
+    try:
+        assert receiver.handle_packet(b'5.0', time.time(), time.monotonic()) is None  # 멈춘 타이머는 보정하지 않음
+        timer.start()
+        count = len(ticks)
+        # 점진 보정(slew)도 다음 초 경계를 기다리지 않고 바로 틱을 알림
+        assert receiver.handle_packet(b'0.5', time.time(), time.monotonic()) is not None
+        assert len(ticks) == count + 1
+        assert receiver.get_stats()['display']['max_ms'] > 0
+    finally:
+        timer.close()
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from highlight import HighlightManager
+from models import Highlight
+from prompts import Prompter
+from save import SaveManager
+
+CORE_MODULES = ['highlight', 'timer', 'commands', 'match', 'save', 'highlight_saver', 'exporters', 'export_cli',
+                'journal', 'autosave', 'live_export', 'gameclock', 'prompts']
+
+def test_core_imports_without_qt(tmp_path):
+    # PyQt5를 import하면 ImportError가 나도록 막은 새 인터프리터에서 모든 코어 모듈을 불러옴
+    script = ("import sys; sys.modules['PyQt5'] = None\n"
+              f"import {', '.join(CORE_MODULES)}\n"
+              "print(sorted(name for name in sys.modules if name.startswith('PyQt5')))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=root))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "['PyQt5']"
+
+class Answers(Prompter):
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.warnings = []
+
+    def ask_text(self, title, label, text=''):
+        return self.answers.pop(0)
+
+    def show_warning(self, title, message):
+        self.warnings.append(message)
+
+def test_managers_ask_through_prompter():
+    manager = HighlightManager()
+    manager.restore_highlights([Highlight(1000, 2000, 'a')])
+    command, message = manager.edit(0, Answers('b', '00:01.250', '00:03'))
+    assert message == "하이라이트 수정됨" and command.new_highlight == Highlight(1250, 3000, 'b')
+
+    prompter = Answers('b', '00:05', '00:03')
+    assert manager.edit(0, prompter) == (None, "")
+    assert prompter.warnings and '잘못된 시간 형식' in prompter.warnings[0]
+    assert manager.edit(0, Answers(None)) == (None, "하이라이트 수정 취소")
+
+def test_default_prompter_cancels(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = HighlightManager()
+    manager.restore_highlights([Highlight(1000, 2000, 'a')])
+    assert manager.edit(0, Prompter()) == (None, "하이라이트 수정 취소")
+    assert SaveManager().save(manager.get_highlights()) == "파일 저장 취소"
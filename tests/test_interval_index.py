@@ -0,0 +1,95 @@
+import random
+import pytest
+from models import Highlight
+from interval_index import IntervalIndex
+from highlight import HighlightManager
+from commands import CommandManager
+from normalize import NormalizeOptions
+
+def rows(index):
+    return [(h.start_ms, h.end_ms, h.memo) for h in index]
+
+def build(spans):
+    return IntervalIndex([Highlight(start, end, str(i)) for i, (start, end) in enumerate(spans)])
+
+def brute_stabbing(index, time_ms):
+    return sorted((h.start_ms, h.end_ms, h.memo) for h in index if h.start_ms <= time_ms <= h.end_ms)
+
+def test_shift_keeping_order_is_a_rank_range():
+    index = build([(0, 500), (1000, 1500), (2000, 2500), (5000, 5500)])
+    before = rows(index)
+    token = index.shift_range(1000, 2000, 300)
+    assert token[0] == 'ranks'
+    assert rows(index) == [(0, 500, '0'), (1300, 1800, '1'), (2300, 2800, '2'), (5000, 5500, '3')]
+    assert [h.memo for h in index.shifted(token)] == ['1', '2']
+    assert brute_stabbing(index, 1400) == [(1300, 1800, '1')]
+    index.undo_shift(token)
+    assert rows(index) == before
+
+def test_shift_past_neighbours_reorders_and_undoes():
+    index = build([(0, 500), (1000, 1500), (2000, 9000), (3000, 3500)])
+    before = rows(index)
+    token = index.shift_range(0, 1000, 2500)
+    assert token[0] == 'items'
+    assert rows(index) == [(2000, 9000, '2'), (2500, 3000, '0'), (3000, 3500, '3'), (3500, 4000, '1')]
+    # 최대 종료 시각 보강 정보도 갱신되어야 함
+    assert [h.memo for h in index.stabbing(3700)] == ['2', '1']
+    index.undo_shift(token)
+    assert rows(index) == before
+    assert [h.memo for h in index.stabbing(1200)] == ['1']
+
+def test_shift_below_zero_is_rejected_without_change():
+    index = build([(100, 200), (1000, 1500)])
+    before = rows(index)
+    with pytest.raises(ValueError):
+        index.shift_range(0, 500, -500)
+    assert rows(index) == before
+
+def test_random_shifts_match_brute_force():
+    rng = random.Random(7)
+    spans = []
+    for _ in range(300):
+        start = rng.randrange(0, 100000)
+        spans.append((start, start + rng.randrange(0, 5000)))
+    index = build(spans)
+    tokens = []
+    for _ in range(40):
+        start = rng.randrange(0, 100000)
+        end = start + rng.randrange(0, 20000)
+        delta = rng.randrange(0, 8000) - 2000
+        try:
+            tokens.append((rows(index), index.shift_range(start, end, delta)))
+        except ValueError:
+            continue
+        spans_now = [row[:2] for row in rows(index)]
+        assert spans_now == sorted(spans_now)
+        for time_ms in (rng.randrange(0, 110000) for _ in range(5)):
+            assert sorted((h.start_ms, h.end_ms, h.memo) for h in index.stabbing(time_ms)) == \
+                brute_stabbing(index, time_ms)
+    for before, token in reversed(tokens):
+        index.undo_shift(token)
+        assert rows(index) == before
+
+def test_replaced_highlights_keep_settled_times():
+    # 지연 이동이 남은 채 인덱스를 교체해도 실행 취소 기록의 하이라이트는 최신 시각이어야 함
+    manager = HighlightManager()
+    manager.restore_highlights([Highlight(i * 1000, i * 1000 + 500, f'm{i}') for i in range(200)])
+    commands = CommandManager()
+    command, _ = manager.normalize(NormalizeOptions(pre_roll_ms=100))
+    commands.execute(command)
+    normalized = rows(manager.get_highlights())
+    command, _ = manager.shift_between(50000, 150000, 7)
+    commands.execute(command)
+    commands.undo()
+    commands.undo()
+    commands.redo()
+    assert rows(manager.get_highlights()) == normalized
+
+def test_shifted_items_report_current_times():
+    # 이후 이동이 조상 노드에만 남긴 지연 이동량도 반영된 시각이어야 함 (실행 취소 저널 레코드에 사용)
+    index = build([(i * 1000, i * 1000 + 500) for i in range(500)])
+    token = index.shift_range(100000, 200000, 150500)
+    assert token[0] == 'items'
+    index.shift_range(0, 1000000, 7)
+    moved = [(h.start_ms, h.end_ms, h.memo) for h in index.shifted(token)]
+    assert moved == [(i * 1000 + 150507, i * 1000 + 151007, str(i)) for i in range(100, 201)]
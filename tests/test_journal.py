@@ -0,0 +1,154 @@
+import pytest
+from models import Highlight
+from commands import AddHighlightCommand, EditHighlightCommand, EditTimeCommand, ShiftHighlightsCommand
+from journal import Journal, command_from_record, replay
+from match import MatchManager
+from session_format import read_session, write_session
+
+def rows(match):
+    return [(h.start_ms, h.end_ms, h.memo) for h in match.highlight_manager.get_highlights()]
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / 'journal.jsonl'), flush_interval=0)
+    yield journal
+    journal.close()
+
+def checkpoint(manager: MatchManager, journal: Journal, path: str):
+    """main.HighlightRecorder.checkpoint와 같은 순서: 세션 저장 → 저널 초기화"""
+    write_session(path, {'matches': manager.get_state(), 'current_match': manager.current_index})
+    journal.reset(path)
+
+def recover(journal: Journal) -> MatchManager:
+    """main.HighlightRecorder.recover_from_journal과 같은 순서: 기준 세션 복원 → 재생"""
+    journal.flush()
+    base, records = journal.read()
+    manager = MatchManager(lambda *args: None)
+    data = read_session(base)
+    manager.restore(data['matches'], data.get('current_match', 0))
+    replay(manager, records)
+    return manager
+
+def add(match, start_ms, end_ms, memo):
+    highlight = Highlight(start_ms, end_ms, memo)
+    assert match.command_manager.execute(AddHighlightCommand(match.highlight_manager, highlight))
+    return highlight
+
+def test_recover_after_closing_match(tmp_path, journal):
+    manager = MatchManager(lambda *args: None)
+    manager.attach_journal(journal)
+    journal.open(None)
+    manager.add_match('A')
+    manager.add_match('B')
+    add(manager.matches[1], 1000, 2000, 'b1')
+    manager.remove_match(0)
+    checkpoint(manager, journal, str(tmp_path / 'session.hls'))
+
+    # 닫힌 매치 때문에 B의 id(2)와 복원 후 id(1)가 다름
+    match = manager.matches[0]
+    old = match.highlight_manager.get_highlights()[0]
+    assert match.command_manager.execute(
+        EditHighlightCommand(match.highlight_manager, old, Highlight(1000, 2500, 'b1 수정')))
+    add(match, 3000, 4000, 'b2')
+
+    recovered = recover(journal)
+    assert [m.name for m in recovered.matches] == ['B']
+    assert rows(recovered.matches[0]) == [(1000, 2500, 'b1 수정'), (3000, 4000, 'b2')]
+
+def test_records_after_match_removed_follow_new_index(tmp_path, journal):
+    manager = MatchManager(lambda *args: None)
+    manager.attach_journal(journal)
+    journal.open(None)
+    manager.add_match('A')
+    manager.add_match('B')
+    checkpoint(manager, journal, str(tmp_path / 'session.hls'))
+    manager.remove_match(0)
+    add(manager.matches[0], 500, 900, 'b')
+
+    recovered = recover(journal)
+    assert [m.name for m in recovered.matches] == ['B']
+    assert rows(recovered.matches[0]) == [(500, 900, 'b')]
+
+def journaled_manager(journal):
+    manager = MatchManager(lambda *args: None)
+    manager.attach_journal(journal)
+    journal.open(None)
+    manager.add_match('A')
+    return manager, manager.matches[0]
+
+def test_undo_of_command_before_checkpoint(tmp_path, journal):
+    manager, match = journaled_manager(journal)
+    add(match, 1000, 2000, 'a')
+    highlight = add(match, 3000, 4000, 'b')
+    assert match.command_manager.execute(
+        EditHighlightCommand(match.highlight_manager, highlight, Highlight(3000, 4500, 'b 수정')))
+    checkpoint(manager, journal, str(tmp_path / 'session.hls'))
+
+    # 체크포인트 이전 명령을 되돌리고 다시 실행
+    assert match.command_manager.undo()
+    assert match.command_manager.undo()
+    assert match.command_manager.redo()
+    assert rows(match) == [(1000, 2000, 'a'), (3000, 4000, 'b')]
+
+    recovered = recover(journal)
+    assert rows(recovered.matches[0]) == rows(match)
+
+def test_undo_of_shift_and_time_edit_before_checkpoint(tmp_path, journal):
+    manager, match = journaled_manager(journal)
+    timer = match.timer_manager
+    timer.set_time(10000)
+    add(match, 11000, 12000, 'a')
+    add(match, 14000, 15000, 'b')
+    assert match.command_manager.execute(ShiftHighlightsCommand(match.highlight_manager, 14000, 14000, -2000))
+    command = EditTimeCommand(timer, 20000, 21000)
+    command.shift_highlights_with(match.highlight_manager)
+    assert match.command_manager.execute(command)
+    checkpoint(manager, journal, str(tmp_path / 'session.hls'))
+
+    assert match.command_manager.undo()
+    assert match.command_manager.undo()
+    assert rows(match) == [(11000, 12000, 'a'), (14000, 15000, 'b')]
+    assert timer.last_correction_ms == 10000
+
+    recovered = recover(journal).matches[0]
+    assert rows(recovered) == rows(match)
+    assert recovered.timer_manager.elapsed_ms == 20000
+    assert recovered.timer_manager.last_correction_ms == 10000
+
+def test_inverse_record_round_trip():
+    match = MatchManager(lambda *args: None).add_match('A')
+    add(match, 1000, 2000, 'a')
+    add(match, 1500, 1800, 'b')
+    command = ShiftHighlightsCommand(match.highlight_manager, 1000, 1000, 1000)  # 'b'를 넘어가 순서가 바뀜
+    assert match.command_manager.execute(command)
+    assert match.command_manager.undo()
+    before = rows(match)
+    assert match.command_manager.redo()
+    # 실행 취소 대신 역방향 레코드를 실행해도 같은 결과
+    assert match.command_manager.execute(command_from_record(command.inverse_record(), match))
+    assert rows(match) == before
+
+def test_legacy_undo_without_history_raises():
+    manager = MatchManager(lambda *args: None)
+    manager.add_match('A')
+    with pytest.raises(ValueError):
+        replay(manager, [{'t': 'undo', 'm': 1}])
+
+def test_replay_matches_timer_and_recording_state(tmp_path, journal):
+    manager, match = journaled_manager(journal)
+    checkpoint(manager, journal, str(tmp_path / 'session.hls'))
+    second = manager.add_match()
+    manager.rename_match(1, '결승')
+    manager.set_current(1)
+    second.timer_manager.set_time(65000)
+    second.highlight_manager.start_recording(60000)
+    add(second, 61000, 64000, '골')
+    add(match, 1000, 2000, 'a')
+
+    recovered = recover(journal)
+    assert [m.name for m in recovered.matches] == ['A', '결승']
+    assert recovered.current_index == 1
+    assert recovered.matches[1].timer_manager.elapsed_ms == 65000
+    assert recovered.matches[1].highlight_manager.highlight_start_time == 60000
+    assert rows(recovered.matches[1]) == [(61000, 64000, '골')]
+    assert rows(recovered.matches[0]) == [(1000, 2000, 'a')]
@@ -0,0 +1,28 @@
+import os
+from live_export import LiveExporter
+
+def files(directory):
+    return sorted(name for name in os.listdir(directory) if not name.endswith('.tmp'))
+
+def read(directory, name):
+    with open(os.path.join(directory, name), encoding='utf-8') as f:
+        return f.read()
+
+def test_files_follow_match_ids(tmp_path):
+    directory = str(tmp_path)
+    exporter = LiveExporter(directory)
+    a, b = ((1000, 2000, 'a'),), ((3000, 4000, 'b'),)
+    exporter.write([(1, 'A', a), (2, 'B', b), (3, 'C', ())])
+    assert files(directory) == ['01_A.txt', '01_A_markers.xml', '02_B.txt', '02_B_markers.xml']
+
+    # 첫 매치를 닫으면 뒤 매치 번호가 당겨지고 닫힌 매치의 파일은 지워짐
+    exporter.write([(2, 'B', b), (3, 'C', ())])
+    assert files(directory) == ['01_B.txt', '01_B_markers.xml']
+    assert read(directory, '01_B.txt') == '00:03~00:04, b\n'
+    assert '<name>01_B</name>' in read(directory, '01_B_markers.xml')
+
+    # 이름을 바꾸면 파일 이름도 바뀌고 이후 기록은 같은 파일에 이어 씀
+    exporter.write([(2, '결승', b + ((5000, 6000, 'c'),)), (3, 'C', ())])
+    assert files(directory) == ['01_결승.txt', '01_결승_markers.xml']
+    assert read(directory, '01_결승.txt') == '00:03~00:04, b\n00:05~00:06, c\n'
+    assert exporter.bytes_written == len('00:05~00:06, c\n'.encode('utf-8'))
@@ -0,0 +1,52 @@
+import pytest
+from clock import ClockEngine
+from match import MatchManager
+from models import Highlight
+
+@pytest.fixture
+def clock():
+    engine = ClockEngine()
+    yield engine
+    engine.stop()
+
+def test_matches_share_one_clock(clock):
+    ticks = []
+    manager = MatchManager(lambda *tick: ticks.append(tick), clock)
+    first, second = manager.add_match(), manager.add_match('결승')
+    assert [m.name for m in manager.matches] == ['매치 1', '결승']
+    assert clock._subscribers == [first.timer_manager, second.timer_manager]
+
+    # 각 매치의 틱은 자기 매치 id로 전달
+    second.timer_manager.set_time(5000)
+    assert ticks[-1] == (second.match_id, 0, 5, 5000)
+
+    manager.remove_match(0)
+    assert clock._subscribers == [second.timer_manager]
+    with pytest.raises(ValueError):
+        manager.remove_match(0)  # 마지막 매치는 닫을 수 없음
+
+def test_current_index_follows_removal(clock):
+    manager = MatchManager(lambda *tick: None, clock)
+    for _ in range(3):
+        manager.add_match()
+    manager.set_current(2)
+    manager.remove_match(0)
+    assert manager.current_index == 1 and manager.current.name == '매치 3'
+    manager.rename_match(1, '  3경기 ')
+    assert manager.current.name == '3경기'
+
+def test_state_round_trip(clock):
+    manager = MatchManager(lambda *tick: None, clock)
+    manager.add_match('A').highlight_manager.restore_highlights([Highlight(1000, 2000, 'a')])
+    manager.add_match('B').timer_manager.set_time(61500)
+    manager.matches[1].saved = True
+    state = manager.get_state()
+
+    restored = MatchManager(lambda *tick: None, clock)
+    restored.restore(state, current_index=1)
+    assert [m.name for m in restored.matches] == ['A', 'B']
+    assert [(h.start_ms, h.end_ms, h.memo) for h in restored.matches[0].highlight_manager.get_highlights()] == \
+        [(1000, 2000, 'a')]
+    assert restored.matches[1].timer_manager.elapsed_ms == 61500
+    assert [m.saved for m in restored.matches] == [False, True]
+    assert restored.current_index == 1
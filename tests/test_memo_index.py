@@ -0,0 +1,48 @@
+import os
+from memo_index import MemoIndex
+from session_format import write_session
+
+def save(session_dir, name, memos):
+    data = {'timestamp': name, 'matches': [
+        {'name': '1경기', 'highlights': [{'start_ms': i * 1000, 'end_ms': i * 1000 + 500, 'memo': memo}
+                                       for i, memo in enumerate(memos)]}]}
+    path = os.path.join(session_dir, name)
+    write_session(path, data)
+    return path, data
+
+def memos(index, query):
+    return sorted(result['memo'] for result in index.search(query))
+
+def test_add_session_appends_to_log_and_reloads(tmp_path):
+    session_dir = str(tmp_path / 'sessions')
+    os.makedirs(session_dir)
+    index_file = str(tmp_path / 'memo_index.json')
+    save(session_dir, 'session_base.hls', [f'메모 {i}' for i in range(200)])
+    index = MemoIndex(index_file, session_dir, compact_every=100)
+    index.load()
+    written = os.stat(index_file).st_mtime_ns
+    for number in range(3):
+        index.add_session(*save(session_dir, f'session_{number}.hls', [f'클러치 {number}', '골']))
+    # 색인 파일은 그대로이고 변경분은 로그에만 쌓임
+    assert os.stat(index_file).st_mtime_ns == written
+    with open(index.log_file, encoding='utf-8') as f:
+        assert len(f.readlines()) == 3
+    assert memos(index, 'ㅋㄹㅊ') == ['클러치 0', '클러치 1', '클러치 2']
+
+    index.remove_sessions([os.path.join(session_dir, 'session_1.hls')])
+    os.remove(os.path.join(session_dir, 'session_1.hls'))
+    reloaded = MemoIndex(index_file, session_dir)
+    assert memos(reloaded, '클러') == ['클러치 0', '클러치 2']
+    assert not os.path.exists(reloaded.log_file)  # 로드할 때 합침
+
+def test_log_is_compacted(tmp_path):
+    session_dir = str(tmp_path / 'sessions')
+    os.makedirs(session_dir)
+    save(session_dir, 'session_base.hls', [f'메모 {i}' for i in range(200)])
+    index = MemoIndex(str(tmp_path / 'memo_index.json'), session_dir, compact_every=2)
+    index.add_session(*save(session_dir, 'session_a.hls', ['a']))
+    assert os.path.exists(index.log_file)
+    index.add_session(*save(session_dir, 'session_b.hls', ['b']))
+    assert not os.path.exists(index.log_file)
+    index.add_session(*save(session_dir, 'session_b.hls', ['bb']))  # 같은 세션을 다시 저장(체크포인트)
+    assert memos(MemoIndex(index.index_file, session_dir), 'b') == ['bb']
@@ -0,0 +1,36 @@
+import pytest
+from models import Highlight, format_time, ms_to_frames, parse_offset, parse_time
+
+def test_parse_time_keeps_milliseconds():
+    assert parse_time('01:02') == 62000
+    assert parse_time(' 01:02.5 ') == 62500
+    assert parse_time('00:00.0125') == 12
+    assert parse_time('90:00.999') == 5400999
+    with pytest.raises(ValueError):
+        parse_time('-1:00')
+
+def test_format_time_round_trip():
+    assert format_time(62500) == '01:02'
+    assert format_time(62500, precise=True) == '01:02.500'
+    assert format_time(62000, precise=True) == '01:02'
+    for ms in (0, 999, 61001, 5400999):
+        assert parse_time(format_time(ms, precise=True)) == ms
+
+def test_parse_offset():
+    assert parse_offset('+5') == 5000
+    assert parse_offset('-1.5') == -1500
+    assert parse_offset('-01:02.250') == -62250
+    with pytest.raises(ValueError):
+        parse_offset('-')
+
+def test_frames_land_inside_the_millisecond():
+    # 1초 안의 시각도 해당 프레임으로 (초 단위로 잘리지 않음)
+    assert ms_to_frames(1500, 60) == 90
+    assert ms_to_frames(1999, 30) == 59
+    assert ms_to_frames(16, 60) == 0 and ms_to_frames(17, 60) == 1
+
+def test_legacy_second_rows_load_as_milliseconds():
+    assert Highlight.from_dict({'raw_start': 12, 'raw_end': 15, 'memo': 'a'}) == Highlight(12000, 15000, 'a')
+    highlight = Highlight.from_dict({'start_ms': 12345, 'end_ms': 15000, 'memo': 'b'})
+    assert highlight.raw_start == 12.345
+    assert highlight.to_dict() == {'start_ms': 12345, 'end_ms': 15000, 'memo': 'b'}
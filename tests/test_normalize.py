@@ -0,0 +1,17 @@
+from normalize import NormalizeOptions, normalize_highlights
+
+def test_dedupe_without_merge_removes_non_adjacent_duplicates():
+    rows = [(1000, 2000, 'a'), (1000, 2000, 'b'), (1000, 2000, 'a'), (3000, 4000, 'a')]
+    result = list(normalize_highlights(rows, NormalizeOptions(dedupe=True)).rows())
+    assert result == [(1000, 2000, 'a'), (1000, 2000, 'b'), (3000, 4000, 'a')]
+
+def test_dedupe_after_pre_roll_clamps_to_same_row():
+    # 여유 시간 적용 후 같은 구간이 되는 하이라이트도 중복으로 취급
+    rows = [(0, 2000, 'a'), (500, 2000, 'b'), (500, 2000, 'a')]
+    result = list(normalize_highlights(rows, NormalizeOptions(pre_roll_ms=1000, dedupe=True)).rows())
+    assert result == [(0, 2000, 'a'), (0, 2000, 'b')]
+
+def test_merge_joins_memos_once():
+    rows = [(1000, 2000, 'a'), (1500, 2500, 'b'), (1800, 3000, 'a')]
+    result = list(normalize_highlights(rows, NormalizeOptions(merge_gap_ms=0, dedupe=True)).rows())
+    assert result == [(1000, 3000, 'a / b')]
@@ -0,0 +1,73 @@
+import os
+import pytest
+from highlight import HighlightManager
+from models import Highlight
+from prompts import Prompter
+from save import SaveManager
+
+class FakeMatch:
+    def __init__(self, name, rows):
+        self.name = name
+        self.saved = False
+        self.highlight_manager = HighlightManager()
+        self.highlight_manager.restore_highlights([Highlight(*row) for row in rows])
+
+class ScriptedPrompter(Prompter):
+    def __init__(self, reply, directory):
+        self.reply = reply
+        self.directory = directory
+        self.asked, self.titles = 0, []
+
+    def ask_save_before_exit(self):
+        self.asked += 1
+        return self.reply
+
+    def ask_save_path(self, title, file_filter):
+        self.titles.append(title)
+        return os.path.join(self.directory, f'{len(self.titles)}.txt')
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path)
+
+def test_every_match_is_checked_before_exit(workdir):
+    prompter = ScriptedPrompter(True, workdir)
+    manager = SaveManager(prompter)
+    a, b = FakeMatch('A', [(1000, 2000, 'a')]), FakeMatch('B', [(3000, 4000, 'b')])
+    manager.save(b.highlight_manager.get_highlights(), os.path.join(workdir, 'b.txt'),
+                 on_saved=lambda: setattr(b, 'saved', True))
+    assert b.saved and not a.saved
+
+    # B만 내보냈어도 A가 남아 있으면 물어보고, 저장을 고르면 A만 저장
+    assert manager.check_unsaved([a, b]) is True
+    assert prompter.asked == 1
+    assert prompter.titles == ['하이라이트 저장 - A']
+    assert a.saved
+    assert manager.check_unsaved([a, b]) is True
+    assert prompter.asked == 1
+
+def test_cancel_keeps_matches_unsaved(workdir):
+    prompter = ScriptedPrompter(None, workdir)
+    match = FakeMatch('A', [(1000, 2000, 'a')])
+    assert SaveManager(prompter).check_unsaved([match, FakeMatch('B', [])]) is None
+    assert not match.saved and prompter.titles == []
+
+def test_saved_state_round_trips_per_match(workdir):
+    manager = SaveManager()
+    rows = [Highlight(1000, 2000, 'a')]
+    matches = [{'name': 'A', 'timer': {}, 'highlights': rows, 'saved': True},
+               {'name': 'B', 'timer': {}, 'highlights': rows, 'saved': False}]
+    path = manager.save_session(matches, '')
+    assert [m['saved'] for m in manager.load_session(path)['matches']] == [True, False]
+
+def test_failed_save_cancels_exit(workdir, monkeypatch):
+    errors = []
+    prompter = ScriptedPrompter(True, workdir)
+    prompter.show_error = errors.append
+    manager = SaveManager(prompter)
+    monkeypatch.setattr(manager.saver, 'save_highlights', lambda *args: False)
+    match = FakeMatch('A', [(1000, 2000, 'a')])
+    assert manager.check_unsaved([match]) is None
+    assert errors == ['하이라이트 저장 실패']
+    assert not match.saved
@@ -0,0 +1,24 @@
+import pytest
+from session_format import highlight_rows, read_session, write_session
+
+def session(*matches):
+    return {'timestamp': '2024-06-01T09:30:00', 'current_match': 0, 'memo': '입력 중', 'matches': [
+        {'name': name, 'timer': {'elapsed_ms': 1234}, 'recording_start_ms': None,
+         'highlights': [{'start_ms': s, 'end_ms': e, 'memo': m} for s, e, m in rows]}
+        for name, rows in matches]}
+
+def match_rows(data):
+    return [(m['name'], sorted(highlight_rows(m['highlights']))) for m in data['matches']]
+
+MATCHES = [('1경기', [(1000, 2000, '클러치'), (1000, 2000, '클러치'), (5000, 7000, '')]),
+           ('2경기', [(i * 100, i * 100 + 50, f'메모 {i % 7}') for i in range(20000)])]
+
+@pytest.mark.parametrize('extension', ['.json', '.hls'])
+def test_session_file_round_trip(tmp_path, extension):
+    path = str(tmp_path / f'session_1{extension}')
+    data = session(*MATCHES)
+    write_session(path, data)
+    loaded = read_session(path)
+    assert match_rows(loaded) == match_rows(data)
+    assert loaded['memo'] == '입력 중'
+    assert loaded['matches'][0]['timer'] == {'elapsed_ms': 1234}
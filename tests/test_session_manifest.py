@@ -0,0 +1,48 @@
+import os
+import session_manifest
+from session_format import write_session
+from session_manifest import SessionManifest
+
+def write(directory, name, timestamp, count):
+    path = os.path.join(directory, name)
+    write_session(path, {'timestamp': timestamp, 'highlight_count': count, 'total_time': count * 10,
+                         'matches': [{'name': 'A', 'timer': {}, 'highlights': [
+                             {'start_ms': i, 'end_ms': i + 1, 'memo': ''} for i in range(count)]}]})
+    return path
+
+def listing(manifest):
+    return [(os.path.basename(s['file']), s['highlight_count']) for s in manifest.sessions()]
+
+def test_manifest_follows_folder_changes(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    a = write(directory, 'session_a.json', '2024-06-01T09:00:00', 1)
+    write(directory, 'session_b.hls', '2024-06-01T10:00:00', 2)
+    assert listing(SessionManifest(directory)) == [('session_b.hls', 2), ('session_a.json', 1)]
+
+    # 바뀌지 않은 세션 파일은 다시 읽지 않음
+    reads = []
+    original = session_manifest.read_header
+    monkeypatch.setattr(session_manifest, 'read_header', lambda path: reads.append(path) or original(path))
+    assert listing(SessionManifest(directory)) == [('session_b.hls', 2), ('session_a.json', 1)]
+    assert reads == []
+
+    # 밖에서 바뀐 파일, 지워진 파일, 새 파일을 반영
+    write(directory, 'session_a.json', '2024-06-01T09:00:00', 5)
+    os.utime(a, (1, 1))
+    os.remove(os.path.join(directory, 'session_b.hls'))
+    write(directory, 'session_c.hld.tmp', '2024-06-01T11:00:00', 9)  # 세션 파일이 아님
+    write(directory, 'session_d.json', '2024-06-01T12:00:00', 3)
+    manifest = SessionManifest(directory)
+    assert listing(manifest) == [('session_d.json', 3), ('session_a.json', 5)]
+    assert sorted(os.path.basename(path) for path in reads) == ['session_a.json', 'session_d.json']
+    assert manifest.oldest_first()[0] == a
+
+def test_update_and_remove_are_persisted(tmp_path):
+    directory = str(tmp_path)
+    manifest = SessionManifest(directory)
+    path = write(directory, 'session_a.json', '2024-06-01T09:00:00', 1)
+    manifest.update(path, {'timestamp': '2024-06-01T09:00:00', 'highlight_count': 1, 'total_time': 10})
+    assert listing(SessionManifest(directory)) == [('session_a.json', 1)]
+    manifest.remove([path])
+    os.remove(path)
+    assert listing(SessionManifest(directory)) == []
@@ -0,0 +1,35 @@
+from session_format import highlight_rows
+from snapshot_store import DeltaSnapshotStore, read_snapshot
+
+def session(*matches):
+    return {'timestamp': '2024-06-01T09:30:00', 'current_match': 0, 'memo': '', 'matches': [
+        {'name': name, 'timer': {'elapsed_ms': 1234}, 'recording_start_ms': None,
+         'highlights': [{'start_ms': s, 'end_ms': e, 'memo': m} for s, e, m in rows]}
+        for name, rows in matches]}
+
+def match_rows(data):
+    return [(m['name'], sorted(highlight_rows(m['highlights']))) for m in data['matches']]
+
+MATCHES = [('1경기', [(1000, 2000, '클러치'), (5000, 7000, '')]),
+           ('2경기', [(i * 100, i * 100 + 50, f'메모 {i % 7}') for i in range(20000)])]
+
+def test_delta_snapshot_chain_round_trip(tmp_path):
+    store = DeltaSnapshotStore(str(tmp_path), rebase_every=3)
+    path = str(tmp_path / 'session_1.hld')
+    rows = list(MATCHES[1][1])
+    for step in range(5):
+        rows.append((3000000 + step, 3000100 + step, f'추가 {step}'))
+        del rows[step]
+        data = session(MATCHES[0], ('2경기', rows))
+        store.write(path, data)
+        # 새 저장소(재시작)에서 읽어도 같은 내용
+        assert match_rows(read_snapshot(path)) == match_rows(data)
+
+    # 매치가 줄어든 스냅샷과 이어서 저장
+    resumed = DeltaSnapshotStore(str(tmp_path))
+    resumed.read(path, remember=True)
+    data = session(('2경기', rows[:10]))
+    resumed.write(path, data)
+    assert match_rows(read_snapshot(path)) == match_rows(data)
+    resumed.collect_garbage()  # 방금 쓴 chain의 객체는 지우지 않아야 함
+    assert match_rows(read_snapshot(path)) == match_rows(data)
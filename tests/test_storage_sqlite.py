@@ -0,0 +1,40 @@
+from storage_sqlite import SqliteSessionStore
+
+def session(*memos):
+    return {'timestamp': '2024-06-01T09:30:00', 'matches': [
+        {'name': '1경기', 'timer': {}, 'highlights': [
+            {'start_ms': i * 1000, 'end_ms': i * 1000 + 500, 'memo': memo} for i, memo in enumerate(memos)]}]}
+
+def memos(store, query):
+    return sorted(result['memo'] for result in store.search(query))
+
+def test_memo_search_uses_fts_and_follows_deletes(tmp_path):
+    store = SqliteSessionStore(str(tmp_path / 'sessions.db'))
+    try:
+        first = store.save_session(session('클러치 플레이', 'Clutch save', ''))
+        store.save_session(session('역전 클러치', '골'))
+        assert store.fts
+        assert memos(store, '클러치') == ['역전 클러치', '클러치 플레이']  # FTS (세 글자)
+        assert memos(store, 'CLUTCH sav') == ['Clutch save']
+        assert memos(store, '역전') == ['역전 클러치']  # 두 글자는 LIKE
+        assert memos(store, 'ㅋㄹㅊ') == ['역전 클러치', '클러치 플레이']  # 초성
+        store.save_session(session('수비'), first)  # 체크포인트로 교체하면 이전 메모는 색인에서 빠짐
+        assert memos(store, '클러치') == ['역전 클러치']
+    finally:
+        store.close()
+
+def test_existing_database_gets_fts_index(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    store = SqliteSessionStore(path)
+    store.save_session(session('하이라이트 메모'))
+    store.conn.executescript("DROP TABLE highlights_fts; DROP TRIGGER IF EXISTS highlights_fts_insert;"
+                             "DROP TRIGGER IF EXISTS highlights_fts_delete;"
+                             "CREATE INDEX idx_highlights_memo ON highlights(memo);")
+    store.close()
+    store = SqliteSessionStore(path)
+    try:
+        assert memos(store, '라이트') == ['하이라이트 메모']
+        names = {name for (name,) in store.conn.execute("SELECT name FROM sqlite_master")}
+        assert 'idx_highlights_memo' not in names
+    finally:
+        store.close()
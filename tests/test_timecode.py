@@ -0,0 +1,55 @@
+from fractions import Fraction
+import pytest
+from timecode import FrameRate
+
+@pytest.mark.parametrize('value, rate, drop_frame', [
+    (60, Fraction(60), False),
+    ('29.97', Fraction(30000, 1001), False),
+    ('59.94df', Fraction(60000, 1001), True),
+    ('30000/1001 DF', Fraction(30000, 1001), True),
+    ('23.976', Fraction(24000, 1001), False),
+    (None, Fraction(60), False),
+])
+def test_parse(value, rate, drop_frame):
+    frame_rate = FrameRate.parse(value)
+    assert (frame_rate.rate, frame_rate.drop_frame) == (rate, drop_frame)
+
+def test_drop_frame_needs_ntsc_multiple_of_30():
+    with pytest.raises(ValueError):
+        FrameRate.parse('25df')
+    with pytest.raises(ValueError):
+        FrameRate.parse('23.976df')
+
+@pytest.mark.parametrize('frames, expected', [
+    (0, '00:00:00;00'),
+    (1799, '00:00:59;29'),
+    (1800, '00:01:00;02'),   # 매 분 시작에서 ;00, ;01을 건너뜀
+    (3597, '00:01:59;29'),
+    (3598, '00:02:00;02'),
+    (17981, '00:09:59;29'),
+    (17982, '00:10:00;00'),  # 10분마다는 건너뛰지 않음
+    (17983, '00:10:00;01'),
+    (107892, '01:00:00;00'),
+])
+def test_drop_frame_2997_boundaries(frames, expected):
+    assert FrameRate.parse('29.97df').timecode(frames) == expected
+
+@pytest.mark.parametrize('frames, expected', [
+    (3599, '00:00:59;59'),
+    (3600, '00:01:00;04'),   # 59.94는 4개씩 건너뜀
+    (35964, '00:10:00;00'),
+    (215784, '01:00:00;00'),
+])
+def test_drop_frame_5994_boundaries(frames, expected):
+    assert FrameRate.parse('59.94df').timecode(frames) == expected
+
+def test_non_drop_frame_and_exact_ms_conversion():
+    ntsc = FrameRate.parse('29.97')
+    assert ntsc.timecode(1800) == '00:01:00:00'
+    # 1001 ms * 30000/1001 fps = 정확히 30 프레임
+    assert ntsc.ms_to_frames(1001) == 30
+    assert ntsc.ms_to_frames(1000) == 29
+    assert ntsc.frames_to_ms(30) == 1001
+    assert ntsc.ms_to_frames_many([0, 1000, 1001, 3600000]) == [0, 29, 30, 107892]
+    # 드롭 프레임 타임코드는 벽시계 시간을 따라감 (1시간 = 01:00:00;00)
+    assert FrameRate.parse('59.94df').ms_to_timecode(3600000) == '01:00:00;00'
@@ -0,0 +1,25 @@
+import threading
+
+def test_ticks_coalesce_to_latest_per_match(qapp):
+    from ui import TimerSignalBridge
+    delivered = []
+    bridge = TimerSignalBridge(lambda *tick: delivered.append((threading.current_thread(), tick)))
+
+    def burst():
+        for elapsed_ms in range(0, 50000, 1000):
+            bridge.post(1, 0, elapsed_ms // 1000, elapsed_ms)
+        bridge.post(2, 0, 3, 3000)
+
+    worker = threading.Thread(target=burst)
+    worker.start()
+    worker.join()
+    assert delivered == []  # GUI 스레드 이벤트 루프에서만 전달
+    qapp.processEvents()
+    assert [tick for _, tick in delivered] == [(1, 0, 49, 49000), (2, 0, 3, 3000)]
+    assert all(thread is threading.main_thread() for thread, _ in delivered)
+    assert bridge.coalesced_count == 49
+
+    # 전달 후에는 다음 틱이 다시 신호를 보냄
+    bridge.post(1, 0, 50, 50000)
+    qapp.processEvents()
+    assert delivered[-1][1] == (1, 0, 50, 50000)
@@ -0,0 +1,76 @@
+import io
+import os
+import xml.etree.ElementTree as ET
+import pytest
+import xmeml_template
+from timecode import FrameRate
+from xmeml_template import TEMPLATE_DIR, XmemlTemplate, default_template_text, load_template
+
+ROWS = [(1000, 2500, '골 & <어시스트>'), (60000, 61000, '')]
+
+def render(template, name='경기 1', frame_rate=FrameRate.parse(60), rows=ROWS):
+    out = io.StringIO()
+    template.render(out, name, 1234, frame_rate, rows)
+    return out.getvalue()
+
+def markers(root, path):
+    return [(m.findtext('comment') or '', int(m.findtext('in')), int(m.findtext('out'))) for m in root.findall(path)]
+
+def test_default_template_fills_every_field():
+    text = render(load_template())
+    assert '{{' not in text
+    root = ET.fromstring(text.encode('utf-8'))
+    sequence = root.find('sequence')
+    assert sequence.findtext('name') == '경기 1'
+    assert sequence.findtext('duration') == '1234'
+    assert sequence.findtext('rate/timebase') == '60' and sequence.findtext('rate/ntsc') == 'FALSE'
+    assert sequence.findtext('timecode/string') == '00:00:00:00'
+    assert sequence.findtext('timecode/displayformat') == 'NDF'
+    expected = [('골 & <어시스트>', 60, 150), ('', 3600, 3660)]
+    assert markers(sequence, 'marker') == expected
+    assert markers(sequence, 'media/video/track/generatoritem/marker') == expected
+    # 마커 줄은 자리 표시자 줄의 들여쓰기를 따름
+    assert '\n    <marker>\n      <comment>' in text and '\n            <marker>\n' in text
+
+def test_timebase_directive_overrides_frame_rate():
+    template = XmemlTemplate('<!-- timebase: 29.97df -->\n<s><t>{{timebase}} {{ntsc}} {{displayformat}} '
+                             '{{timecode}}</t>\n  {{markers}}\n</s>\n')
+    assert template.frame_rate == FrameRate.parse('29.97df')
+    text = render(template, frame_rate=template.frame_rate, rows=[(60000, 60100, 'a')])
+    assert text.startswith('<s><t>30 TRUE DF 00:00:00;00</t>\n  <marker>\n')
+    assert '<in>1798</in>' in text  # 60초 = 1798프레임 (실제 29.97 속도)
+
+@pytest.mark.parametrize('text', ['<s>{{unknown}}\n{{markers}}\n</s>', '<s>{{name}}</s>', '<s><a>{{markers}}</a></s>'])
+def test_invalid_templates_are_rejected(text):
+    with pytest.raises(ValueError):
+        XmemlTemplate(text)
+
+def test_cache_recompiles_changed_file_and_falls_back(tmp_path):
+    path = str(tmp_path / 'custom.xml')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<s>{{name}}\n{{markers}}\n</s>\n')
+    first = load_template(path)
+    assert load_template(path) is first
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<seq>{{name}}\n{{markers}}\n</seq>\n')
+    os.utime(path, (1, 1))
+    second = load_template(path)
+    assert second is not first and render(second, rows=[]).startswith('<seq>경기 1')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<s>{{name}}</s>\n')  # 마커 줄 없음
+    os.utime(path, (2, 2))
+    assert load_template(path) is load_template(None)
+    assert load_template(str(tmp_path / 'missing.xml')) is load_template(None)
+
+@pytest.mark.parametrize('name', sorted(n[len('xmeml_'):-len('.xml')] for n in os.listdir(TEMPLATE_DIR)))
+def test_shipped_presets_render_valid_xml(name):
+    template = load_template(name)
+    assert template is not xmeml_template._default and template.frame_rate is not None
+    root = ET.fromstring(render(template, frame_rate=template.frame_rate).encode('utf-8'))
+    assert len(root.findall('.//marker')) == 2 * len(ROWS)
+    drop = template.frame_rate.drop_frame
+    assert root.findtext('sequence/timecode/string') == ('00:00:00;00' if drop else '00:00:00:00')
+
+def test_default_template_matches_text():
+    assert XmemlTemplate(default_template_text()).parts == load_template().parts
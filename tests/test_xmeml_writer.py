@@ -0,0 +1,70 @@
+import io
+from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, tostring
+import pytest
+from models import ms_to_frames
+from xmeml_writer import GREEN, XmemlWriter
+
+ROWS = [(0, 1000, ''), (1500, 2999, 'a & b <c> "q" \'s\''), (60000, 61000, 'line\r\nbreak\rend'),
+        (62000, 63000, '클러치 🎯\t탭')]
+
+def minidom_document(name, rows):
+    """user-019 이전 save_xml_markers와 같은 방식 (ElementTree로 만들고 minidom으로 정리)"""
+    root = Element("xmeml")
+    root.set("version", "4")
+    sequence = SubElement(root, "sequence")
+    sequence.set("id", "sequence_1")
+    sequence.set("MZ.Sequence.PreviewRenderingPresetPath", "EncoderPresets/a&b/\"x\".epr")
+    SubElement(sequence, "duration").text = str(ms_to_frames(max(end for _, end, _ in rows), 60))
+    rate = SubElement(sequence, "rate")
+    SubElement(rate, "timebase").text = "60"
+    SubElement(rate, "ntsc").text = "FALSE"
+    SubElement(sequence, "name").text = name
+    item = SubElement(sequence, "generatoritem")
+    SubElement(item, "enabled").text = "TRUE"
+    for parent in (item, sequence):
+        for start_ms, end_ms, memo in rows:
+            marker = SubElement(parent, "marker")
+            SubElement(marker, "comment").text = memo
+            SubElement(marker, "name").text = ""
+            SubElement(marker, "in").text = str(ms_to_frames(start_ms, 60))
+            SubElement(marker, "out").text = str(ms_to_frames(end_ms, 60))
+            SubElement(marker, "pproColor").text = GREEN
+        if parent is item:
+            logginginfo = SubElement(sequence, "logginginfo")
+            SubElement(logginginfo, "description").text = ""
+    return minidom.parseString(tostring(root, 'utf-8')).toprettyxml(indent="  ", encoding="utf-8").decode("utf-8")
+
+def streamed_document(name, rows, buffer_size):
+    out = io.StringIO()
+    writer = XmemlWriter(out, buffer_size=buffer_size)
+    writer.declaration()
+    writer.start("xmeml", [("version", "4")])
+    writer.start("sequence", [("id", "sequence_1"),
+                              ("MZ.Sequence.PreviewRenderingPresetPath", "EncoderPresets/a&b/\"x\".epr")])
+    writer.element("duration", ms_to_frames(max(end for _, end, _ in rows), 60))
+    writer.rate(60)
+    writer.element("name", name)
+    writer.start("generatoritem")
+    writer.element("enabled", "TRUE")
+    writer.markers(rows, 60, chunk_size=3)
+    writer.end()
+    writer.start("logginginfo")
+    writer.element("description")
+    writer.end()
+    writer.markers(iter(rows), 60)
+    writer.end()
+    writer.end()
+    writer.close()
+    return out.getvalue()
+
+@pytest.mark.parametrize('buffer_size', [1, 4096])
+def test_stream_matches_minidom_output(buffer_size):
+    for name in ('경기 1 & <결승>', ''):
+        assert streamed_document(name, ROWS, buffer_size) == minidom_document(name, ROWS)
+
+def test_unclosed_element_is_an_error():
+    writer = XmemlWriter(io.StringIO())
+    writer.start("xmeml")
+    with pytest.raises(ValueError):
+        writer.close()
@@ -0,0 +1,109 @@
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import List, Sequence, Union
+try:
+    import numpy as np  # 있으면 대량 변환을 배열 연산 한 번으로
+except ImportError:
+    np = None
+
+# 흔히 쓰는 NTSC 표기 -> 정확한 유리수 (29.97은 실제로 30000/1001)
+_NTSC_RATES = {
+    '23.976': Fraction(24000, 1001), '23.98': Fraction(24000, 1001),
+    '29.97': Fraction(30000, 1001),
+    '47.952': Fraction(48000, 1001),
+    '59.94': Fraction(60000, 1001),
+    '119.88': Fraction(120000, 1001),
+}
+_RATE_RE = re.compile(r'^\s*([\d.]+)(?:\s*/\s*(\d+))?\s*(df|ndf)?\s*$', re.IGNORECASE)
+
+@dataclass(frozen=True)
+class FrameRate:
+    """
+    정확한 유리수 프레임 속도. 밀리초 -> 프레임은 정수 연산으로 계산해 부동소수점 오차가 없다.
+    :param rate: 초당 프레임 (예: Fraction(30000, 1001))
+    :param drop_frame: 드롭 프레임 타임코드 (29.97/59.94에서만)
+    """
+    rate: Fraction
+    drop_frame: bool = False
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError(f"프레임 속도는 0보다 커야 합니다: {self.rate}")
+        if self.drop_frame and not (self.ntsc and self.timebase % 30 == 0):
+            raise ValueError(f"드롭 프레임은 29.97/59.94 등 30의 배수 NTSC 속도에서만 쓸 수 있습니다: {self}")
+
+    @classmethod
+    def parse(cls, value: Union['FrameRate', int, float, str, None], default: int = 60) -> 'FrameRate':
+        """60, 25, '29.97', '59.94df', '30000/1001', '23.976' 등. None이면 default"""
+        if isinstance(value, FrameRate):
+            return value
+        if value is None or value == '':
+            return cls(Fraction(default))
+        if isinstance(value, int):
+            return cls(Fraction(value))
+        match = _RATE_RE.match(str(value))
+        if not match:
+            raise ValueError(f"잘못된 프레임 속도입니다: {value}")
+        number, denominator, mode = match.groups()
+        if denominator:
+            rate = Fraction(int(number), int(denominator))
+        else:
+            rate = _NTSC_RATES.get(number) or Fraction(number)
+        return cls(rate, (mode or '').lower() == 'df')
+
+    def __str__(self) -> str:
+        text = str(self.timebase) if self.rate.denominator == 1 else f"{float(self.rate):.3f}".rstrip('0')
+        return text + ('DF' if self.drop_frame else '')
+
+    @property
+    def timebase(self) -> int:
+        """xmeml <timebase> (정수 공칭 속도: 29.97 -> 30)"""
+        return round(self.rate)
+
+    @property
+    def ntsc(self) -> bool:
+        """xmeml <ntsc> (1000/1001 배 속도)"""
+        return self.rate.denominator == 1001
+
+    @property
+    def frame_duration(self) -> Fraction:
+        """프레임 하나의 길이 (초)"""
+        return 1 / self.rate
+
+    def ms_to_frames(self, ms: int) -> int:
+        """밀리초 -> 그 시각이 속한 프레임 번호"""
+        return int(ms) * self.rate.numerator // (1000 * self.rate.denominator)
+
+    def ms_to_frames_many(self, values: Sequence[int]) -> List[int]:
+        """ms_to_frames를 여러 값에 한 번에. numpy가 있으면 배열 연산 한 번, 없으면 미리 계산한 정수로 순회"""
+        numerator, denominator = self.rate.numerator, 1000 * self.rate.denominator
+        if np is not None and len(values) > 64:
+            return (np.asarray(values, dtype=np.int64) * numerator // denominator).tolist()
+        return [int(ms) * numerator // denominator for ms in values]
+
+    def frames_to_ms(self, frames: int) -> int:
+        """프레임 시작 시각 (밀리초, 내림)"""
+        return int(frames) * 1000 * self.rate.denominator // self.rate.numerator
+
+    def timecode(self, frames: int) -> str:
+        """프레임 번호 -> HH:MM:SS:FF (드롭 프레임은 HH:MM:SS;FF)"""
+        fps = self.timebase
+        frames = int(frames)
+        if self.drop_frame:
+            # 10분마다를 제외한 매 분 시작에서 프레임 번호 2개(59.94는 4개)를 건너뜀
+            dropped = fps // 15
+            per_minute = fps * 60 - dropped
+            per_ten_minutes = fps * 600 - dropped * 9
+            tens, remainder = divmod(frames, per_ten_minutes)
+            frames += dropped * 9 * tens
+            if remainder > dropped:
+                frames += dropped * ((remainder - dropped) // per_minute)
+        seconds, frame = divmod(frames, fps)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        separator = ';' if self.drop_frame else ':'
+        return f"{hour:02}:{minute:02}:{second:02}{separator}{frame:02}"
+
+    def ms_to_timecode(self, ms: int) -> str:
+        return self.timecode(self.ms_to_frames(ms))
@@ -1,26 +1,43 @@
 import time
-from typing import Callable, Dict
-from PyQt5.QtWidgets import QInputDialog, QWidget
+import threading
+from typing import Callable, Dict, Optional
+from clock import ClockEngine, get_default_clock
+from models import parse_time
+from prompts import Prompter
 import logging
 
 class TimerManager:
-    def __init__(self, update_callback: Callable[[int, int, int], None]):
+    def __init__(self, update_callback: Callable[[int, int, int], None], clock: Optional[ClockEngine] = None):
         self.logger = logging.getLogger(__name__)
-        self.elapsed_time = 0
-        self.start_time = None
+        self.elapsed_ms = 0
+        self.start_time = None  # time.monotonic() 기준 시작 시각
         self.paused = False
         self.running = False
         self.update_callback = update_callback
-        self.last_update = 0
+        self._lock = threading.RLock()
+        self._next_second = 0  # 다음 틱이 표시할 경과 초
+        # 외부 게임 시계 보정: 남은 보정량을 실제 1초당 slew_rate초 이하로 나눠 반영
+        self.slew_rate = 0.05
+        self._pending_correction_ms = 0.0
+        self._slew_time: Optional[float] = None
+        self.last_correction_ms = 0  # 마지막으로 시간을 수정한 시점 (이후 기록은 같은 시계 기준)
+        # 시작/일시정지/초기화/시간 수정 등 상태가 바뀔 때 get_state()로 호출 (저널 기록용)
+        self.state_listener: Optional[Callable[[Dict], None]] = None
+        self.clock = clock or get_default_clock()
+        self.clock.subscribe(self)
 
     def start(self) -> str:
         try:
             if self.running:
                 raise ValueError("타이머가 이미 실행 중입니다.")
-            self.running = True
-            self.paused = False
-            self.start_time = time.time() - self.elapsed_time
-            self._update()
+            with self._lock:
+                self.running = True
+                self.paused = False
+                self.start_time = time.monotonic() - self.elapsed_ms / 1000
+                self._slew_time = None
+            self._emit_current()
+            self.clock.wake()
+            self._state_changed()
             return "타이머 시작"
         except Exception as e:
             self.logger.error(f"Error starting timer: {str(e)}")
@@ -31,12 +48,20 @@ class TimerManager:
             if not self.running:
                 raise ValueError("타이머가 실행 중이 아닙니다.")
             if self.paused:
-                self.paused = False
-                self.start_time = time.time() - self.elapsed_time
-                self._update()
+                with self._lock:
+                    self.paused = False
+                    self.start_time = time.monotonic() - self.elapsed_ms / 1000
+                    self._slew_time = None
+                self._emit_current()
+                self.clock.wake()
+                self._state_changed()
                 return "타이머 재개"
             else:
-                self.paused = True
+                with self._lock:
+                    self.get_elapsed_ms()
+                    self.paused = True
+                self.clock.wake()
+                self._state_changed()
                 return "타이머 일시정지"
         except Exception as e:
             self.logger.error(f"Error toggling pause: {str(e)}")
@@ -44,54 +69,122 @@ class TimerManager:
 
     def reset(self) -> str:
         try:
-            self.elapsed_time = 0
-            self.start_time = None
-            self.paused = False
-            self.running = False
+            with self._lock:
+                self.elapsed_ms = 0
+                self._pending_correction_ms = 0.0
+                self.last_correction_ms = 0
+                self.start_time = None
+                self.paused = False
+                self.running = False
+            self.clock.wake()
             self.update_callback(0, 0, 0)
+            self._state_changed()
             return "타이머 초기화"
         except Exception as e:
             self.logger.error(f"Error resetting timer: {str(e)}")
             raise
 
+    @property
+    def elapsed_time(self) -> int:
+        """경과 시간 (초 단위, 표시용)"""
+        return self.elapsed_ms // 1000
+
     def get_elapsed_time(self) -> int:
+        return self.get_elapsed_ms() // 1000
+
+    def get_elapsed_ms(self) -> int:
         try:
-            if self.running and not self.paused:
-                self.elapsed_time = int(time.time() - self.start_time)
-            return self.elapsed_time
+            with self._lock:
+                if self.running and not self.paused:
+                    now = time.monotonic()
+                    self._apply_slew(now)
+                    self.elapsed_ms = int((now - self.start_time) * 1000)
+                return self.elapsed_ms
         except Exception as e:
             self.logger.error(f"Error getting elapsed time: {str(e)}")
             raise
 
-    def _update(self):
-        try:
-            if self.running and not self.paused:
-                current_time = time.time()
-                self.elapsed_time = int(current_time - self.start_time)
-                minutes = self.elapsed_time // 60
-                seconds = self.elapsed_time % 60
-                if int(current_time) > self.last_update:
-                    self.last_update = int(current_time)
-                    self.update_callback(minutes, seconds, self.elapsed_time)
-                from threading import Timer
-                timer = Timer(0.1, self._update)
-                timer.daemon = True
-                timer.start()
-        except Exception as e:
-            self.logger.error(f"Error updating timer: {str(e)}")
+    def next_deadline(self) -> Optional[float]:
+        """ClockEngine 구독자 인터페이스: 다음 경과 초 경계의 monotonic 시각."""
+        with self._lock:
+            if not self.running or self.paused or self.start_time is None:
+                return None
+            return self.start_time + self._next_second
+
+    def on_tick(self, now: float):
+        """ClockEngine 구독자 인터페이스: 초 경계마다 클럭 스레드에서 호출된다."""
+        with self._lock:
+            if not self.running or self.paused or self.start_time is None:
+                return
+            self._apply_slew(now)
+            # 부동소수점 오차로 경계 직전 값이 나오더라도 예정된 초 이상을 보장
+            self.elapsed_ms = max(self._next_second * 1000, int((now - self.start_time) * 1000))
+            self._next_second = self.elapsed_ms // 1000 + 1
+            elapsed_ms = self.elapsed_ms
+        self._notify(elapsed_ms)
+
+    def _emit_current(self):
+        with self._lock:
+            elapsed_ms = self.get_elapsed_ms()
+            self._next_second = elapsed_ms // 1000 + 1
+        self._notify(elapsed_ms)
 
-    def edit_time(self, parent: QWidget, error_handler: Callable[[str], None]) -> tuple:
+    def _apply_slew(self, now: float):
+        """남은 보정량 중 마지막 호출 이후 허용된 만큼만 시작 시각에 반영 (호출 시 락 보유)"""
+        if not self._pending_correction_ms or self._slew_time is None:
+            self._slew_time = now
+            return
+        max_step = self.slew_rate * (now - self._slew_time) * 1000
+        step = max(-max_step, min(max_step, self._pending_correction_ms))
+        self.start_time -= step / 1000
+        self._pending_correction_ms -= step
+        self._slew_time = now
+
+    def correct_to(self, target_ms: float, jump_threshold_ms: float = 10000) -> Optional[float]:
+        """
+        외부 시계 기준 경과 시간으로 점진 보정.
+        오차가 jump_threshold_ms 이상이면 (매치 재시작 등) 즉시 맞춘다.
+        보정을 적용하면 다음 초 경계를 기다리지 않고 현재 값을 바로 알린다.
+        :return: 보정 전 오차 (밀리초, 양수면 타이머가 느림). 실행 중이 아니면 None
+        """
+        with self._lock:
+            if not self.running or self.paused:
+                return None
+            error = target_ms - self.get_elapsed_ms()
+            if abs(error) >= jump_threshold_ms:
+                self._pending_correction_ms = 0.0
+                self.start_time -= error / 1000
+                jumped = True
+            else:
+                self._pending_correction_ms = error
+                jumped = False
+        self._emit_current()
+        if jumped:
+            self.logger.debug("Timer jumped by %.0f ms to follow external clock", error)
+            self._state_changed()
+        self.clock.wake()
+        return error
+
+    def _state_changed(self):
+        if self.state_listener is not None:
+            try:
+                self.state_listener(self.get_state())
+            except Exception as e:
+                self.logger.error(f"Error in timer state listener: {str(e)}")
+
+    def _notify(self, elapsed_ms: int):
+        seconds = elapsed_ms // 1000
+        self.update_callback(seconds // 60, seconds % 60, elapsed_ms)
+
+    def edit_time(self, parent: Prompter, error_handler: Callable[[str], None]) -> tuple:
         try:
-            time_str, ok = QInputDialog.getText(parent, "타이머 시간 수정", "새 시간을 입력하세요 (MM:SS):")
-            if not ok:
+            time_str = parent.ask_text("타이머 시간 수정", "새 시간을 입력하세요 (MM:SS 또는 MM:SS.mmm):")
+            if time_str is None:
                 return None, "시간 수정 취소"
             try:
-                minutes, seconds = map(int, time_str.split(':'))
-                new_time = minutes * 60 + seconds
-                if new_time < 0:
-                    raise ValueError("음수 시간은 허용되지 않습니다.")
+                new_time = parse_time(time_str)
                 from commands import EditTimeCommand
-                command = EditTimeCommand(self, self.elapsed_time, new_time)
+                command = EditTimeCommand(self, self.get_elapsed_ms(), new_time)
                 return command, "시간 수정됨"
             except ValueError as e:
                 error_handler(f"잘못된 시간 형식입니다: {str(e)}")
@@ -100,43 +193,73 @@ class TimerManager:
             self.logger.error(f"Error editing time: {str(e)}")
             raise
 
-    def set_time(self, new_time: int):
+    def set_time(self, new_time: int, anchor_ms: Optional[int] = None):
+        """
+        경과 시간을 밀리초 단위로 설정.
+        :param anchor_ms: 마지막 보정 시점 (기본: new_time, 시간 수정을 되돌릴 때 이전 값으로)
+        """
         try:
-            self.elapsed_time = new_time
-            if self.running and not self.paused:
-                self.start_time = time.time() - self.elapsed_time
-            minutes = self.elapsed_time // 60
-            seconds = self.elapsed_time % 60
-            self.update_callback(minutes, seconds, self.elapsed_time)
+            with self._lock:
+                self.elapsed_ms = new_time
+                self.last_correction_ms = new_time if anchor_ms is None else anchor_ms
+                self._pending_correction_ms = 0.0
+                if self.running and not self.paused:
+                    self.start_time = time.monotonic() - self.elapsed_ms / 1000
+            self._emit_current()
+            self.clock.wake()
+            self._state_changed()
         except Exception as e:
             self.logger.error(f"Error setting time: {str(e)}")
             raise
 
+    def close(self):
+        """클럭 엔진 구독 해제 (매치 종료 시)"""
+        with self._lock:
+            self.running = False
+        self.clock.unsubscribe(self)
+
+    def get_jitter_stats(self) -> Dict[str, float]:
+        return self.clock.get_jitter_stats()
+
     def get_state(self) -> Dict:
         try:
-            return {
-                'elapsed_time': self.elapsed_time,
-                'running': self.running,
-                'paused': self.paused
-            }
+            with self._lock:
+                self.get_elapsed_ms()
+                active = self.running and not self.paused
+                return {
+                    'elapsed_ms': self.elapsed_ms,
+                    'elapsed_time': self.elapsed_time,
+                    'running': self.running,
+                    'paused': self.paused,
+                    'last_correction_ms': self.last_correction_ms,
+                    # 실행 중이면 경과 0초에 해당하는 벽시계 시각 (재시작 후에도 실제 경과 시간으로 복원)
+                    'wall_anchor': time.time() - self.elapsed_ms / 1000 if active else None
+                }
         except Exception as e:
             self.logger.error(f"Error getting state: {str(e)}")
             raise
 
     def restore_state(self, state: Dict):
         try:
-            self.elapsed_time = state.get('elapsed_time', 0)
-            self.running = state.get('running', False)
-            self.paused = state.get('paused', False)
-            if self.running and not self.paused:
-                self.start_time = time.time() - self.elapsed_time
-                self._update()  # 실행 중이면 업데이트 시작
-            else:
-                self.start_time = None
-            minutes = self.elapsed_time // 60
-            seconds = self.elapsed_time % 60
-            self.update_callback(minutes, seconds, self.elapsed_time)
-            self.logger.debug("Timer state restored: running=%s, paused=%s, elapsed=%d", self.running, self.paused, self.elapsed_time)
+            with self._lock:
+                # 이전 세션은 초 단위 elapsed_time만 저장됨
+                if 'elapsed_ms' in state:
+                    self.elapsed_ms = int(state['elapsed_ms'])
+                else:
+                    self.elapsed_ms = int(state.get('elapsed_time', 0)) * 1000
+                self.running = state.get('running', False)
+                self.paused = state.get('paused', False)
+                self.last_correction_ms = int(state.get('last_correction_ms', 0))
+                if self.running and not self.paused and state.get('wall_anchor') is not None:
+                    # 저장 이후(또는 비정상 종료 후 재시작까지) 흐른 시간도 반영
+                    self.elapsed_ms = max(0, int((time.time() - state['wall_anchor']) * 1000))
+                if self.running and not self.paused:
+                    self.start_time = time.monotonic() - self.elapsed_ms / 1000
+                else:
+                    self.start_time = None
+            self._emit_current()
+            self.clock.wake()  # 실행 중이면 클럭 스레드가 틱 전달 시작
+            self.logger.debug("Timer state restored: running=%s, paused=%s, elapsed_ms=%d", self.running, self.paused, self.elapsed_ms)
         except Exception as e:
             self.logger.error(f"Error restoring state: {str(e)}")
             raise
\ No newline at end of file
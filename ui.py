@@ -1,11 +1,155 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLineEdit, QLabel, QListWidget, QMessageBox, QDialog, QDialogButtonBox
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel, QListWidget, QListView, QAbstractItemView, QMessageBox, QDialog, QDialogButtonBox, QTabBar, QInputDialog, QCheckBox, QFileDialog
+from PyQt5.QtCore import Qt, QObject, QAbstractListModel, QModelIndex, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import QShortcut
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import threading
 import logging
-
-class HighlightRecorderUI(QWidget):
+from prompts import Prompter
+from highlight import HighlightListener
+from models import format_time
+
+class TimerSignalBridge(QObject):
+    """
+    클럭 스레드에서 발생한 틱을 GUI 스레드로 전달하는 브리지.
+    아직 처리되지 않은 틱이 있으면 새 틱은 최신 값만 덮어쓰므로, GUI는 항상 마지막 상태만 그린다.
+    반드시 GUI 스레드에서 생성해야 한다.
+    """
+    tick_ready = pyqtSignal()
+
+    def __init__(self, handler: Callable[[int, int, int, int], None]):
+        super().__init__()
+        self.handler = handler
+        self._lock = threading.Lock()
+        self._latest: Dict[int, tuple] = {}  # 매치 ID별 최신 틱
+        self._pending = False
+        self.coalesced_count = 0
+        self.tick_ready.connect(self._deliver, Qt.QueuedConnection)
+
+    def post(self, match_id: int, minutes: int, seconds: int, elapsed_ms: int):
+        """어느 스레드에서든 호출 가능"""
+        with self._lock:
+            if match_id in self._latest:
+                self.coalesced_count += 1
+            self._latest[match_id] = (minutes, seconds, elapsed_ms)
+            if self._pending:
+                return
+            self._pending = True
+        self.tick_ready.emit()
+
+    @pyqtSlot()
+    def _deliver(self):
+        with self._lock:
+            latest = self._latest
+            self._latest = {}
+            self._pending = False
+        for match_id, (minutes, seconds, elapsed_ms) in latest.items():
+            self.handler(match_id, minutes, seconds, elapsed_ms)
+
+class MainThreadInvoker(QObject):
+    """다른 스레드에서 post()한 함수를 GUI 스레드에서 실행. 반드시 GUI 스레드에서 생성해야 한다."""
+    invoke = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.invoke.connect(self._run, Qt.QueuedConnection)
+
+    def post(self, func: Callable[[], None]):
+        self.invoke.emit(func)
+
+    @pyqtSlot(object)
+    def _run(self, func):
+        func()
+
+class HighlightListModel(QAbstractListModel, HighlightListener):
+    """
+    HighlightManager를 직접 보여주는 목록 모델.
+    전체를 다시 그리지 않고 매니저의 삽입/삭제 알림을 행 단위 신호로 전달한다.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.manager = None
+
+    def set_manager(self, manager):
+        self.beginResetModel()
+        if self.manager is not None:
+            self.manager.remove_listener(self)
+        self.manager = manager
+        if manager is not None:
+            manager.add_listener(self)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.manager is None:
+            return 0
+        return len(self.manager)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.manager is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.manager.highlight_at(index.row()).to_display_string()
+        return None
+
+    def highlights_about_to_insert(self, index: int):
+        self.beginInsertRows(QModelIndex(), index, index)
+
+    def highlights_inserted(self, index: int, highlight):
+        self.endInsertRows()
+
+    def highlights_about_to_remove(self, index: int):
+        self.beginRemoveRows(QModelIndex(), index, index)
+
+    def highlights_removed(self, index: int, highlight):
+        self.endRemoveRows()
+
+    def highlight_changed(self, index: int, highlight):
+        model_index = self.index(index, 0)
+        self.dataChanged.emit(model_index, model_index, [Qt.DisplayRole])
+
+    def highlights_about_to_reset(self):
+        self.beginResetModel()
+
+    def highlights_reset(self):
+        self.endResetModel()
+
+class SessionListModel(QAbstractListModel):
+    """
+    세션 선택 목록 모델. 행 문자열은 보일 때만 만들고, 행은 스크롤할 때 batch_size개씩 늘려
+    세션이 수천 개여도 대화상자가 바로 열린다.
+    """
+    def __init__(self, sessions: List[Dict[str, Any]], batch_size: int = 100, parent=None):
+        super().__init__(parent)
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.loaded = min(batch_size, len(sessions))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.sessions)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self.sessions) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        session = self.sessions[index.row()]
+        timestamp = session['timestamp'].split('T')[0] + ' ' + session['timestamp'].split('T')[1][:8]
+        total_time = session['total_time']
+        time_str = f"{total_time // 60:02}:{total_time % 60:02}"
+        return f"{timestamp} | {session['highlight_count']} 하이라이트 | {time_str}"
+
+class HighlightRecorderUI(QWidget, Prompter):
     def __init__(self, callbacks):
         super().__init__()
         try:
@@ -25,6 +169,22 @@ class HighlightRecorderUI(QWidget):
             self.setWindowTitle('하이라이트 메모 프로그램')
             layout = QVBoxLayout()
 
+            # 매치 탭
+            tab_layout = QHBoxLayout()
+            self.match_tabs = QTabBar(self)
+            self.match_tabs.setTabsClosable(True)
+            self.match_tabs.setExpanding(False)
+            self.match_tabs.currentChanged.connect(self.callbacks['switch_match'])
+            self.match_tabs.tabCloseRequested.connect(self.callbacks['close_match'])
+            self.match_tabs.tabBarDoubleClicked.connect(self.callbacks['rename_match'])
+            tab_layout.addWidget(self.match_tabs, 1)
+            self.add_match_button = QPushButton('+', self)
+            self.add_match_button.setToolTip('매치 추가')
+            self.add_match_button.setFixedWidth(30)
+            self.add_match_button.clicked.connect(self.callbacks['add_match'])
+            tab_layout.addWidget(self.add_match_button)
+            layout.addLayout(tab_layout)
+
             # 시간 표시
             self.timer_label = QLabel('00:00', self)
             self.timer_label.setAlignment(Qt.AlignCenter)
@@ -37,6 +197,13 @@ class HighlightRecorderUI(QWidget):
             self.status_label.setStyleSheet("font-size: 14px; color: green;")
             layout.addWidget(self.status_label)
 
+            # 외부 게임 시계 상태 (연결 시에만 표시)
+            self.clock_source_label = QLabel('', self)
+            self.clock_source_label.setAlignment(Qt.AlignCenter)
+            self.clock_source_label.setStyleSheet("font-size: 11px; color: gray;")
+            self.clock_source_label.hide()
+            layout.addWidget(self.clock_source_label)
+
             # 메모 입력
             self.memo_input = QLineEdit(self)
             self.memo_input.setPlaceholderText('하이라이트 설명 입력 (예: 1대4 클러치)')
@@ -52,7 +219,10 @@ class HighlightRecorderUI(QWidget):
                 ('record_button', '하이라이트 기록', self.callbacks['record_highlight']),
                 ('edit_time_button', '타이머 시간 수정', self.callbacks['edit_match_time']),
                 ('delete_button', '하이라이트 삭제', self.callbacks['delete_highlight']),
+                ('shift_button', '하이라이트 이동', self.callbacks['shift_highlights']),
+                ('normalize_button', '겹치는 하이라이트 정리', self.callbacks['normalize_highlights']),
                 ('save_button', '메모 저장', self.callbacks['save_highlights']),
+                ('export_formats_button', '내보내기 형식', self.callbacks['choose_export_formats']),
                 ('theme_button', '테마 변경', self.toggle_theme),
             ]
             for name, text, callback in buttons:
@@ -63,8 +233,12 @@ class HighlightRecorderUI(QWidget):
                 layout.addWidget(button)
 
             # 하이라이트 목록
-            self.highlights_view = QListWidget(self)
-            self.highlights_view.itemDoubleClicked.connect(self.callbacks['edit_highlight'])
+            self.highlights_model = HighlightListModel(self)
+            self.highlights_view = QListView(self)
+            self.highlights_view.setModel(self.highlights_model)
+            self.highlights_view.setUniformItemSizes(True)  # 보이는 행만 그리도록 높이 계산 생략
+            self.highlights_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+            self.highlights_view.doubleClicked.connect(self.callbacks['edit_highlight'])
             self.highlights_view.setStyleSheet("font-size: 14px;")
             layout.addWidget(self.highlights_view)
 
@@ -80,6 +254,12 @@ class HighlightRecorderUI(QWidget):
             save_shortcut.activated.connect(self.callbacks['save_highlights'])
             self.logger.debug("Ctrl+S shortcut registered")
 
+            # Ctrl+F 단축키 (모든 세션 메모 검색)
+            self.logger.debug("Registering Ctrl+F shortcut")
+            search_shortcut = QShortcut(QKeySequence('Ctrl+F'), self)
+            search_shortcut.activated.connect(self.callbacks['search_memos'])
+            self.logger.debug("Ctrl+F shortcut registered")
+
             # Ctrl+Z 단축키 (Undo)
             self.logger.debug("Registering Ctrl+Z shortcut")
             undo_shortcut = QShortcut(QKeySequence('Ctrl+Z'), self)
@@ -116,7 +296,7 @@ class HighlightRecorderUI(QWidget):
                     QPushButton { background-color: #4A4A4A; color: #FFFFFF; border: 1px solid #555555; }
                     QPushButton:hover { background-color: #5A5A5A; }
                     QLineEdit { background-color: #3A3A3A; color: #FFFFFF; border: 1px solid #555555; }
-                    QListWidget { background-color: #3A3A3A; color: #FFFFFF; border: 1px solid #555555; }
+                    QListWidget, QListView { background-color: #3A3A3A; color: #FFFFFF; border: 1px solid #555555; }
                     QLabel { color: #FFFFFF; }
                 """)
                 self.status_label.setStyleSheet("font-size: 14px; color: #00FF00;")
@@ -137,14 +317,11 @@ class HighlightRecorderUI(QWidget):
             label = QLabel("복구할 세션을 선택하세요:", dialog)
             layout.addWidget(label)
 
-            session_list = QListWidget(dialog)
-            for session in sessions:
-                timestamp = session['timestamp'].split('T')[0] + ' ' + session['timestamp'].split('T')[1][:8]
-                total_time = session['total_time']
-                time_str = f"{total_time // 60:02}:{total_time % 60:02}"
-                item_text = f"{timestamp} | {session['highlight_count']} 하이라이트 | {time_str}"
-                session_list.addItem(item_text)
-            session_list.setCurrentRow(0)
+            session_model = SessionListModel(sessions, parent=dialog)
+            session_list = QListView(dialog)
+            session_list.setModel(session_model)
+            session_list.setUniformItemSizes(True)
+            session_list.setCurrentIndex(session_model.index(0, 0))
             layout.addWidget(session_list)
 
             buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal, dialog)
@@ -156,8 +333,8 @@ class HighlightRecorderUI(QWidget):
 
             def on_ok():
                 nonlocal selected_session
-                if session_list.currentRow() >= 0:
-                    selected_session = sessions[session_list.currentRow()]['file']
+                if session_list.currentIndex().isValid():
+                    selected_session = sessions[session_list.currentIndex().row()]['file']
                 dialog.accept()
 
             def on_new_session():
@@ -185,6 +362,85 @@ class HighlightRecorderUI(QWidget):
             self.logger.error(f"Error in show_session_selector: {str(e)}")
             return "cancel"
 
+    def show_memo_search(self, search: Callable[[str], List[Dict[str, Any]]]):
+        """입력할 때마다 search(질의)로 모든 세션의 메모를 찾아 표시"""
+        try:
+            dialog = QDialog(self)
+            dialog.setWindowTitle("메모 검색")
+            layout = QVBoxLayout()
+
+            query_input = QLineEdit(dialog)
+            query_input.setPlaceholderText('검색어 입력 (예: 클러치, ㅋㄹㅊ)')
+            layout.addWidget(query_input)
+
+            result_label = QLabel('', dialog)
+            layout.addWidget(result_label)
+
+            result_list = QListWidget(dialog)
+            result_list.setUniformItemSizes(True)
+            layout.addWidget(result_list)
+
+            buttons = QDialogButtonBox(QDialogButtonBox.Close, Qt.Horizontal, dialog)
+            buttons.rejected.connect(dialog.reject)
+            layout.addWidget(buttons)
+
+            def on_query_changed(text: str):
+                result_list.clear()
+                results = search(text) if text.strip() else []
+                for result in results:
+                    timestamp = result['timestamp'].replace('T', ' ')[:16]
+                    start = format_time(result['start_ms'])
+                    end = format_time(result['end_ms'])
+                    result_list.addItem(f"{timestamp} | {result['match']} | {start} ~ {end} | {result['memo']}")
+                result_label.setText(f"{len(results)}개 결과" if text.strip() else '')
+
+            query_input.textChanged.connect(on_query_changed)
+            dialog.setLayout(layout)
+            dialog.resize(500, 400)
+            dialog.exec_()
+        except Exception as e:
+            self.logger.error(f"Error in show_memo_search: {str(e)}")
+
+    def ask_export_formats(self, formats: List[Tuple[str, str]], selected: List[str]) -> Optional[List[str]]:
+        """
+        저장할 때 함께 내보낼 형식 선택.
+        :param formats: (key, 표시 이름) 목록
+        :param selected: 현재 선택된 key 목록
+        :return: 선택한 key 목록 (취소 시 None)
+        """
+        try:
+            dialog = QDialog(self)
+            dialog.setWindowTitle("내보내기 형식")
+            layout = QVBoxLayout()
+            layout.addWidget(QLabel("메모 저장 시 함께 만들 파일 형식을 선택하세요:", dialog))
+            checkboxes = []
+            for key, label in formats:
+                checkbox = QCheckBox(label, dialog)
+                checkbox.setChecked(key in selected)
+                layout.addWidget(checkbox)
+                checkboxes.append((key, checkbox))
+            buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal, dialog)
+            buttons.accepted.connect(dialog.accept)
+            buttons.rejected.connect(dialog.reject)
+            layout.addWidget(buttons)
+            dialog.setLayout(layout)
+            if dialog.exec_() != QDialog.Accepted:
+                return None
+            return [key for key, checkbox in checkboxes if checkbox.isChecked()]
+        except Exception as e:
+            self.logger.error(f"Error in ask_export_formats: {str(e)}")
+            return None
+
+    def ask_journal_recovery(self, record_count: int) -> bool:
+        reply = QMessageBox.question(
+            self,
+            '비정상 종료 복구',
+            f'이전 실행이 정상 종료되지 않았습니다. 저장되지 않은 변경 {record_count}건을 복구하시겠습니까?',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        return reply == QMessageBox.Yes
+
     def ask_session_restore(self) -> str:
         try:
             reply = QMessageBox.question(
@@ -207,6 +463,46 @@ class HighlightRecorderUI(QWidget):
             self.logger.error(f"Error in ask_session_restore: {str(e)}")
             return "cancel"
 
+    def ask_shift_after_time_edit(self, count: int, delta_ms: int) -> bool:
+        reply = QMessageBox.question(
+            self,
+            '하이라이트 이동',
+            f'마지막 시간 수정 이후 기록된 하이라이트 {count}개도 {delta_ms / 1000:+.3f}초 이동하시겠습니까?',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        return reply == QMessageBox.Yes
+
+    def set_match_tabs(self, names: List[str], current_index: int):
+        self.match_tabs.blockSignals(True)
+        try:
+            while self.match_tabs.count():
+                self.match_tabs.removeTab(0)
+            for name in names:
+                self.match_tabs.addTab(name)
+            self.match_tabs.setCurrentIndex(current_index)
+        finally:
+            self.match_tabs.blockSignals(False)
+
+    def ask_text(self, title: str, label: str, text: str = '') -> Optional[str]:
+        value, ok = QInputDialog.getText(self, title, label, text=text)
+        return value if ok else None
+
+    def ask_save_path(self, title: str, file_filter: str) -> Optional[str]:
+        file_path, _ = QFileDialog.getSaveFileName(self, title, "", file_filter)
+        return file_path or None
+
+    def ask_save_before_exit(self) -> Optional[bool]:
+        reply = QMessageBox.question(self, '종료 확인', '하이라이트가 저장되지 않았습니다. 저장 후 종료하시겠습니까?',
+                                     QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Cancel)
+        if reply == QMessageBox.Cancel:
+            return None
+        return reply == QMessageBox.Yes
+
+    def ask_match_name(self, current_name: str) -> Optional[str]:
+        name, ok = QInputDialog.getText(self, "매치 이름 변경", "새 매치 이름을 입력하세요:", text=current_name)
+        return name.strip() if ok else None
+
     def update_recording_status(self, status: Optional[Dict[str, Any]]):
         try:
             if status:
@@ -229,15 +525,25 @@ class HighlightRecorderUI(QWidget):
         QMessageBox.information(self, title, message)
 
     def update_timer_display(self, minutes, seconds):
-        self.timer_label.setText(f"{minutes:02}:{seconds:02}")
+        text = f"{minutes:02}:{seconds:02}"
+        if self.timer_label.text() != text:
+            self.timer_label.setText(text)
+
+    def update_clock_source(self, stats: Optional[Dict[str, Any]]):
+        if not stats:
+            self.clock_source_label.hide()
+            return
+        self.clock_source_label.setText(
+            f"게임 시계 보정 {stats['error_ms']:+.0f}ms | 전송 {stats['transit']['mean_ms']:.1f}ms"
+            f" | 표시 {stats['display']['mean_ms']:.1f}ms"
+        )
+        self.clock_source_label.show()
 
     def update_status(self, message):
         self.status_label.setText(message)
 
-    def update_highlights_view(self, highlights):
-        self.highlights_view.clear()
-        for h in highlights:
-            self.highlights_view.addItem(h.to_display_string())
+    def set_highlight_manager(self, manager):
+        self.highlights_model.set_manager(manager)
 
     def clear_memo(self):
         self.memo_input.clear()
@@ -246,5 +552,12 @@ class HighlightRecorderUI(QWidget):
         return self.memo_input.text().strip()
 
     def get_selected_highlight_index(self):
-        selected_item = self.highlights_view.currentItem()
-        return self.highlights_view.row(selected_item) if selected_item else -1
\ No newline at end of file
+        index = self.highlights_view.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def get_selected_highlight_indices(self) -> List[int]:
+        rows = sorted(index.row() for index in self.highlights_view.selectionModel().selectedIndexes())
+        if not rows:
+            current = self.get_selected_highlight_index()
+            return [current] if current != -1 else []
+        return rows
\ No newline at end of file
@@ -0,0 +1,248 @@
+import os
+import io
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple, Union
+from models import Highlight
+from columns import HighlightColumns, Row, iter_rows
+from xmeml_writer import XmemlWriter, escape
+from timecode import FrameRate
+import logging
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# 템플릿 필드. 시퀀스 이름은 이스케이프해서, 나머지는 그대로 넣는다.
+# {{markers}}는 한 줄을 차지해야 하며 그 줄의 들여쓰기가 마커 들여쓰기가 된다.
+# {{timecode}}는 시작 타임코드 문자열 (드롭 프레임이면 00:00:00;00)
+FIELDS = ('name', 'duration', 'timebase', 'ntsc', 'displayformat', 'timecode', 'markers')
+_FIELD_RE = re.compile(r'\{\{(\w+)\}\}')
+_MARKERS_LINE_RE = re.compile(r'^([ \t]*)\{\{markers\}\}[ \t]*\r?\n', re.MULTILINE)
+# 첫 줄 지시문: <!-- timebase: 30 -->, <!-- timebase: 29.97df --> (마커와 {{timebase}}에 쓸 프레임 속도, 출력에서는 제거)
+_TIMEBASE_RE = re.compile(r'\A<!--\s*timebase:\s*([\w./ ]+?)\s*-->[ \t]*\r?\n')
+
+SEQUENCE_ATTRIBUTES = [
+    ("id", "sequence_1"),
+    ("TL.SQAudioVisibleBase", "0"),
+    ("TL.SQVideoVisibleBase", "0"),
+    ("TL.SQVisibleBaseTime", "0"),
+    ("TL.SQAVDividerPosition", "0.5"),
+    ("TL.SQHideShyTracks", "0"),
+    ("TL.SQHeaderWidth", "292"),
+    ("Monitor.ProgramZoomOut", "0"),
+    ("Monitor.ProgramZoomIn", "0"),
+    ("TL.SQTimePerPixel", "0.2"),
+    ("MZ.EditLine", "0"),
+    ("MZ.Sequence.PreviewFrameSizeHeight", "1080"),
+    ("MZ.Sequence.PreviewFrameSizeWidth", "1920"),
+    ("MZ.Sequence.AudioTimeDisplayFormat", "200"),
+    ("MZ.Sequence.PreviewRenderingClassID", "1061109567"),
+    ("MZ.Sequence.PreviewRenderingPresetCodec", "1634755439"),
+    ("MZ.Sequence.PreviewRenderingPresetPath", "EncoderPresets/SequencePreview/795454d9-d3c2-429d-9474-923ab13b7018/QuickTime.epr"),
+    ("MZ.Sequence.PreviewUseMaxRenderQuality", "false"),
+    ("MZ.Sequence.PreviewUseMaxBitDepth", "false"),
+    ("MZ.Sequence.EditingModeGUID", "795454d9-d3c2-429d-9474-923ab13b7018"),
+    ("MZ.Sequence.VideoTimeDisplayFormat", "101"),
+    ("MZ.WorkOutPoint", "4612930560000"),
+    ("MZ.WorkInPoint", "0"),
+    ("explodedTracks", "true"),
+]
+
+TRACK_ATTRIBUTES = [
+    ("TL.SQTrackShy", "0"),
+    ("TL.SQTrackExpandedHeight", "25"),
+    ("TL.SQTrackExpanded", "0"),
+    ("MZ.TrackTargeted", "0"),
+]
+
+def default_template_text() -> str:
+    """기존 시퀀스(1080p, 60fps)와 같은 xmeml 골격에 필드를 둔 기본 템플릿"""
+    buffer = io.StringIO()
+    w = XmemlWriter(buffer)
+    w.declaration()
+    w.start("xmeml", [("version", "4")])
+    w.start("sequence", SEQUENCE_ATTRIBUTES)
+    w.element("uuid", "ebff5d35-481f-4d04-9b18-56efca5fb952")
+    w.element("duration", "{{duration}}")
+    w.rate("{{timebase}}", "{{ntsc}}")
+    w.element("name", "{{name}}")
+
+    # Media
+    w.start("media")
+    w.start("video")
+    w.start("format")
+    w.start("samplecharacteristics")
+    w.rate("{{timebase}}", "{{ntsc}}")
+    w.start("codec")
+    w.element("name", "Apple ProRes 422")
+    w.start("appspecificdata")
+    w.elements(("appname", "Final Cut Pro"), ("appmanufacturer", "Apple Inc."), ("appversion", "7.0"))
+    w.start("data")
+    w.start("qtcodec")
+    w.elements(("codecname", "Apple ProRes 422"), ("codectypename", "Apple ProRes 422"),
+               ("codectypecode", "apcn"), ("codecvendorcode", "appl"), ("spatialquality", "1024"),
+               ("temporalquality", "0"), ("keyframerate", "0"), ("datarate", "0"))
+    w.end()  # qtcodec
+    w.end()  # data
+    w.end()  # appspecificdata
+    w.end()  # codec
+    w.elements(("width", "1920"), ("height", "1080"), ("anamorphic", "FALSE"),
+               ("pixelaspectratio", "square"), ("fielddominance", "none"), ("colordepth", "24"))
+    w.end()  # samplecharacteristics
+    w.end()  # format
+
+    # Track
+    w.start("track", TRACK_ATTRIBUTES)
+    w.elements(("enabled", "TRUE"), ("locked", "FALSE"))
+    w.start("generatoritem", [("id", "generatoritem_1")])
+    w.elements(("name", "Highlight Color Matte"), ("enabled", "TRUE"), ("duration", "{{duration}}"))
+    w.rate("{{timebase}}", "{{ntsc}}")
+    w.elements(("start", "0"), ("end", "{{duration}}"), ("in", "0"), ("out", "{{duration}}"),
+               ("alphatype", "none"))
+    w.start("effect")
+    w.elements(("name", "Color"), ("effectid", "Color"), ("effectcategory", "Matte"),
+               ("effecttype", "generator"), ("mediatype", "video"))
+    w.start("parameter", [("authoringApp", "PremierePro")])
+    w.elements(("parameterid", "fillcolor"), ("name", "Color"))
+    w.start("value")
+    w.elements(("alpha", "0"), ("red", "0"), ("green", "0"), ("blue", "0"))
+    w.end()  # value
+    w.end()  # parameter
+    w.end()  # effect
+    w.start("filter")
+    w.start("effect")
+    w.elements(("name", "Opacity"), ("effectid", "opacity"), ("effectcategory", "motion"),
+               ("effecttype", "motion"), ("mediatype", "video"), ("pproBypass", "false"))
+    w.start("parameter", [("authoringApp", "PremierePro")])
+    w.elements(("parameterid", "opacity"), ("name", "opacity"), ("valuemin", "0"), ("valuemax", "100"),
+               ("value", "0"))
+    w.end()  # parameter
+    w.end()  # effect
+    w.end()  # filter
+
+    # GeneratorItem 내부 마커
+    w.placeholder("markers")
+    w.end()  # generatoritem
+    w.end()  # track
+    w.end()  # video
+    w.end()  # media
+
+    # Timecode
+    w.start("timecode")
+    w.rate("{{timebase}}", "{{ntsc}}")
+    w.elements(("string", "{{timecode}}"), ("frame", "0"), ("displayformat", "{{displayformat}}"))
+    w.end()
+
+    # Labels
+    w.start("labels")
+    w.element("label2", "Green")
+    w.end()
+
+    # Logging Info
+    w.start("logginginfo")
+    w.elements(("description", ""), ("scene", ""), ("shottake", ""), ("lognote", ""), ("good", ""),
+               ("originalvideofilename", ""), ("originalaudiofilename", ""))
+    w.end()
+
+    # Sequence 직속 마커
+    w.placeholder("markers")
+    w.end()  # sequence
+    w.end()  # xmeml
+    w.close()
+    return buffer.getvalue()
+
+class XmemlTemplate:
+    """
+    xmeml 시퀀스 템플릿. 정적인 골격은 컴파일 시 한 번만 문자열 조각으로 나누고,
+    내보낼 때 이름/길이/프레임 속도와 마커 블록만 끼워 넣는다.
+    """
+    def __init__(self, text: str, source: str = '<default>'):
+        self.source = source
+        self.frame_rate: Optional[FrameRate] = None
+        match = _TIMEBASE_RE.match(text)
+        if match:
+            self.frame_rate = FrameRate.parse(match.group(1))
+            text = text[match.end():]
+        # ('text', 문자열) / ('field', 이름) / ('markers', 들여쓰기)
+        self.parts: List[Tuple[str, str]] = []
+        position = 0
+        for line in _MARKERS_LINE_RE.finditer(text):
+            self._compile_fields(text[position:line.start()])
+            self.parts.append(('markers', line.group(1)))
+            position = line.end()
+        self._compile_fields(text[position:])
+        if not any(kind == 'markers' for kind, _ in self.parts):
+            raise ValueError(f"템플릿에 {{{{markers}}}} 줄이 없습니다: {source}")
+
+    def _compile_fields(self, text: str):
+        position = 0
+        for match in _FIELD_RE.finditer(text):
+            name = match.group(1)
+            if name not in FIELDS or name == 'markers':
+                raise ValueError(f"알 수 없는 템플릿 필드입니다: {{{{{name}}}}} ({self.source})")
+            self._add_text(text[position:match.start()])
+            self.parts.append(('field', name))
+            position = match.end()
+        self._add_text(text[position:])
+
+    def _add_text(self, text: str):
+        if not text:
+            return
+        if self.parts and self.parts[-1][0] == 'text':
+            self.parts[-1] = ('text', self.parts[-1][1] + text)
+        else:
+            self.parts.append(('text', text))
+
+    def render(self, stream: TextIO, name: str, duration: int, frame_rate: FrameRate,
+               highlights: Union[List[Highlight], HighlightColumns, Sequence[Row]]):
+        """stream에 문서를 씀 (마커 블록마다 highlights를 다시 순회)"""
+        values = {'name': escape(name), 'duration': str(duration), 'timebase': str(frame_rate.timebase),
+                  'ntsc': 'TRUE' if frame_rate.ntsc else 'FALSE',
+                  'displayformat': 'DF' if frame_rate.drop_frame else 'NDF', 'timecode': frame_rate.timecode(0)}
+        writer = XmemlWriter(stream)
+        for kind, value in self.parts:
+            if kind == 'text':
+                writer.raw(value)
+            elif kind == 'field':
+                writer.raw(values[value])
+            else:
+                writer.markers(iter_rows(highlights), frame_rate, pad=value)
+        writer.close()
+
+_cache: Dict[str, Tuple[Tuple[float, int], XmemlTemplate]] = {}
+_cache_lock = threading.Lock()
+_default: Optional[XmemlTemplate] = None
+
+def resolve_template_path(name: Optional[str]) -> Optional[str]:
+    """설정 값 -> 템플릿 파일 경로. '4k60'처럼 이름만 주면 templates/xmeml_4k60.xml"""
+    if not name:
+        return None
+    if os.sep in name or '/' in name or name.endswith('.xml'):
+        return name
+    return os.path.join(TEMPLATE_DIR, f"xmeml_{name}.xml")
+
+def load_template(name: Optional[str] = None) -> XmemlTemplate:
+    """
+    템플릿을 컴파일해 캐시. 파일이 바뀌면(mtime/크기) 다시 컴파일한다.
+    name이 없으면 기본 템플릿, 파일이 없거나 잘못되었으면 로그를 남기고 기본 템플릿을 쓴다.
+    """
+    global _default
+    logger = logging.getLogger(__name__)
+    path = resolve_template_path(name)
+    with _cache_lock:
+        if path is not None:
+            try:
+                stat = os.stat(path)
+                key = (stat.st_mtime, stat.st_size)
+                cached = _cache.get(path)
+                if cached is not None and cached[0] == key:
+                    return cached[1]
+                with open(path, 'r', encoding='utf-8') as f:
+                    template = XmemlTemplate(f.read(), path)
+                _cache[path] = (key, template)
+                logger.debug("Compiled xmeml template %s", path)
+                return template
+            except Exception as e:
+                logger.error(f"Error loading xmeml template {path}, using default: {str(e)}")
+        if _default is None:
+            _default = XmemlTemplate(default_template_text())
+        return _default
@@ -0,0 +1,118 @@
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+from columns import Row
+from timecode import FrameRate
+
+GREEN = "4278255360"  # 마커 색 (pproColor)
+
+def escape(text: str) -> str:
+    """
+    minidom.toprettyxml과 같은 이스케이프 (& < " >).
+    기존 출력은 ElementTree로 쓴 뒤 expat으로 다시 읽었으므로 줄바꿈 문자(\\r\\n, \\r)는 \\n으로 정규화된다.
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+class XmemlWriter:
+    """
+    xmeml 문서를 트리 없이 순서대로 쓰는 스트리밍 작성기.
+    출력은 기존 ElementTree + minidom.toprettyxml(indent="  ", encoding="utf-8") 결과와 바이트 단위로 같다:
+    자식이 텍스트 하나뿐인 요소는 한 줄, 빈 요소는 <tag/>, 속성은 지정한 순서대로.
+    문자열 조각은 모아 두었다가 buffer_size개마다 파일에 쓰므로 마커 수와 관계없이 메모리 사용량이 일정하다.
+    """
+    def __init__(self, stream: TextIO, indent: str = "  ", newline: str = "\n", buffer_size: int = 4096):
+        self.stream = stream
+        self.indent = indent
+        self.newline = newline
+        self.buffer_size = buffer_size
+        self._parts: List[str] = []
+        self._stack: List[str] = []
+
+    def _pad(self) -> str:
+        return self.indent * len(self._stack)
+
+    def _write(self, text: str):
+        self._parts.append(text)
+        if len(self._parts) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.stream.write(''.join(self._parts))
+            self._parts = []
+
+    def declaration(self, encoding: str = "utf-8"):
+        self._write(f'<?xml version="1.0" encoding="{encoding}"?>{self.newline}')
+
+    @staticmethod
+    def _attributes(attrs: Optional[Sequence[Tuple[str, str]]]) -> str:
+        if not attrs:
+            return ''
+        return ''.join(f' {name}="{escape(value)}"' for name, value in attrs)
+
+    def start(self, tag: str, attrs: Optional[Sequence[Tuple[str, str]]] = None):
+        """자식 요소가 있는 요소 열기"""
+        self._write(f"{self._pad()}<{tag}{self._attributes(attrs)}>{self.newline}")
+        self._stack.append(tag)
+
+    def end(self):
+        tag = self._stack.pop()
+        self._write(f"{self._pad()}</{tag}>{self.newline}")
+
+    def element(self, tag: str, text: object = "", attrs: Optional[Sequence[Tuple[str, str]]] = None):
+        """텍스트만 있는 요소 (텍스트가 비면 <tag/>)"""
+        text = str(text)
+        if text:
+            self._write(f"{self._pad()}<{tag}{self._attributes(attrs)}>{escape(text)}</{tag}>{self.newline}")
+        else:
+            self._write(f"{self._pad()}<{tag}{self._attributes(attrs)}/>{self.newline}")
+
+    def elements(self, *items: Tuple[str, object]):
+        for tag, text in items:
+            self.element(tag, text)
+
+    def rate(self, timebase: object, ntsc: str = "FALSE"):
+        self.start("rate")
+        self.elements(("timebase", timebase), ("ntsc", ntsc))
+        self.end()
+
+    def raw(self, text: str):
+        """이미 완성된 XML 조각을 그대로 씀 (템플릿의 정적 부분)"""
+        self._write(text)
+
+    def placeholder(self, name: str):
+        """템플릿 필드 줄 ({{name}}) — 현재 들여쓰기로 씀"""
+        self._write(f"{self._pad()}{{{{{name}}}}}{self.newline}")
+
+    def markers(self, rows: Iterable[Row], frame_rate: Union[FrameRate, int], color: str = GREEN,
+                pad: Optional[str] = None, chunk_size: int = 8192):
+        """
+        마커 목록. 요소별 호출 대신 마커 하나를 문자열 하나로 만들어 쓴다 (수십만 개용).
+        프레임 번호는 chunk_size개씩 모아 한 번에 변환한다 (numpy가 있으면 배열 연산).
+        pad: 마커 줄의 들여쓰기 (없으면 현재 깊이)
+        """
+        frame_rate = FrameRate.parse(frame_rate)
+        pad = self._pad() if pad is None else pad
+        inner, nl = pad + self.indent, self.newline
+        head = f"{pad}<marker>{nl}"
+        name = f"{inner}<name/>{nl}"
+        tail = f"{inner}<pproColor>{color}</pproColor>{nl}{pad}</marker>{nl}"
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            starts = frame_rate.ms_to_frames_many([row[0] for row in chunk])
+            ends = frame_rate.ms_to_frames_many([row[1] for row in chunk])
+            for (_, _, memo), start, end in zip(chunk, starts, ends):
+                comment = f"{inner}<comment>{escape(memo)}</comment>{nl}" if memo else f"{inner}<comment/>{nl}"
+                self._write(f"{head}{comment}{name}"
+                            f"{inner}<in>{start}</in>{nl}"
+                            f"{inner}<out>{end}</out>{nl}{tail}")
+
+    def close(self):
+        """열린 요소가 남아 있으면 오류. 남은 조각을 씀"""
+        if self._stack:
+            raise ValueError(f"닫히지 않은 XML 요소가 있습니다: {self._stack[-1]}")
+        self.flush()